@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Create an online backup of the catalog and all case databases now
+
+Safe to run while the application is analyzing; see
+src/database/backup_manager.py for how the copy is paced.
+
+Usage:
+    python scripts/backup_database.py [--keep N]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.backup_manager import BackupManager
+
+def main():
+    parser = argparse.ArgumentParser(description='Back up Forenstiq databases')
+    parser.add_argument('--keep', type=int, default=None,
+                        help='Snapshots to keep (default: [Database] backup_keep)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Forenstiq Database Backup")
+    print("=" * 60)
+
+    manager = BackupManager.from_config()
+    if args.keep is not None:
+        manager.keep = args.keep
+
+    def progress(index, count, name, done, total):
+        percent = 100 * done // total if total else 100
+        print(f"\r  [{index + 1}/{count}] {name}: {percent}%", end='', flush=True)
+        if done >= total:
+            print()
+
+    try:
+        result = manager.create_backup(progress_callback=progress)
+    except Exception as e:
+        print(f"\n✗ Backup failed: {e}")
+        sys.exit(1)
+
+    print(f"✓ Backup written to {result['path']}")
+    print(f"  {result['databases']} database(s), "
+          f"{result['size_bytes'] / 1e6:.1f} MB -> {result['compressed_bytes'] / 1e6:.1f} MB "
+          f"in {result['duration']:.1f}s")
+    if result['removed']:
+        print(f"  Removed {result['removed']} old snapshot(s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark two-stage face detection against the full-resolution pass
+
+The single full-resolution dlib pass is the reference. For each proposal
+model and size, reports time per image and recall: the share of reference
+faces found again (box IoU >= 0.5), plus the mean encoding distance of the
+matched faces (well below the 0.6 match tolerance means suspect matching
+is unaffected).
+
+Needs real photos with faces; camera-resolution images show the speedup.
+
+Usage:
+    python scripts/benchmark_face_detection.py IMAGES_DIR [--limit N]
+        [--megapixels 0.5,1,2] [--models hog,haar]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai.face_detector import FaceDetector, FACE_RECOGNITION_AVAILABLE
+from src.ai.image_context import ImageContext
+from src.utils.file_utils import get_file_category
+
+def _iou(a: dict, b: dict) -> float:
+    x0, y0 = max(a['x'], b['x']), max(a['y'], b['y'])
+    x1 = min(a['x'] + a['width'], b['x'] + b['width'])
+    y1 = min(a['y'] + a['height'], b['y'] + b['height'])
+    overlap = max(0, x1 - x0) * max(0, y1 - y0)
+    union = a['width'] * a['height'] + b['width'] * b['height'] - overlap
+    return overlap / union if union else 0.0
+
+def _run(detector: FaceDetector, paths: list) -> tuple:
+    """(faces per image, seconds per image); each image is decoded outside the timing"""
+    faces, timings = [], []
+    for path in paths:
+        context = ImageContext(path)
+        try:
+            context.rgb
+        except Exception:
+            faces.append([])
+            continue
+        started = time.perf_counter()
+        faces.append(detector.detect_faces(context))
+        timings.append(time.perf_counter() - started)
+    return faces, timings
+
+def _compare(reference: list, candidate: list) -> tuple:
+    """(recall, mean encoding distance of matched faces, extra faces)"""
+    found = total = extra = 0
+    distances = []
+    for ref_faces, faces in zip(reference, candidate):
+        total += len(ref_faces)
+        unmatched = list(faces)
+        for ref in ref_faces:
+            best = max(unmatched, key=lambda f: _iou(ref['bounding_box'], f['bounding_box']),
+                       default=None)
+            if best is None or _iou(ref['bounding_box'], best['bounding_box']) < 0.5:
+                continue
+            unmatched.remove(best)
+            found += 1
+            if ref['encoding'] is not None and best['encoding'] is not None:
+                distances.append(float(np.linalg.norm(
+                    np.frombuffer(ref['encoding'], dtype=np.float64)
+                    - np.frombuffer(best['encoding'], dtype=np.float64))))
+        extra += len(unmatched)
+
+    recall = found / total if total else 1.0
+    return recall, statistics.mean(distances) if distances else 0.0, extra
+
+def _print_row(name: str, timings: list, reference_time: float, compared: str):
+    mean = statistics.mean(timings) if timings else 0.0
+    p95 = sorted(timings)[int(len(timings) * 0.95)] if timings else 0.0
+    speedup = reference_time / mean if mean else 0.0
+    print(f"{name:<18}{mean * 1000:>9.0f}{p95 * 1000:>9.0f}{speedup:>9.1f}x  {compared}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark two-stage face detection')
+    parser.add_argument('images_dir', type=Path)
+    parser.add_argument('--limit', type=int, default=200)
+    parser.add_argument('--megapixels', default='0.5,1,2',
+                        help='Proposal image sizes to try')
+    parser.add_argument('--models', default='hog,haar', help='Proposal models to try')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Face Detection Benchmark")
+    print("=" * 60)
+
+    if not FACE_RECOGNITION_AVAILABLE:
+        print("face_recognition is not installed")
+        return 1
+
+    paths = [p for p in sorted(args.images_dir.rglob('*'))
+             if p.is_file() and get_file_category(p) == 'image'][:args.limit]
+    if not paths:
+        print("No images found")
+        return 1
+
+    print(f"\nImages: {len(paths)}")
+    reference, reference_timings = _run(FaceDetector(two_stage=False), paths)
+    reference_time = statistics.mean(reference_timings) if reference_timings else 0.0
+    print(f"Reference faces: {sum(len(f) for f in reference)}\n")
+
+    print(f"{'Detector':<18}{'mean ms':>9}{'p95 ms':>9}{'speedup':>10}  Recall")
+    _print_row('full resolution', reference_timings, reference_time, 'reference')
+
+    for model in [m.strip() for m in args.models.split(',') if m.strip()]:
+        for megapixels in [float(m) for m in args.megapixels.split(',') if m.strip()]:
+            detector = FaceDetector(two_stage=True, proposal_model=model,
+                                    proposal_megapixels=megapixels)
+            faces, timings = _run(detector, paths)
+            recall, distance, extra = _compare(reference, faces)
+            _print_row(f"{model} {megapixels:g} MP", timings, reference_time,
+                       f"{recall:.1%} (encoding distance {distance:.3f}, {extra} extra faces)")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark image analysis throughput
+
+Generates a synthetic JPEG corpus and reports images per second for
+one-image-at-a-time analysis (AIAnalyzer.run_analysis) and for the staged
+pipeline that batches the classifier (AIAnalyzer.iter_analysis), followed
+by the pipeline's per-stage statistics. The corpus is new on every run, so
+the analysis cache cannot serve it.
+
+Usage:
+    python scripts/benchmark_image_classification.py [--images N]
+        [--batch-size N] [--workers N] [--single-sample N]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from PIL import Image, ImageDraw
+
+from src.core.ai_analyzer import AIAnalyzer
+from src.core.ai_service import AIService
+
+def _build_corpus(directory: Path, count: int, seed: int = None) -> list:
+    """Write `count` camera-sized synthetic JPEGs (different ones each run unless seeded)"""
+    rng = random.Random(seed)
+    paths = []
+
+    for i in range(count):
+        image = Image.new('RGB', (1280, 960), tuple(rng.randrange(256) for _ in range(3)))
+        draw = ImageDraw.Draw(image)
+        for _ in range(12):
+            x, y = rng.randrange(1280), rng.randrange(960)
+            draw.rectangle([x, y, x + rng.randrange(40, 400), y + rng.randrange(40, 300)],
+                           fill=tuple(rng.randrange(256) for _ in range(3)))
+
+        path = directory / f'img_{i:06d}.jpg'
+        image.save(path, quality=85)
+        paths.append(path)
+
+        if (i + 1) % 1000 == 0:
+            print(f"  generated {i + 1}/{count}")
+
+    return paths
+
+def _file_data(paths: list) -> list:
+    """iter_analysis / run_analysis input for the corpus"""
+    return [
+        {'file_id': i, 'file_name': path.name, 'file_path': str(path), 'file_type': 'image'}
+        for i, path in enumerate(paths, 1)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark image analysis')
+    parser.add_argument('--images', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Image decoding threads of the pipeline')
+    parser.add_argument('--single-sample', type=int, default=500,
+                        help='Images analyzed one at a time (the rate is per image)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Image Analysis Benchmark")
+    print("=" * 60)
+
+    analyzer = AIAnalyzer(AIService())
+    analyzer.batch_size = args.batch_size
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"\nGenerating {args.images} images...")
+        files = _file_data(_build_corpus(Path(tmp), args.images))
+
+        # Loads every model before the timings
+        sample = files[:args.single_sample]
+        analyzer.run_analysis(sample[0])
+
+        started = time.perf_counter()
+        for file_data in sample:
+            analyzer.run_analysis(file_data)
+        single_rate = len(sample) / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        failed = sum(1 for _, results in analyzer.iter_analysis(files, decode_workers=args.workers)
+                     if isinstance(results, Exception) or results.get('partial'))
+        pipeline_elapsed = time.perf_counter() - started
+        pipeline_rate = len(files) / pipeline_elapsed
+
+    print(f"\n{'Mode':<28}{'Images':>10}{'Images/s':>12}")
+    print(f"{'one at a time':<28}{len(sample):>10}{single_rate:>12.1f}")
+    print(f"{f'pipeline, batch {args.batch_size}':<28}{len(files):>10}{pipeline_rate:>12.1f}")
+    print(f"\nPipeline: {pipeline_elapsed:.1f}s total, {failed} failed or partial, "
+          f"{pipeline_rate / single_rate:.1f}x the single-image rate\n")
+    for line in analyzer.pipeline_summary(analyzer.last_pipeline_stats):
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Compare the torch, ONNX and int8 ONNX inference backends
+
+Runs the image classifier and object detector with each backend on the
+same images and reports, per backend:
+    - latency of single-image inference (p50 / p95)
+    - throughput (images per second, classifier batched)
+    - agreement with torch: top-1 and top-5 overlap of the classifier, and
+      Jaccard similarity of the detected object classes
+
+ONNX models are exported (and quantized) into [Paths] models_dir the first
+time. The int8 classifier is quantized statically on --calibrate N of the
+images (default: [AI] int8_calibration_dir); without calibration images it
+runs as the onnx backend.
+
+Usage:
+    python scripts/benchmark_inference_backends.py [--images N | --images-dir DIR]
+        [--backends torch,onnx,onnx-int8] [--batch-size N] [--calibrate N]
+        [--no-detector]
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai.image_context import ImageContext
+from src.ai.image_classifier import ImageClassifier
+from src.ai.object_detector import ObjectDetector
+from src.ai import onnx_backend
+from src.utils.file_utils import get_file_category
+
+sys.path.insert(0, str(Path(__file__).parent))
+from benchmark_image_classification import _build_corpus
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def _time_each(func, contexts: list) -> tuple:
+    """(results, per-image seconds) of func on each image"""
+    results, timings = [], []
+    for context in contexts:
+        started = time.perf_counter()
+        results.append(func(context))
+        timings.append(time.perf_counter() - started)
+    return results, timings
+
+def _bench_classifier(backend: str, contexts: list, batch_size: int, calibration: list) -> dict:
+    classifier = ImageClassifier(backend=backend, calibration=calibration or None)
+
+    predictions, timings = _time_each(lambda c: classifier.classify_image(c, top_k=5), contexts)
+
+    # Batched forward passes, as the analysis pipeline's classify stage runs them
+    tensors = [classifier.preprocess(context) for context in contexts]
+    started = time.perf_counter()
+    for start in range(0, len(tensors), batch_size):
+        classifier.predict_batch(tensors[start:start + batch_size], top_k=5)
+    rate = len(tensors) / (time.perf_counter() - started)
+
+    return {'predictions': [[label for label, _ in p] for p in predictions],
+            'timings': timings, 'rate': rate}
+
+def _bench_detector(backend: str, contexts: list) -> dict:
+    detector = ObjectDetector(backend=backend)
+    if not detector.yolo_available:
+        return None
+
+    detections, timings = _time_each(detector.detect_objects, contexts)
+    return {'classes': [{d['class'] for d in found} for found in detections],
+            'timings': timings, 'rate': len(contexts) / sum(timings)}
+
+def _classifier_agreement(reference: list, predictions: list) -> tuple:
+    """(top-1 agreement, mean top-5 overlap) with the reference predictions"""
+    top1 = [bool(r and p and r[0] == p[0]) for r, p in zip(reference, predictions)]
+    top5 = [len(set(r) & set(p)) / len(r) for r, p in zip(reference, predictions) if r]
+    return statistics.mean(top1), statistics.mean(top5) if top5 else 0.0
+
+def _detector_agreement(reference: list, classes: list) -> float:
+    """Mean Jaccard similarity of detected classes (1 when both found nothing)"""
+    scores = [len(r & c) / len(r | c) if r | c else 1.0 for r, c in zip(reference, classes)]
+    return statistics.mean(scores)
+
+def _print_row(name: str, result: dict, agreement: str):
+    timings = [t * 1000 for t in result['timings']]
+    print(f"{name:<12}{_percentile(timings, 0.5):>9.1f}{_percentile(timings, 0.95):>9.1f}"
+          f"{result['rate']:>10.1f}  {agreement}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare inference backends')
+    parser.add_argument('--images', type=int, default=200,
+                        help='Synthetic images to generate')
+    parser.add_argument('--images-dir', type=Path, default=None,
+                        help='Benchmark on real images instead')
+    parser.add_argument('--backends', default=','.join(onnx_backend.BACKENDS))
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--calibrate', type=int, default=0,
+                        help='Images to calibrate static int8 quantization with')
+    parser.add_argument('--no-detector', action='store_true')
+    args = parser.parse_args()
+
+    backends = [b.strip() for b in args.backends.split(',') if b.strip()]
+    if 'torch' in backends:
+        backends.remove('torch')
+    backends.insert(0, 'torch')  # the reference for agreement
+
+    print("=" * 60)
+    print("Inference Backend Benchmark")
+    print("=" * 60)
+
+    if not onnx_backend.ONNXRUNTIME_AVAILABLE:
+        print("onnxruntime is not installed; only torch can be measured")
+        backends = ['torch']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.images_dir:
+            paths = [p for p in sorted(args.images_dir.rglob('*'))
+                     if p.is_file() and get_file_category(p) == 'image']
+        else:
+            print(f"\nGenerating {args.images} images...")
+            paths = _build_corpus(Path(tmp), args.images)
+
+        if not paths:
+            print("No images found")
+            return 1
+
+        contexts = [ImageContext(path) for path in paths]
+        for context in contexts:
+            context.bgr  # decode once, outside the timings
+
+        calibration = paths[:args.calibrate]
+
+        print(f"\nImages: {len(paths)}")
+        print("\nImage classifier")
+        print(f"{'Backend':<12}{'p50 ms':>9}{'p95 ms':>9}{'img/s':>10}  Agreement with torch")
+        reference = None
+        for backend in backends:
+            result = _bench_classifier(backend, contexts, args.batch_size, calibration)
+            if reference is None:
+                reference = result['predictions']
+                agreement = 'reference'
+            else:
+                top1, top5 = _classifier_agreement(reference, result['predictions'])
+                agreement = f"top-1 {top1:.1%}, top-5 {top5:.1%}"
+            _print_row(backend, result, agreement)
+
+        if args.no_detector:
+            return 0
+
+        print("\nObject detector")
+        print(f"{'Backend':<12}{'p50 ms':>9}{'p95 ms':>9}{'img/s':>10}  Agreement with torch")
+        reference = None
+        for backend in backends:
+            result = _bench_detector(backend, contexts)
+            if result is None:
+                print("ultralytics is not installed")
+                break
+            if reference is None:
+                reference = result['classes']
+                agreement = 'reference'
+            else:
+                agreement = f"class Jaccard {_detector_agreement(reference, result['classes']):.1%}"
+            _print_row(backend, result, agreement)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
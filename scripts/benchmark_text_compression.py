@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark large text column compression
+
+Builds a synthetic case database per method (none, zlib, lzma) and reports
+database size, list-scan time (the columns FileRepository lists), full text
+read time, and full-text search time.
+
+Usage:
+    python scripts/benchmark_text_compression.py [--files N] [--text-bytes N]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.db_manager import DatabaseManager
+from src.database.compression import compress_text, decompress_text
+from src.database.file_repository import FileRepository, LIST_COLUMNS
+
+WORDS = (
+    'invoice payment account transfer bank upi rupees total amount date time '
+    'whatsapp message call number name address police station receipt order '
+    'customer mobile otp verify balance credit debit card reference transaction'
+).split()
+
+def _build(path: Path, method: str, files: int, text_bytes: int, seed: int = 7):
+    """Create a case database with synthetic OCR text"""
+    rng = random.Random(seed)
+    db = DatabaseManager(path)
+
+    with db.transaction() as conn:
+        rows = []
+        for i in range(files):
+            words, size = [], 0
+            while size < text_bytes:
+                word = rng.choice(WORDS)
+                words.append(word)
+                size += len(word) + 1
+            text = ' '.join(words)
+            rows.append((i + 1, 1, f'img_{i}.jpg', 'image', f'2024-01-{i % 28 + 1:02d}',
+                         f'/evidence/img_{i}.jpg', compress_text(text, method=method, min_bytes=0)))
+
+        conn.executemany('''
+            INSERT INTO evidence_files (file_id, case_id, file_name, file_type, date_taken, has_text)
+            VALUES (?, ?, ?, ?, ?, 1)
+        ''', [row[:5] for row in rows])
+        conn.executemany('''
+            INSERT INTO evidence_file_details (file_id, file_path, ocr_text)
+            VALUES (?, ?, ?)
+        ''', [(row[0], row[5], row[6]) for row in rows])
+        FileRepository.reindex_text(conn)
+
+    with db.transaction() as conn:
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    return db
+
+def _timed(func) -> float:
+    """Run func and return elapsed seconds"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark text column compression')
+    parser.add_argument('--files', type=int, default=20000)
+    parser.add_argument('--text-bytes', type=int, default=1000)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Text Compression Benchmark ({args.files} files, ~{args.text_bytes} bytes text)")
+    print("=" * 60)
+    print(f"{'method':<8}{'size MB':>10}{'list scan s':>14}{'text read s':>14}{'fts s':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for method in ('none', 'zlib', 'lzma'):
+            path = Path(tmp) / f'bench_{method}.db'
+            db = _build(path, method, args.files, args.text_bytes)
+
+            conn = db.get_connection()
+            scan = _timed(lambda: conn.execute(
+                f'SELECT {LIST_COLUMNS} FROM evidence_files WHERE case_id = 1 ORDER BY date_taken DESC'
+            ).fetchall())
+            read = _timed(lambda: [decompress_text(row[0]) for row in
+                                   conn.execute('SELECT ocr_text FROM evidence_file_details')])
+            fts = _timed(lambda: conn.execute(
+                "SELECT rowid FROM evidence_text_fts WHERE evidence_text_fts MATCH 'otp'"
+            ).fetchall())
+            conn.close()
+
+            size = path.stat().st_size / 1e6
+            print(f"{method:<8}{size:>10.1f}{scan:>14.3f}{read:>14.3f}{fts:>10.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Database migration script to compress existing large text columns
+(ocr_text, analyst_notes) and build the full-text index
+
+Uses [Database] text_compression / text_compression_min_bytes. Safe to run
+more than once; values that are already compressed are left alone.
+"""
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.db_manager import get_db_manager, get_case_db
+from src.database.file_repository import FileRepository
+from src.database.compression import compress_text
+
+BATCH_SIZE = 2000
+
+def _compress_case(case_id: int) -> int:
+    """Compress plain-text values of one case; returns rows rewritten"""
+    case_db = get_case_db(case_id)
+    rewritten = 0
+    last_id = 0
+
+    while True:
+        with case_db.transaction() as conn:
+            rows = conn.execute('''
+                SELECT file_id, ocr_text, analyst_notes FROM evidence_file_details
+                WHERE file_id > ? AND (typeof(ocr_text) = 'text' OR typeof(analyst_notes) = 'text')
+                ORDER BY file_id LIMIT ?
+            ''', (last_id, BATCH_SIZE)).fetchall()
+
+            if not rows:
+                break
+
+            updates = []
+            for row in rows:
+                ocr_text = compress_text(row['ocr_text'])
+                notes = compress_text(row['analyst_notes'])
+                if ocr_text is not row['ocr_text'] or notes is not row['analyst_notes']:
+                    updates.append((ocr_text, notes, row['file_id']))
+
+            conn.executemany(
+                'UPDATE evidence_file_details SET ocr_text = ?, analyst_notes = ? WHERE file_id = ?',
+                updates
+            )
+            rewritten += len(updates)
+            last_id = rows[-1]['file_id']
+
+    return rewritten
+
+def migrate_database():
+    """Compress text columns and rebuild the full-text index of every case"""
+    catalog = get_db_manager()
+    file_repo = FileRepository()
+
+    try:
+        case_ids = [row['case_id'] for row in catalog.execute_query('SELECT case_id FROM cases')]
+        print(f"Processing {len(case_ids)} case(s)...")
+
+        for case_id in case_ids:
+            rewritten = _compress_case(case_id)
+            # Index is rebuilt after compressing, from the decompressed text
+            indexed = file_repo.rebuild_text_index(case_id)
+            print(f"  Case {case_id}: {rewritten} rows compressed, {indexed} rows indexed")
+
+        print("✓ Migration completed successfully!")
+
+    except sqlite3.Error as e:
+        print(f"✗ Database error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Database Migration: Compress Text Columns")
+    print("=" * 60)
+    migrate_database()
+    print("\nMigration process complete.")
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Measure the OCR text prefilter on a labeled image sample
+
+Labels come from one of:
+    --labels labels.csv   CSV with columns path,has_text (1/0, true/false)
+    sample directory      with text/ and no_text/ subdirectories
+    --ocr                 full OCR of every image, with the same rule the
+                          analyzer uses (text found with confidence > 0.5)
+
+Prints precision and recall of "send to OCR" at the configured threshold and
+for a range of thresholds, with the share of images whose OCR is skipped.
+
+Usage:
+    python scripts/evaluate_text_prefilter.py SAMPLE_DIR [--labels CSV] [--ocr]
+        [--threshold T] [--size N]
+"""
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai.image_context import ImageContext
+from src.ai.text_prefilter import TextPrefilter
+from src.utils.file_utils import get_file_category
+
+SWEEP = (0.0005, 0.001, 0.002, 0.003, 0.005, 0.0075, 0.01, 0.02, 0.05)
+
+def _truthy(value: str) -> bool:
+    return value.strip().lower() in ('1', 'true', 'yes', 'y')
+
+def _labels_from_csv(sample: Path, labels_path: Path) -> dict:
+    """path -> has_text from a CSV (paths relative to the sample directory)"""
+    labels = {}
+    with open(labels_path, newline='') as f:
+        for row in csv.DictReader(f):
+            labels[sample / row['path']] = _truthy(row['has_text'])
+    return labels
+
+def _labels_from_dirs(sample: Path) -> dict:
+    """path -> has_text from text/ and no_text/ subdirectories"""
+    labels = {}
+    for name, has_text in (('text', True), ('no_text', False)):
+        for path in sorted((sample / name).rglob('*')):
+            if path.is_file() and get_file_category(path) == 'image':
+                labels[path] = has_text
+    return labels
+
+def _labels_from_ocr(sample: Path) -> dict:
+    """path -> has_text by running full OCR"""
+    from src.ai.ocr_engine import OCREngine
+    from src.utils.config_loader import get_config
+
+    engine = OCREngine(get_config().get('OCR', 'tesseract_path'))
+    labels = {}
+    paths = [p for p in sorted(sample.rglob('*')) if p.is_file() and get_file_category(p) == 'image']
+    for i, path in enumerate(paths, 1):
+        result = engine.extract_text(path)
+        labels[path] = result['has_text'] and result['confidence'] > 0.5
+        if i % 100 == 0:
+            print(f"  OCR labeled {i}/{len(paths)}")
+    return labels
+
+def _metrics(scores: dict, labels: dict, threshold: float) -> tuple:
+    """(precision, recall, skipped share) of score >= threshold"""
+    tp = fp = fn = skipped = 0
+    for path, score in scores.items():
+        predicted = score >= threshold
+        if predicted and labels[path]:
+            tp += 1
+        elif predicted:
+            fp += 1
+        else:
+            skipped += 1
+            if labels[path]:
+                fn += 1
+
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return precision, recall, skipped / len(scores) if scores else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate the OCR text prefilter')
+    parser.add_argument('sample', type=Path, help='Directory of sample images')
+    parser.add_argument('--labels', type=Path, default=None,
+                        help='CSV with path,has_text columns')
+    parser.add_argument('--ocr', action='store_true',
+                        help='Label images by running full OCR')
+    parser.add_argument('--threshold', type=float, default=None,
+                        help='Threshold to report (default: [OCR] prefilter_threshold)')
+    parser.add_argument('--size', type=int, default=None,
+                        help='Prefilter image size (default: [OCR] prefilter_size)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("OCR Text Prefilter Evaluation")
+    print("=" * 60)
+
+    if args.labels:
+        labels = _labels_from_csv(args.sample, args.labels)
+    elif args.ocr:
+        labels = _labels_from_ocr(args.sample)
+    else:
+        labels = _labels_from_dirs(args.sample)
+
+    if not labels:
+        print("No labeled images found")
+        return 1
+
+    configured = TextPrefilter.from_config() or TextPrefilter()
+    threshold = args.threshold if args.threshold is not None else configured.threshold
+    prefilter = TextPrefilter(threshold, args.size or configured.shorter_side)
+
+    scores = {}
+    started = time.perf_counter()
+    for path in labels:
+        try:
+            scores[path] = prefilter.score(ImageContext(path))
+        except Exception as e:
+            print(f"  skipped {path.name}: {e}")
+    elapsed = time.perf_counter() - started
+
+    with_text = sum(1 for path in scores if labels[path])
+    print(f"\nImages: {len(scores)} ({with_text} with text)")
+    print(f"Prefilter: {elapsed / max(1, len(scores)) * 1000:.1f} ms per image "
+          f"(decode included), size {prefilter.shorter_side}")
+
+    precision, recall, skipped = _metrics(scores, labels, threshold)
+    print(f"\nThreshold {threshold}: precision {precision:.1%}, recall {recall:.1%}, "
+          f"OCR skipped on {skipped:.1%} of images")
+
+    print(f"\n{'Threshold':>10}{'Precision':>11}{'Recall':>9}{'Skipped':>9}")
+    for value in sorted(set(SWEEP + (threshold,))):
+        precision, recall, skipped = _metrics(scores, labels, value)
+        print(f"{value:>10g}{precision:>11.1%}{recall:>9.1%}{skipped:>9.1%}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,28 @@
 """
 Generate demo data for testing
 """
-import sqlite3
+import sys
 from pathlib import Path
 from datetime import datetime, timedelta
 import random
 import json
 
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.case_repository import CaseRepository
+from src.database.file_repository import FileRepository
+from src.database.audit_repository import AuditRepository
+
 def generate_demo_data():
     """Generate demo cases and files"""
     
     print("Generating demo data...")
     
-    # Create data directory
-    data_dir = Path('./data')
-    data_dir.mkdir(exist_ok=True)
-    
-    db_path = data_dir / 'forenstiq_cases.db'
-    
-    # Connect to database
-    conn = sqlite3.connect(str(db_path))
-    cursor = conn.cursor()
-    
-    # Load schema
-    schema_path = Path('./src/database/schema.sql')
-    with open(schema_path, 'r') as f:
-        schema_sql = f.read()
-        conn.executescript(schema_sql)
+    # Repositories create the catalog and per-case databases as needed
+    case_repo = CaseRepository()
+    file_repo = FileRepository()
+    audit_repo = AuditRepository()
     
     # Demo cases
     demo_cases = [
@@ -61,21 +57,7 @@ def generate_demo_data():
     
     case_ids = []
     for case in demo_cases:
-        cursor.execute('''
-            INSERT INTO cases (
-                case_number, case_name, investigator_name, agency_name,
-                incident_date, status, notes
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            case['case_number'],
-            case['case_name'],
-            case['investigator_name'],
-            case['agency_name'],
-            case['incident_date'],
-            case['status'],
-            case['notes']
-        ))
-        case_ids.append(cursor.lastrowid)
+        case_ids.append(case_repo.create_case(case))
     
     # Demo files (mock data - no actual files)
     file_types = ['image', 'video', 'document']
@@ -120,55 +102,42 @@ def generate_demo_data():
                 file_data['camera_make'] = random.choice(['Apple', 'Samsung', 'OnePlus', 'Google'])
                 file_data['camera_model'] = random.choice(['iPhone 13', 'Galaxy S21', 'OnePlus 9', 'Pixel 6'])
             
+            # Insert file
+            file_id = file_repo.add_file(file_data)
+            
             # AI analysis (for some files)
             if random.random() > 0.3:
-                file_data['ai_processed'] = 1
-                file_data['ai_tags'] = json.dumps(random.choice(sample_tags))
-                file_data['ai_confidence'] = random.uniform(0.6, 0.95)
-                file_data['face_count'] = random.randint(0, 3)
+                tags = random.choice(sample_tags)
+                analysis = {
+                    'ai_tags': json.dumps(tags),
+                    'tags': tags,
+                    'ai_confidence': random.uniform(0.6, 0.95),
+                    'face_count': random.randint(0, 3)
+                }
                 
                 if random.random() > 0.7:
-                    file_data['ocr_text'] = f'Sample text extracted from image {i}'
+                    analysis['ocr_text'] = f'Sample text extracted from image {i}'
+                
+                file_repo.update_ai_analysis(file_id, analysis)
             
             # Flagged (some files)
             if random.random() > 0.8:
-                file_data['is_flagged'] = 1
-                file_data['flag_reason'] = 'Contains suspicious content'
-            
-            # Insert file
-            columns = ', '.join(file_data.keys())
-            placeholders = ', '.join(['?' for _ in file_data])
-            query = f'INSERT INTO evidence_files ({columns}) VALUES ({placeholders})'
-            
-            cursor.execute(query, tuple(file_data.values()))
+                file_repo.flag_file(file_id, 'Contains suspicious content')
     
     # Update case file counts
     for case_id in case_ids:
-        cursor.execute('''
-            UPDATE cases 
-            SET total_files = (SELECT COUNT(*) FROM evidence_files WHERE case_id = ?),
-                total_flagged = (SELECT COUNT(*) FROM evidence_files WHERE case_id = ? AND is_flagged = 1)
-            WHERE case_id = ?
-        ''', (case_id, case_id, case_id))
+        case_repo.update_file_counts(case_id)
     
     # Add some audit logs
     for case_id in case_ids:
-        cursor.execute('''
-            INSERT INTO audit_log (case_id, user_name, action, details)
-            VALUES (?, ?, ?, ?)
-        ''', (case_id, 'Demo User', 'create_case', json.dumps({'source': 'demo_data'})))
-        
-        cursor.execute('''
-            INSERT INTO audit_log (case_id, user_name, action, details)
-            VALUES (?, ?, ?, ?)
-        ''', (case_id, 'Demo User', 'import_files', json.dumps({'count': 20})))
+        audit_repo.log_action('create_case', case_id, 'Demo User', {'source': 'demo_data'})
+        audit_repo.log_action('import_files', case_id, 'Demo User', {'count': 20})
     
-    conn.commit()
-    conn.close()
+    audit_repo.flush()
     
     print(f"✓ Demo data generated successfully!")
     print(f"  - Created {len(demo_cases)} demo cases")
-    print(f"  - Database location: {db_path}")
+    print(f"  - Database location: {case_repo.db.db_path}")
     print(f"\nYou can now run the application and open these demo cases.")
 
 if __name__ == '__main__':
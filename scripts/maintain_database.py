@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Run database maintenance now
+
+Runs ANALYZE, PRAGMA optimize, a WAL checkpoint and incremental vacuum on the
+catalog and every case database, or only PRAGMA quick_check with --check.
+See src/database/maintenance.py.
+
+Usage:
+    python scripts/maintain_database.py [--check] [--case CASE_ID]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.db_manager import get_db_manager, case_db_path
+from src.database.maintenance import get_maintenance, IMPORT_TASKS
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintain Forenstiq databases')
+    parser.add_argument('--check', action='store_true',
+                        help='Only run PRAGMA quick_check')
+    parser.add_argument('--case', type=int, default=None,
+                        help='Only this case database')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Forenstiq Database Maintenance")
+    print("=" * 60)
+
+    catalog = get_db_manager()
+    if args.case is not None:
+        paths = [case_db_path(args.case)]
+    else:
+        paths = [catalog.db_path]
+        for row in catalog.execute_query('SELECT case_id FROM cases ORDER BY case_id'):
+            paths.append(case_db_path(row['case_id']))
+
+    tasks = ('quick_check',) if args.check else IMPORT_TASKS + ('vacuum',)
+    maintenance = get_maintenance()
+    failed = False
+
+    for path in paths:
+        if not path.exists():
+            continue
+
+        result = maintenance.run_tasks(path, tasks)
+        timings = ', '.join(f"{task} {seconds * 1000:.0f}ms"
+                            for task, seconds in result['timings'].items())
+
+        if result.get('quick_check'):
+            failed = True
+            print(f"✗ {path.name}: {len(result['quick_check'])} problem(s) ({timings})")
+            for problem in result['quick_check'][:20]:
+                print(f"    {problem}")
+        else:
+            print(f"✓ {path.name}: {timings}")
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Rebuild the incrementally maintained case statistics (case_stats tables)
+
+Run once after upgrading an existing database, or whenever the dashboard
+counts look wrong.
+
+Usage:
+    python scripts/rebuild_case_stats.py [--case-id N]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.case_repository import CaseRepository
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild case statistics')
+    parser.add_argument('--case-id', type=int, default=None,
+                        help='Rebuild a single case (default: all cases)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Rebuild Case Statistics")
+    print("=" * 60)
+
+    case_repo = CaseRepository()
+    rebuilt = case_repo.rebuild_case_statistics(args.case_id)
+
+    print(f"✓ Rebuilt statistics for {rebuilt} case(s)")
+
+if __name__ == "__main__":
+    main()
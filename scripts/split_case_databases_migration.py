@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Database migration script to move evidence out of the shared database into
+per-case database files
+
+The shared database becomes the catalog (cases, audit log, settings). Each
+case's files, faces, objects and tags are copied into data/cases/case_N.db
+with IDs rebased into the case's ID range, then the shared tables are dropped.
+Files whose AI tags only exist as JSON (analyzed before tags were normalized)
+get their tag links here too; case databases migrate themselves afterwards
+(see src/database/migrations.py).
+"""
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.db_manager import (
+    get_db_manager, get_case_db, CASE_ID_SHIFT
+)
+from src.database.case_repository import CaseRepository
+from src.database.file_repository import FileRepository
+from src.database.migrations import backfill_ai_tags
+
+# Child tables first so foreign keys are satisfied on drop
+LEGACY_TABLES = [
+    'file_tags', 'tags', 'face_detections', 'object_detections',
+    'case_stats', 'case_type_stats', 'case_date_stats', 'evidence_files'
+]
+
+def _columns(conn: sqlite3.Connection, schema: str, table: str) -> list:
+    """Get column names of a table in an attached schema"""
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+def _copy_case(case_id: int, legacy_path: Path):
+    """Copy one case from the shared database into its own database"""
+    base = case_id << CASE_ID_SHIFT
+    case_db = get_case_db(case_id)
+
+    with case_db.attached({'legacy': legacy_path}) as conn:
+        if conn.execute('SELECT COUNT(*) FROM evidence_files').fetchone()[0]:
+            print(f"  Case {case_id}: already migrated, skipping")
+            return
+
+        # Evidence files, split into the hot table and the details table
+        # (columns present in both schemas)
+        legacy_cols = _columns(conn, 'legacy', 'evidence_files')
+        hot_cols = [c for c in _columns(conn, 'main', 'evidence_files')
+                    if c in legacy_cols and c != 'file_id']
+        col_list = ', '.join(hot_cols)
+        has_text = "IFNULL(ocr_text, '') != ''" if 'ocr_text' in legacy_cols else '0'
+        cursor = conn.execute(f"""
+            INSERT INTO evidence_files (file_id, has_text, {col_list})
+            SELECT file_id + ?, {has_text}, {col_list} FROM legacy.evidence_files WHERE case_id = ?
+        """, (base, case_id))
+        file_count = cursor.rowcount
+
+        detail_cols = [c for c in _columns(conn, 'main', 'evidence_file_details')
+                       if c in legacy_cols and c != 'file_id']
+        col_list = ', '.join(detail_cols)
+        conn.execute(f"""
+            INSERT INTO evidence_file_details (file_id, {col_list})
+            SELECT file_id + ?, {col_list} FROM legacy.evidence_files WHERE case_id = ?
+        """, (base, case_id))
+        FileRepository.reindex_text(conn)
+
+        # Tags used by this case
+        conn.execute("""
+            INSERT INTO tags (tag_id, tag_name, tag_category, created_date)
+            SELECT tag_id, tag_name, tag_category, created_date FROM legacy.tags
+            WHERE tag_id IN (
+                SELECT ft.tag_id FROM legacy.file_tags ft
+                JOIN legacy.evidence_files ef ON ef.file_id = ft.file_id
+                WHERE ef.case_id = ?
+            )
+        """, (case_id,))
+        conn.execute("""
+            INSERT INTO file_tags (file_id, tag_id, source)
+            SELECT ft.file_id + ?, ft.tag_id, IIF(t.tag_category = 'ai', 'ai', 'analyst')
+            FROM legacy.file_tags ft
+            JOIN legacy.tags t ON t.tag_id = ft.tag_id
+            JOIN legacy.evidence_files ef ON ef.file_id = ft.file_id
+            WHERE ef.case_id = ?
+        """, (base, case_id))
+        backfill_ai_tags(conn)
+
+        # Face and object detections
+        conn.execute("""
+            INSERT INTO face_detections (
+                face_id, file_id, case_id, face_encoding, bounding_box,
+                confidence, face_cluster_id, identified_person
+            )
+            SELECT face_id + ?, file_id + ?, case_id, face_encoding, bounding_box,
+                   confidence, face_cluster_id, identified_person
+            FROM legacy.face_detections WHERE case_id = ?
+        """, (base, base, case_id))
+        conn.execute("""
+            INSERT INTO object_detections (
+                detection_id, file_id, case_id, object_class, confidence, bounding_box
+            )
+            SELECT detection_id + ?, file_id + ?, case_id, object_class, confidence, bounding_box
+            FROM legacy.object_detections WHERE case_id = ?
+        """, (base, base, case_id))
+
+    print(f"  Case {case_id}: {file_count} files -> {case_db.db_path}")
+
+def migrate_database():
+    """Split the shared database into per-case databases"""
+    catalog = get_db_manager()
+    legacy_path = catalog.db_path
+
+    print(f"Migrating database: {legacy_path}")
+
+    try:
+        conn = sqlite3.connect(legacy_path)
+
+        has_legacy = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'evidence_files'"
+        ).fetchone()
+
+        if not has_legacy:
+            print("✓ No shared evidence tables found. No migration needed.")
+            conn.close()
+            return
+
+        case_ids = [row[0] for row in conn.execute('SELECT case_id FROM cases')]
+        conn.close()
+
+        print(f"Moving {len(case_ids)} case(s) into per-case databases...")
+        case_repo = CaseRepository()
+        for case_id in case_ids:
+            _copy_case(case_id, legacy_path)
+            case_repo.update_file_counts(case_id)
+
+        print("Dropping shared evidence tables from catalog...")
+        conn = sqlite3.connect(legacy_path)
+        for table in LEGACY_TABLES:
+            conn.execute(f'DROP TABLE IF EXISTS {table}')
+        conn.commit()
+        conn.execute('VACUUM')
+        conn.close()
+
+        print("✓ Migration completed successfully!")
+
+    except sqlite3.Error as e:
+        print(f"✗ Database error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Database Migration: Per-Case Database Files")
+    print("=" * 60)
+    migrate_database()
+    print("\nMigration process complete.")
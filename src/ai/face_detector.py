@@ -4,8 +4,10 @@ Face detection and recognition
 import cv2
 import numpy as np
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Union
+import math
 import pickle
+from .image_context import ImageContext
 
 try:
     import face_recognition
@@ -14,14 +16,63 @@ except ImportError:
     FACE_RECOGNITION_AVAILABLE = False
     print("Warning: face_recognition library not available. Face detection disabled.")
 
+# Defaults, overridden by [AI] face_* options
+PROPOSAL_MODELS = ('hog', 'haar')
+DEFAULT_PROPOSAL_MEGAPIXELS = 1.0
+
+# Proposals are padded by this share of their size before refining
+PROPOSAL_PADDING = 0.3
+
+# Padded proposals are resized so the face is about this wide for refining
+REFINE_FACE_SIZE = 160
+
 class FaceDetector:
-    """Detect and recognize faces in images"""
+    """
+    Detect and recognize faces in images
+
+    With dlib available, faces are found in two stages. Proposals come from
+    a downscaled copy of the image (HOG or the Haar cascade), scaled so it
+    has about proposal_megapixels whatever the camera resolution. Each
+    proposal is mapped back to full resolution, padded, and refined with HOG
+    on that crop alone, and landmarks and encodings are computed only inside
+    the refined boxes. On 12-48 MP photos this avoids running the detector
+    over the whole full-resolution image.
+
+    two_stage=False keeps the single full-resolution pass (see
+    scripts/benchmark_face_detection.py for recall against speed).
+    """
     
-    def __init__(self):
+    def __init__(self, two_stage: bool = True, proposal_model: str = 'hog',
+                 proposal_megapixels: float = DEFAULT_PROPOSAL_MEGAPIXELS):
+        """
+        Args:
+            two_stage: Propose faces on a downscaled copy first
+            proposal_model: 'hog' or 'haar'
+            proposal_megapixels: Size of the downscaled copy
+        """
+        if proposal_model not in PROPOSAL_MODELS:
+            raise ValueError(f"Unknown face proposal model: {proposal_model}")
+
         self.face_cascade = None
         self.use_dlib = FACE_RECOGNITION_AVAILABLE
+        self.two_stage = two_stage
+        self.proposal_model = proposal_model
+        self.proposal_megapixels = proposal_megapixels
         self._load_cascade()
     
+    @classmethod
+    def from_config(cls) -> 'FaceDetector':
+        """Create from settings.ini ([AI] face_two_stage / face_proposal_*)"""
+        from ..utils.config_loader import get_config
+        config = get_config()
+
+        return cls(
+            two_stage=config.get_bool('AI', 'face_two_stage', True),
+            proposal_model=config.get('AI', 'face_proposal_model', 'hog').strip().lower(),
+            proposal_megapixels=config.get_float('AI', 'face_proposal_megapixels',
+                                                 DEFAULT_PROPOSAL_MEGAPIXELS)
+        )
+    
     def _load_cascade(self):
         """Load Haar Cascade for face detection (fallback)"""
         try:
@@ -30,34 +81,120 @@ class FaceDetector:
         except Exception as e:
             print(f"Error loading face cascade: {e}")
     
-    def detect_faces(self, image_path: Path) -> List[Dict]:
+    def detect_faces(self, image: Union[Path, ImageContext],
+                     raise_errors: bool = False) -> List[Dict]:
         """
         Detect faces in image
         
+        Args:
+            image: Path to image, or its decoded ImageContext
+            raise_errors: Raise detection errors instead of returning no faces
+        
         Returns:
             List of face dictionaries with bounding boxes and encodings
         """
         faces = []
+        context = ImageContext.of(image)
         
         try:
-            if self.use_dlib:
-                faces = self._detect_faces_dlib(image_path)
+            if self.use_dlib and self.two_stage:
+                faces = self._detect_faces_two_stage(context)
+            elif self.use_dlib:
+                faces = self._detect_faces_dlib(context)
             else:
-                faces = self._detect_faces_opencv(image_path)
+                faces = self._detect_faces_opencv(context)
         except Exception as e:
-            print(f"Error detecting faces in {image_path}: {e}")
+            if raise_errors:
+                raise
+            print(f"Error detecting faces in {context.path}: {e}")
         
         return faces
     
-    def _detect_faces_dlib(self, image_path: Path) -> List[Dict]:
+    def _detect_faces_dlib(self, context: ImageContext) -> List[Dict]:
         """Detect faces using face_recognition library (dlib)"""
-        # Load image
-        image = face_recognition.load_image_file(str(image_path))
+        # RGB array, as face_recognition.load_image_file returns
+        image = context.rgb
         
         # Detect face locations
         face_locations = face_recognition.face_locations(image)
         
-        # Get face encodings
+        return self._encode_faces(image, face_locations)
+    
+    def _detect_faces_two_stage(self, context: ImageContext) -> List[Dict]:
+        """Propose faces on a downscaled copy, then refine and encode at full resolution"""
+        height, width = context.shape
+        scale = self.proposal_scale(width, height)
+        
+        if scale >= 1:
+            # Already small: the single pass is as fast as proposing
+            return self._detect_faces_dlib(context)
+        
+        small = context.downscaled(max(1, math.floor(min(width, height) * scale)))
+        scale = small.shape[0] / height
+        
+        face_locations = []
+        for top, right, bottom, left in self._propose(small):
+            box = (top / scale, right / scale, bottom / scale, left / scale)
+            face_locations.append(self._refine(context.rgb, box))
+        
+        return self._encode_faces(context.rgb, face_locations)
+    
+    def proposal_scale(self, width: int, height: int) -> float:
+        """Downscale factor giving about proposal_megapixels (1 = no downscaling)"""
+        return min(1.0, math.sqrt(self.proposal_megapixels * 1e6 / (width * height)))
+    
+    def _propose(self, rgb: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """Face boxes (top, right, bottom, left) in a downscaled image"""
+        if self.proposal_model == 'haar' and self.face_cascade is not None:
+            gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+            rects = self.face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5,
+                                                       minSize=(20, 20))
+            return [(int(y), int(x + w), int(y + h), int(x)) for (x, y, w, h) in rects]
+        
+        # Upsampling once finds faces down to about 40 px in the small copy
+        return face_recognition.face_locations(rgb, number_of_times_to_upsample=1, model='hog')
+    
+    def _refine(self, image: np.ndarray,
+                box: Tuple[float, float, float, float]) -> Tuple[int, int, int, int]:
+        """
+        Refine a full-resolution face box with HOG on its padded crop
+        
+        Landmarks expect HOG-framed boxes, so Haar proposals and scaled-up
+        boxes are re-detected; the proposal is kept if HOG finds nothing.
+        """
+        top, right, bottom, left = box
+        height, width = image.shape[:2]
+        pad = PROPOSAL_PADDING * max(right - left, bottom - top)
+        
+        y0, x0 = max(0, int(top - pad)), max(0, int(left - pad))
+        y1, x1 = min(height, int(bottom + pad)), min(width, int(right + pad))
+        proposal = (int(top), int(right), int(bottom), int(left))
+        if y1 <= y0 or x1 <= x0:
+            return proposal
+        
+        crop = image[y0:y1, x0:x1]
+        factor = min(1.0, REFINE_FACE_SIZE / max(1.0, right - left))
+        if factor < 1:
+            crop = cv2.resize(crop, (max(1, round(crop.shape[1] * factor)),
+                                     max(1, round(crop.shape[0] * factor))),
+                              interpolation=cv2.INTER_AREA)
+        
+        # HOG needs about 80 px faces without upsampling
+        upsample = 1 if (right - left) * factor < 100 else 0
+        found = face_recognition.face_locations(crop, number_of_times_to_upsample=upsample,
+                                                model='hog')
+        if not found:
+            return proposal
+        
+        # The largest face in the crop is the proposed one
+        t, r, b, l = max(found, key=lambda f: (f[1] - f[3]) * (f[2] - f[0]))
+        return (y0 + int(t / factor), x0 + int(r / factor),
+                y0 + int(b / factor), x0 + int(l / factor))
+    
+    def _encode_faces(self, image: np.ndarray,
+                      face_locations: List[Tuple[int, int, int, int]]) -> List[Dict]:
+        """Face dictionaries with encodings computed inside the given boxes"""
+        # Landmarks and encodings only look at the located faces
         face_encodings = face_recognition.face_encodings(image, face_locations)
         
         faces = []
@@ -78,11 +215,9 @@ class FaceDetector:
         
         return faces
     
-    def _detect_faces_opencv(self, image_path: Path) -> List[Dict]:
+    def _detect_faces_opencv(self, context: ImageContext) -> List[Dict]:
         """Detect faces using OpenCV Haar Cascade (fallback)"""
-        # Load image
-        image = cv2.imread(str(image_path))
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = context.gray
         
         # Detect faces
         face_rects = self.face_cascade.detectMultiScale(
@@ -201,6 +201,35 @@ class FaceMatcher:
             print(f"Error creating annotated image: {e}")
             return False
 
+    def match_case(self, case_id: int, top_k: Optional[int] = None) -> List[Dict]:
+        """
+        Find the suspect among the faces stored for a case
+
+        Uses the encodings saved during analysis (see FaceIndex), so no image
+        is decoded. Images this cannot cover are listed by unmatched_file_ids.
+
+        Args:
+            case_id: Case to search
+            top_k: Keep only the top_k closest faces
+
+        Returns:
+            List of {'file_id', 'face_ids', 'distance', 'confidence',
+            'match_count'}, best match first
+        """
+        if not self.suspect_encodings:
+            return []
+
+        from ..database.face_index import get_face_index
+        index = get_face_index(case_id)
+        index.sync()
+        return index.match_files(np.array(self.suspect_encodings), self.tolerance, top_k)
+
+    @staticmethod
+    def unmatched_file_ids(case_id: int) -> set:
+        """IDs of analyzed files with faces but no stored encodings (check those per image)"""
+        from ..database.face_repository import FaceRepository
+        return set(FaceRepository().get_unstored_file_ids(case_id))
+
     def batch_match_images(self, image_paths: List[Path],
                           progress_callback=None) -> List[Dict]:
         """
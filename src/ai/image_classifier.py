@@ -4,31 +4,42 @@ Image classification using pre-trained models
 import torch
 import torchvision.models as models
 import torchvision.transforms as transforms
-from PIL import Image
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
 import json
+from .image_context import ImageContext
+from . import onnx_backend
+
+# Resize(256) input size; decoded images are downscaled to twice that first
+CLASSIFIER_SHORTER_SIDE = 512
+
+# Model file name stem in [Paths] models_dir for the ONNX backends
+ONNX_MODEL_NAME = 'resnet50'
 
 class ImageClassifier:
     """Classify images using deep learning"""
     
-    def __init__(self):
+    def __init__(self, backend: Optional[str] = None,
+                 calibration: Optional[Sequence[Path]] = None):
+        """
+        Args:
+            backend: 'torch', 'onnx' or 'onnx-int8' (default: [AI] inference_backend)
+            calibration: Images to calibrate int8 quantization with, if the
+                         int8 model has not been created yet (default:
+                         [AI] int8_calibration_dir)
+        """
+        self.backend = backend or onnx_backend.configured_backend()
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.model = None
+        self.sessions = None
         self.transform = None
         self.class_labels = None
-        self._load_model()
+        self._load_model(calibration)
     
-    def _load_model(self):
+    def _load_model(self, calibration: Optional[Sequence[Path]] = None):
         """Load pre-trained ResNet50 model"""
-        print("Loading image classification model...")
+        print(f"Loading image classification model ({self.backend})...")
 
-        # Load model with new weights parameter instead of deprecated pretrained
-        from torchvision.models import ResNet50_Weights
-        self.model = models.resnet50(weights=ResNet50_Weights.IMAGENET1K_V1)
-        self.model.to(self.device)
-        self.model.eval()
-        
         # Define image transforms
         self.transform = transforms.Compose([
             transforms.Resize(256),
@@ -40,11 +51,51 @@ class ImageClassifier:
             )
         ])
         
+        if self.backend == 'torch':
+            self.model = self._torch_model()
+        else:
+            if (self.backend == 'onnx-int8' and not calibration
+                    and not onnx_backend.model_path(ONNX_MODEL_NAME, self.backend).exists()):
+                # Only static quantization keeps ResNet50 fast and accurate
+                calibration = onnx_backend.calibration_images()
+                if not calibration:
+                    print("Warning: no images in [AI] int8_calibration_dir. "
+                          "Using the onnx backend for the image classifier.")
+                    self.backend = 'onnx'
+
+            # Inference runs on the CPU through a pool of onnxruntime sessions
+            self.device = torch.device('cpu')
+            path = onnx_backend.ensure_model(
+                ONNX_MODEL_NAME, self.backend,
+                lambda target: onnx_backend.export_classifier(self._torch_model(), target),
+                calibration=(lambda: self._calibration_inputs(calibration)) if calibration else None
+            )
+            # One session with all threads: the pipeline classifies from a single
+            # thread, one batch at a time
+            self.sessions = onnx_backend.SessionPool(onnx_backend.ort_session_factory(path), 1)
+        
         # Load ImageNet class labels
         self.class_labels = self._load_imagenet_labels()
         
         print("Image classification model loaded successfully")
     
+    def _torch_model(self) -> torch.nn.Module:
+        """Pre-trained ResNet50 on self.device, in eval mode"""
+        # Load model with new weights parameter instead of deprecated pretrained
+        from torchvision.models import ResNet50_Weights
+        model = models.resnet50(weights=ResNet50_Weights.IMAGENET1K_V1)
+        model.to(self.device)
+        model.eval()
+        return model
+    
+    def _calibration_inputs(self, image_paths: Sequence[Path]) -> Iterable:
+        """Model inputs (1, 3, 224, 224 arrays) of calibration images"""
+        for path in image_paths:
+            try:
+                yield self.preprocess(ImageContext(path)).unsqueeze(0).numpy()
+            except Exception:
+                continue
+    
     def _load_imagenet_labels(self) -> List[str]:
         """Load ImageNet class labels"""
         # ImageNet 1000 class labels
@@ -68,59 +119,77 @@ class ImageClassifier:
             "bag", "backpack", "luggage"
         ]
     
-    def classify_image(self, image_path: Path, top_k: int = 5) -> List[Tuple[str, float]]:
+    def classify_image(self, image: Union[Path, ImageContext], top_k: int = 5) -> List[Tuple[str, float]]:
         """
         Classify image and return top predictions
         
         Args:
-            image_path: Path to image file
+            image: Path to image file, or its decoded ImageContext
             top_k: Number of top predictions to return
         
         Returns:
             List of (label, confidence) tuples
         """
+        context = ImageContext.of(image)
         try:
-            # Load and preprocess image
-            image = Image.open(image_path).convert('RGB')
-            image_tensor = self.transform(image).unsqueeze(0).to(self.device)
-            
-            # Get predictions
-            with torch.no_grad():
-                outputs = self.model(image_tensor)
-                probabilities = torch.nn.functional.softmax(outputs[0], dim=0)
+            # Preprocess the shared decoded image
+            image_tensor = self.preprocess(context).unsqueeze(0)
             
-            # Get top k predictions
-            top_prob, top_indices = torch.topk(probabilities, top_k)
-            
-            results = []
-            for i in range(top_k):
-                idx = top_indices[i].item()
-                prob = top_prob[i].item()
-                
-                # Map to label (simplified)
-                label = self.class_labels[idx % len(self.class_labels)]
-                results.append((label, prob))
-            
-            return results
+            return self._predict(image_tensor, top_k)[0]
             
         except Exception as e:
             import logging
-            logging.error(f"Error classifying image {image_path.name}: {e}")
+            logging.error(f"Error classifying image {context.name}: {e}")
             return []
     
-    def get_tags(self, image_path: Path, confidence_threshold: float = 0.3) -> List[str]:
+    def preprocess(self, image: ImageContext) -> torch.Tensor:
+        """Model input tensor of a decoded image (see predict_batch)"""
+        return self.transform(image.pil(CLASSIFIER_SHORTER_SIDE))
+    
+    def predict_batch(self, tensors: Sequence[torch.Tensor],
+                      top_k: int = 5) -> List[List[Tuple[str, float]]]:
+        """Classify preprocessed images in one forward pass"""
+        return self._predict(torch.stack(list(tensors)), top_k)
+    
+    def _predict(self, image_tensor: torch.Tensor, top_k: int) -> List[List[Tuple[str, float]]]:
+        """Run the model on a (N, 3, 224, 224) batch; top_k predictions per image"""
+        with torch.no_grad():
+            if self.sessions is not None:
+                logits = self.sessions.run({'input': image_tensor.numpy()})[0]
+                outputs = torch.from_numpy(logits)
+            else:
+                outputs = self.model(image_tensor.to(self.device))
+            probabilities = torch.nn.functional.softmax(outputs, dim=1)
+            top_prob, top_indices = torch.topk(probabilities, top_k, dim=1)
+        
+        results = []
+        for probs, indices in zip(top_prob.tolist(), top_indices.tolist()):
+            # Map to label (simplified)
+            results.append([
+                (self.class_labels[idx % len(self.class_labels)], prob)
+                for idx, prob in zip(indices, probs)
+            ])
+        
+        return results
+    
+    def get_tags(self, image: Union[Path, ImageContext], confidence_threshold: float = 0.3) -> List[str]:
         """
         Get relevant tags for image
         
         Args:
-            image_path: Path to image
+            image: Path to image, or its decoded ImageContext
             confidence_threshold: Minimum confidence for tags
         
         Returns:
             List of tag strings
         """
-        predictions = self.classify_image(image_path, top_k=10)
-        
+        predictions = self.classify_image(image, top_k=10)
+        return self.tags_from_predictions(predictions, confidence_threshold)
+    
+    @staticmethod
+    def tags_from_predictions(predictions: List[Tuple[str, float]],
+                              confidence_threshold: float = 0.3) -> List[str]:
+        """Get tags from (label, confidence) predictions"""
         tags = []
         for label, confidence in predictions:
             if confidence >= confidence_threshold:
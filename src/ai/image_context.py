@@ -0,0 +1,112 @@
+"""
+Decode-once image shared by the image analyzers
+"""
+import io
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+import cv2
+import numpy as np
+from PIL import Image
+
+class ImageContext:
+    """
+    One decoded image plus lazily derived views
+
+    AIAnalyzer creates a context per image file and passes it to the
+    classifier, face detector, OCR engine and object detector, so the file is
+    read and decoded once. Each view (RGB, BGR, grayscale, downscaled copies)
+    is computed on first use and cached for the lifetime of the context.
+    A decoding error is also cached and re-raised to every analyzer.
+
+    Analyzers accept either a Path or an ImageContext (see ImageContext.of).
+    """
+
+    def __init__(self, path: Path, data: Optional[bytes] = None):
+        """
+        Args:
+            path: Image file
+            data: File content already read from disk (decoded instead of
+                  reading path; released after decoding)
+        """
+        self.path = Path(path)
+        self.name = self.path.name
+        self._data = data
+        self._rgb = None
+        self._error = None
+        self._views: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def of(cls, image: Union[Path, str, 'ImageContext']) -> 'ImageContext':
+        """Wrap a path in a context (contexts are returned unchanged)"""
+        return image if isinstance(image, ImageContext) else cls(Path(image))
+
+    @property
+    def rgb(self) -> np.ndarray:
+        """H x W x 3 uint8 RGB array (decoded on first access)"""
+        if self._rgb is None:
+            if self._error is not None:
+                raise self._error
+            source = io.BytesIO(self._data) if self._data is not None else self.path
+            try:
+                with Image.open(source) as image:
+                    self._rgb = np.array(image.convert('RGB'))
+            except Exception as e:
+                self._error = e
+                raise
+            finally:
+                self._data = None
+        return self._rgb
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """(height, width)"""
+        return self.rgb.shape[:2]
+
+    @property
+    def bgr(self) -> np.ndarray:
+        """BGR array, as cv2.imread would return"""
+        return self._view('bgr', lambda: cv2.cvtColor(self.rgb, cv2.COLOR_RGB2BGR))
+
+    @property
+    def gray(self) -> np.ndarray:
+        """Single-channel grayscale array"""
+        return self._view('gray', lambda: cv2.cvtColor(self.rgb, cv2.COLOR_RGB2GRAY))
+
+    def pil(self, shorter_side: Optional[int] = None) -> Image.Image:
+        """RGB PIL image, optionally downscaled (see downscaled)"""
+        array = self.downscaled(shorter_side) if shorter_side else self.rgb
+        return Image.fromarray(array)
+
+    def downscaled(self, shorter_side: int) -> np.ndarray:
+        """
+        RGB array whose shorter side is at most shorter_side
+
+        Images that are already small enough are returned unchanged. Uses
+        area interpolation, so the result is suitable for models that resize
+        further anyway.
+        """
+        height, width = self.shape
+        scale = shorter_side / min(height, width)
+        if scale >= 1:
+            return self.rgb
+
+        def _resize():
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            return cv2.resize(self.rgb, size, interpolation=cv2.INTER_AREA)
+
+        return self._view(f'rgb@{shorter_side}', _resize)
+
+    def gray_downscaled(self, shorter_side: int) -> np.ndarray:
+        """Grayscale version of downscaled(shorter_side)"""
+        return self._view(
+            f'gray@{shorter_side}',
+            lambda: cv2.cvtColor(self.downscaled(shorter_side), cv2.COLOR_RGB2GRAY)
+        )
+
+    def _view(self, key: str, compute) -> np.ndarray:
+        """Get a cached view, computing it on first use"""
+        view = self._views.get(key)
+        if view is None:
+            view = compute()
+            self._views[key] = view
+        return view
@@ -2,9 +2,11 @@
 Object detection using YOLO
 """
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Union
 import cv2
 import numpy as np
+from .image_context import ImageContext
+from . import onnx_backend
 
 try:
     from ultralytics import YOLO
@@ -13,19 +15,29 @@ except ImportError:
     YOLO_AVAILABLE = False
     print("Warning: ultralytics (YOLOv8) not available. Object detection disabled.")
 
+# Forensically relevant object classes (become file tags)
+FORENSIC_CLASSES = {
+    'person', 'car', 'truck', 'motorcycle', 'bicycle',
+    'cell phone', 'laptop', 'knife', 'gun', 'bottle',
+    'backpack', 'handbag', 'suitcase', 'clock', 'book'
+}
+
 class ObjectDetector:
     """Detect objects in images using YOLO"""
     
-    def __init__(self, model_size: str = 'n'):
+    def __init__(self, model_size: str = 'n', backend: Optional[str] = None):
         """
         Initialize object detector
         
         Args:
             model_size: YOLO model size ('n', 's', 'm', 'l', 'x')
                        'n' = nano (fastest), 'x' = extra large (most accurate)
+            backend: 'torch', 'onnx' or 'onnx-int8' (default: [AI] inference_backend)
         """
         self.model = None
+        self.sessions = None
         self.model_size = model_size
+        self.backend = backend or onnx_backend.configured_backend()
         self.yolo_available = YOLO_AVAILABLE
         
         if self.yolo_available:
@@ -34,33 +46,56 @@ class ObjectDetector:
     def _load_model(self):
         """Load YOLOv8 model"""
         try:
-            print(f"Loading YOLOv8{self.model_size} model...")
-            self.model = YOLO(f'yolov8{self.model_size}.pt')
+            print(f"Loading YOLOv8{self.model_size} model ({self.backend})...")
+            if self.backend == 'torch':
+                self.model = YOLO(f'yolov8{self.model_size}.pt')
+            else:
+                path = onnx_backend.ensure_model(
+                    f'yolov8{self.model_size}', self.backend,
+                    lambda target: onnx_backend.export_detector(self.model_size, target),
+                    input_name='images'
+                )
+                # YOLO predictors keep per-call state, so each objects stage
+                # thread ([AI] onnx_sessions of them) needs its own
+                self.sessions = onnx_backend.SessionPool(
+                    lambda threads: onnx_backend.yolo_onnx_model(path, threads),
+                    onnx_backend.configured_sessions()
+                )
             print("Object detection model loaded successfully")
         except Exception as e:
             print(f"Error loading YOLO model: {e}")
             self.yolo_available = False
     
-    def detect_objects(self, image_path: Path, 
-                       confidence_threshold: float = 0.5) -> List[Dict]:
+    def detect_objects(self, image: Union[Path, ImageContext], 
+                       confidence_threshold: float = 0.5,
+                       raise_errors: bool = False) -> List[Dict]:
         """
         Detect objects in image
         
         Args:
-            image_path: Path to image
+            image: Path to image, or its decoded ImageContext
             confidence_threshold: Minimum confidence for detections
+            raise_errors: Raise errors (also a missing model) instead of
+                          returning no detections
         
         Returns:
             List of detection dictionaries
         """
-        if not self.yolo_available or self.model is None:
+        if not self.yolo_available or (self.model is None and self.sessions is None):
+            if raise_errors:
+                raise RuntimeError("Object detection model is not available")
             return []
         
         detections = []
+        context = ImageContext.of(image)
         
         try:
-            # Run inference
-            results = self.model(str(image_path), verbose=False)
+            # Run inference (ultralytics expects BGR arrays, like cv2.imread)
+            if self.sessions is not None:
+                with self.sessions.session() as model:
+                    results = model(context.bgr, verbose=False)
+            else:
+                results = self.model(context.bgr, verbose=False)
             
             # Process results
             for result in results:
@@ -90,29 +125,30 @@ class ObjectDetector:
                         detections.append(detection)
             
         except Exception as e:
-            print(f"Error detecting objects in {image_path}: {e}")
+            if raise_errors:
+                raise
+            print(f"Error detecting objects in {context.path}: {e}")
         
         return detections
     
-    def get_forensic_objects(self, image_path: Path) -> List[str]:
+    def get_forensic_objects(self, image: Union[Path, ImageContext]) -> List[str]:
         """
         Get forensically relevant objects detected
         
+        Args:
+            image: Path to image, or its decoded ImageContext
+        
         Returns:
             List of object class names
         """
-        detections = self.detect_objects(image_path)
-        
-        # Filter for forensically relevant objects
-        relevant_classes = {
-            'person', 'car', 'truck', 'motorcycle', 'bicycle',
-            'cell phone', 'laptop', 'knife', 'gun', 'bottle',
-            'backpack', 'handbag', 'suitcase', 'clock', 'book'
-        }
-        
+        return self.forensic_objects(self.detect_objects(image))
+    
+    @staticmethod
+    def forensic_objects(detections: List[Dict]) -> List[str]:
+        """Forensically relevant class names among detections (no duplicates)"""
         objects = []
         for det in detections:
-            if det['class'] in relevant_classes:
+            if det['class'] in FORENSIC_CLASSES:
                 objects.append(det['class'])
         
         return list(set(objects))  # Remove duplicates
\ No newline at end of file
@@ -1,27 +1,33 @@
 """
 Optical Character Recognition (OCR)
 """
-import pytesseract
-from PIL import Image
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 import cv2
 import numpy as np
 import platform
+import shutil
 import subprocess
+from .image_context import ImageContext
+from .tesseract_pool import TesseractPool, rebuild_text, mean_confidence
 
 class OCREngine:
     """Extract text from images"""
 
-    def __init__(self, tesseract_path: Optional[str] = None):
-        # Auto-detect tesseract path if not provided
-        if not tesseract_path:
+    def __init__(self, tesseract_path: Optional[str] = None, workers: Optional[int] = None,
+                 languages: str = 'eng'):
+        """
+        Args:
+            tesseract_path: tesseract executable (auto-detected if not set)
+            workers: Images recognized at once (default: CPU cores)
+            languages: Language codes (e.g., 'eng', 'eng+hin+tel')
+        """
+        # Auto-detect tesseract path if not provided (or not installed there)
+        if not tesseract_path or not Path(tesseract_path).exists():
             tesseract_path = self._find_tesseract()
 
-        if tesseract_path:
-            pytesseract.pytesseract.tesseract_cmd = tesseract_path
-
-        self.languages = 'eng'  # Can be extended: 'eng+hin+tel'
+        self.languages = languages or 'eng'
+        self.pool = TesseractPool(tesseract_path, self.languages, workers)
 
     def _find_tesseract(self) -> Optional[str]:
         """Auto-detect tesseract installation path"""
@@ -52,6 +58,11 @@ class OCREngine:
             if Path(path).exists():
                 return path
 
+        # Search PATH (all systems)
+        found = shutil.which('tesseract')
+        if found:
+            return found
+
         # Try using 'which' command (Unix-like systems)
         try:
             result = subprocess.run(['which', 'tesseract'],
@@ -63,33 +74,29 @@ class OCREngine:
 
         return None
     
-    def extract_text(self, image_path: Path, preprocess: bool = True) -> Dict:
+    def extract_text(self, image: Union[Path, ImageContext], preprocess: bool = True) -> Dict:
         """
         Extract text from image
         
         Args:
-            image_path: Path to image
+            image: Path to image, or its decoded ImageContext
             preprocess: Whether to preprocess image for better OCR
         
         Returns:
             Dictionary with text and confidence
         """
+        context = ImageContext.of(image)
         try:
-            # Load image
+            # Shared decoded image
             if preprocess:
-                image = self._preprocess_image(image_path)
+                gray = self._preprocess_image(context)
             else:
-                image = Image.open(image_path)
+                gray = context.gray
             
-            # Extract text
-            text = pytesseract.image_to_string(image, lang=self.languages)
-            
-            # Get detailed data with confidence
-            data = pytesseract.image_to_data(image, lang=self.languages, output_type=pytesseract.Output.DICT)
-            
-            # Calculate average confidence
-            confidences = [int(conf) for conf in data['conf'] if conf != '-1']
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+            # One recognition pass gives the words and their confidences
+            rows = self.pool.image_to_data(gray)
+            text = rebuild_text(rows)
+            avg_confidence = mean_confidence(rows)
             
             return {
                 'text': text.strip(),
@@ -101,7 +108,7 @@ class OCREngine:
         except Exception as e:
             # Log warning instead of printing
             import logging
-            logging.warning(f"OCR error for {image_path.name}: {str(e)}")
+            logging.warning(f"OCR error for {context.name}: {str(e)}")
             return {
                 'text': '',
                 'confidence': 0.0,
@@ -110,26 +117,20 @@ class OCREngine:
                 'error': str(e)
             }
     
-    def _preprocess_image(self, image_path: Path) -> Image.Image:
+    def _preprocess_image(self, context: ImageContext) -> np.ndarray:
         """
         Preprocess image for better OCR results
         
         Applies: grayscale, thresholding, noise removal
         """
-        # Load with OpenCV
-        image = cv2.imread(str(image_path))
-        
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        # Grayscale view of the shared decoded image
+        gray = context.gray
         
         # Apply thresholding
         gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
         
         # Noise removal
-        gray = cv2.medianBlur(gray, 3)
-        
-        # Convert back to PIL Image
-        return Image.fromarray(gray)
+        return cv2.medianBlur(gray, 3)
     
     def set_language(self, languages: str):
         """
@@ -138,4 +139,5 @@ class OCREngine:
         Args:
             languages: Language codes (e.g., 'eng', 'eng+hin', 'eng+hin+tel')
         """
-        self.languages = languages
\ No newline at end of file
+        self.languages = languages
+        self.pool.set_language(languages)
\ No newline at end of file
@@ -0,0 +1,318 @@
+"""
+ONNX Runtime inference backend for the image classifier and object detector
+
+[AI] inference_backend selects how the models run:
+
+    torch       PyTorch / ultralytics (default)
+    onnx        the same weights exported to ONNX, run with onnxruntime
+    onnx-int8   the ONNX models quantized to int8 (faster on CPU-only machines)
+
+The int8 classifier is quantized statically on the images in [AI]
+int8_calibration_dir. Dynamic quantization turns its convolutions into
+ConvInteger, which is both slower and less accurate than the float model, so
+without calibration images the classifier runs the float ONNX model instead.
+
+Models are exported into [Paths] models_dir on first use and reused after
+that. Exports run under a lock file and are renamed into place when
+complete, so analysis worker processes starting together export once and
+never load a half-written model. Inference goes through a SessionPool:
+the object detector has [AI] onnx_sessions sessions (one per objects
+stage thread) and the classifier one, each with its share of the CPU
+threads of the process.
+"""
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+# Defaults, overridden by [AI] inference_backend / onnx_sessions
+DEFAULT_BACKEND = 'torch'
+DEFAULT_SESSIONS = 2
+
+# Images read from [AI] int8_calibration_dir for static quantization
+CALIBRATION_IMAGES = 100
+
+# Seconds to wait for another process exporting the same model; a lock
+# file older than this is left over from a crashed export
+EXPORT_LOCK_TIMEOUT = 1800
+
+def configured_backend() -> str:
+    """Get [AI] inference_backend (torch if onnxruntime is not installed)"""
+    from ..utils.config_loader import get_config
+    backend = get_config().get('AI', 'inference_backend', DEFAULT_BACKEND).strip().lower()
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown [AI] inference_backend: {backend} (use {', '.join(BACKENDS)})")
+
+    if backend != 'torch' and not ONNXRUNTIME_AVAILABLE:
+        print(f"Warning: onnxruntime not available. Using the torch backend instead of {backend}.")
+        return 'torch'
+
+    return backend
+
+def configured_sessions() -> int:
+    """Get [AI] onnx_sessions"""
+    from ..utils.config_loader import get_config
+    return max(1, get_config().get_int('AI', 'onnx_sessions', DEFAULT_SESSIONS))
+
+def available_threads() -> int:
+    """CPU threads of this process (OMP_NUM_THREADS in analysis workers)"""
+    try:
+        return max(1, int(os.environ.get('OMP_NUM_THREADS') or 0) or os.cpu_count() or 1)
+    except ValueError:
+        return os.cpu_count() or 1
+
+def models_dir() -> Path:
+    """Directory the exported models are kept in ([Paths] models_dir)"""
+    from ..utils.config_loader import get_config
+    directory = get_config().get_path('Paths', 'models_dir') or Path('./src/ai/models')
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+def calibration_images(limit: int = CALIBRATION_IMAGES) -> List[Path]:
+    """Images in [AI] int8_calibration_dir (empty if not set)"""
+    from ..utils.config_loader import get_config
+    from ..utils.file_utils import is_image_file, scan_directory
+    directory = get_config().get_path('AI', 'int8_calibration_dir')
+    if directory is None or not directory.is_dir():
+        return []
+
+    return sorted(path for path in scan_directory(directory) if is_image_file(path))[:limit]
+
+def model_path(name: str, backend: str) -> Path:
+    """ONNX file of a model for a backend (e.g. resnet50.int8.onnx)"""
+    suffix = '.int8.onnx' if backend == 'onnx-int8' else '.onnx'
+    return models_dir() / f'{name}{suffix}'
+
+
+class SessionPool:
+    """
+    Fixed-size pool of inference sessions
+
+    Sessions are created on first use, up to `size`; callers check one out
+    for the duration of a run. With N sessions each gets 1/N of the
+    process's threads (see available_threads) for intra-op work, so
+    concurrent runs do not oversubscribe the CPU. Size the pool to the
+    number of threads using it.
+    """
+
+    def __init__(self, factory: Callable[[int], object], size: int = DEFAULT_SESSIONS):
+        """
+        Args:
+            factory: threads -> new session
+            size: Maximum sessions
+        """
+        self.factory = factory
+        self.size = max(1, size)
+        self.threads = max(1, available_threads() // self.size)
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self):
+        """Check out a session, creating one while below the pool size"""
+        session = None
+        with self._lock:
+            if self._idle.empty() and self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+
+        if create:
+            try:
+                session = self.factory(self.threads)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        else:
+            session = self._idle.get()
+
+        try:
+            yield session
+        finally:
+            self._idle.put(session)
+
+    def run(self, feeds: dict, outputs: Optional[list] = None):
+        """Run an onnxruntime session from the pool"""
+        with self.session() as session:
+            return session.run(outputs, feeds)
+
+
+def ort_session_factory(path: Path) -> Callable[[int], object]:
+    """Factory of CPU onnxruntime sessions for SessionPool"""
+    def _create(threads: int):
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        return ort.InferenceSession(str(path), options, providers=['CPUExecutionProvider'])
+    return _create
+
+
+def export_classifier(model, path: Path, image_size: int = 224):
+    """Export a torchvision classifier to ONNX with a dynamic batch axis"""
+    import torch
+
+    model.eval()
+    dummy = torch.randn(1, 3, image_size, image_size)
+    torch.onnx.export(
+        model, dummy, str(path),
+        input_names=['input'], output_names=['logits'],
+        dynamic_axes={'input': {0: 'batch'}, 'logits': {0: 'batch'}},
+        opset_version=17
+    )
+
+def export_detector(model_size: str, path: Path, image_size: int = 640):
+    """Export a YOLOv8 model to ONNX (ultralytics writes next to the .pt file)"""
+    from ultralytics import YOLO
+
+    exported = YOLO(f'yolov8{model_size}.pt').export(format='onnx', imgsz=image_size,
+                                                      dynamic=False, simplify=True)
+    shutil.move(str(exported), str(path))
+
+def yolo_onnx_model(path: Path, threads: int):
+    """
+    ultralytics YOLO running an ONNX file with `threads` intra-op threads
+
+    ultralytics creates its onnxruntime session with default options, which
+    use every core; the session is replaced by one from ort_session_factory.
+    """
+    import numpy as np
+    from ultralytics import YOLO
+
+    model = YOLO(str(path), task='detect')
+    # The first prediction builds the predictor and its backend
+    model(np.zeros((64, 64, 3), dtype=np.uint8), verbose=False)
+
+    backend = getattr(getattr(model, 'predictor', None), 'model', None)
+    if getattr(backend, 'session', None) is not None:
+        backend.session = ort_session_factory(path)(threads)
+    else:
+        print("Warning: could not limit YOLO ONNX threads (unknown ultralytics backend)")
+
+    return model
+
+def quantize_int8(source: Path, target: Path,
+                  calibration: Optional[Iterable] = None, input_name: str = 'input'):
+    """
+    Quantize an ONNX model to int8
+
+    With calibration inputs (numpy arrays shaped like the model input) the
+    model is quantized statically with per-channel weights, which keeps
+    convolution accuracy. Without them, weights are quantized dynamically.
+    """
+    from onnxruntime.quantization import (
+        CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic, quantize_static
+    )
+
+    if calibration is None:
+        quantize_dynamic(str(source), str(target), weight_type=QuantType.QInt8)
+        return
+
+    class _Reader(CalibrationDataReader):
+        def __init__(self, inputs):
+            self._inputs = iter(inputs)
+
+        def get_next(self):
+            array = next(self._inputs, None)
+            return None if array is None else {input_name: array}
+
+    quantize_static(
+        str(source), str(target), _Reader(calibration),
+        quant_format=QuantFormat.QDQ, per_channel=True,
+        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8
+    )
+
+def ensure_model(name: str, backend: str, export: Callable[[Path], None],
+                 calibration: Optional[Callable[[], Iterable]] = None,
+                 input_name: str = 'input') -> Path:
+    """
+    Get the ONNX file of a model for a backend, exporting it the first time
+
+    Args:
+        name: Model file name stem (e.g. 'resnet50')
+        backend: 'onnx' or 'onnx-int8'
+        export: path -> None, writes the float ONNX model
+        calibration: Returns calibration inputs for static int8 quantization
+        input_name: Model input the calibration inputs are fed to
+    """
+    float_path = model_path(name, 'onnx')
+    _create_once(float_path, f"Exporting {name} to ONNX...", export)
+
+    if backend != 'onnx-int8':
+        return float_path
+
+    int8_path = model_path(name, 'onnx-int8')
+    _create_once(
+        int8_path, f"Quantizing {name} to int8...",
+        lambda target: quantize_int8(float_path, target,
+                                     calibration() if calibration else None, input_name)
+    )
+
+    return int8_path
+
+def _create_once(path: Path, message: str, create: Callable[[Path], None]):
+    """
+    Create a model file unless it exists, safely across processes
+
+    The file is written under a unique temporary name and renamed into
+    place, while holding <path>.lock so concurrent callers wait for it.
+    """
+    if path.exists():
+        return
+
+    with _file_lock(path.with_name(path.name + '.lock')):
+        if path.exists():
+            return  # Created by another process meanwhile
+
+        print(message)
+        temp = path.with_name(f'{path.stem}.{os.getpid()}-{uuid.uuid4().hex[:8]}.tmp{path.suffix}')
+        try:
+            create(temp)
+            os.replace(temp, path)
+        finally:
+            if temp.exists():
+                temp.unlink()
+
+@contextmanager
+def _file_lock(lock_path: Path):
+    """Exclusive lock between processes via an O_EXCL lock file"""
+    deadline = time.monotonic() + EXPORT_LOCK_TIMEOUT
+    while True:
+        try:
+            fd = os.open(str(lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                stale = time.time() - lock_path.stat().st_mtime > EXPORT_LOCK_TIMEOUT
+            except FileNotFoundError:
+                continue
+            if stale:
+                lock_path.unlink(missing_ok=True)
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for {lock_path}")
+            time.sleep(0.5)
+
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        yield
+    finally:
+        os.close(fd)
+        lock_path.unlink(missing_ok=True)
@@ -0,0 +1,193 @@
+"""
+Pool of tesseract recognizers for OCREngine
+"""
+import csv
+import io
+import os
+import queue
+import subprocess
+import threading
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+# Seconds one image may take in the tesseract command line tool
+CLI_TIMEOUT = 120
+
+# Column names of tesseract's TSV output (TessBaseAPI.GetTSVText omits them)
+TSV_HEADER = 'level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext\n'
+
+class TesseractPool:
+    """
+    Run tesseract on grayscale images, up to `size` at a time
+
+    With tesserocr installed the pool holds `size` long-lived TessBaseAPI
+    instances, so language data is loaded once per instance rather than once
+    per image. The pixels are handed over in memory.
+
+    Otherwise each image still starts one tesseract command line process,
+    which loads the language data again; only tesserocr removes that
+    per-image cost. The image is piped to stdin as PGM and the TSV output is
+    read from stdout, so no temporary files are written. A semaphore limits
+    concurrent processes to `size`, and each process is limited to one
+    OpenMP thread so the pool does not oversubscribe the cores.
+
+    Both modes return tesseract's TSV rows (see image_to_data).
+    """
+
+    def __init__(self, tesseract_cmd: Optional[str] = None, languages: str = 'eng',
+                 size: Optional[int] = None):
+        """
+        Args:
+            tesseract_cmd: tesseract executable (default: 'tesseract' on PATH)
+            languages: Language codes (e.g., 'eng', 'eng+hin')
+            size: Concurrent recognitions (default: CPU cores)
+        """
+        self.tesseract_cmd = tesseract_cmd or 'tesseract'
+        self.languages = languages
+        self.size = max(1, size or os.cpu_count() or 1)
+        self.use_tesserocr = TESSEROCR_AVAILABLE
+
+        self._apis = queue.Queue()  # Idle (api, languages) pairs
+        self._created = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+
+        self._env = dict(os.environ, OMP_THREAD_LIMIT='1')
+
+    def image_to_data(self, gray: np.ndarray) -> List[Dict[str, str]]:
+        """
+        Recognize a grayscale image in one pass
+
+        Returns:
+            TSV rows (level, block_num, par_num, line_num, word_num, left,
+            top, width, height, conf, text) as dicts of strings
+        """
+        if self.use_tesserocr:
+            tsv = self._recognize_api(gray)
+        else:
+            tsv = self._recognize_cli(gray)
+
+        return list(csv.DictReader(io.StringIO(tsv), delimiter='\t', quoting=csv.QUOTE_NONE))
+
+    def _recognize_api(self, gray: np.ndarray) -> str:
+        """Recognize with a pooled TessBaseAPI"""
+        api, languages = self._checkout()
+        try:
+            height, width = gray.shape[:2]
+            api.SetImageBytes(np.ascontiguousarray(gray).tobytes(), width, height, 1, width)
+            api.Recognize()
+            # GetTSVText has no header row
+            return TSV_HEADER + api.GetTSVText(0)
+        finally:
+            api.Clear()
+            self._checkin(api, languages)
+
+    def _checkout(self):
+        """Take an idle (api, languages), creating one while below the pool size"""
+        with self._lock:
+            if self._apis.empty() and self._created < self.size:
+                self._created += 1
+                languages = self.languages
+                return tesserocr.PyTessBaseAPI(lang=languages), languages
+        return self._apis.get()
+
+    def _checkin(self, api, languages: str):
+        """Return an API to the pool, replacing it if set_language ran meanwhile"""
+        with self._lock:
+            current = self.languages
+        if languages != current:
+            # Replaced rather than dropped: other threads may be waiting for it
+            api.End()
+            api, languages = tesserocr.PyTessBaseAPI(lang=current), current
+        self._apis.put((api, languages))
+
+    def _recognize_cli(self, gray: np.ndarray) -> str:
+        """Recognize with one tesseract process, image on stdin and TSV on stdout"""
+        ok, encoded = cv2.imencode('.pgm', gray)
+        if not ok:
+            raise ValueError("Could not encode image for tesseract")
+
+        with self._slots:
+            result = subprocess.run(
+                [self.tesseract_cmd, 'stdin', 'stdout', '-l', self.languages, 'tsv'],
+                input=encoded.tobytes(),
+                capture_output=True,
+                env=self._env,
+                timeout=CLI_TIMEOUT
+            )
+
+        if result.returncode != 0:
+            message = result.stderr.decode('utf-8', errors='replace').strip()
+            raise RuntimeError(f"tesseract failed ({result.returncode}): {message}")
+
+        return result.stdout.decode('utf-8', errors='replace')
+
+    def set_language(self, languages: str):
+        """Change languages; idle API instances end now, busy ones when returned"""
+        with self._lock:
+            self.languages = languages
+            self._drain()
+
+    def close(self):
+        """Release pooled API instances"""
+        with self._lock:
+            self._drain()
+
+    def _drain(self):
+        """End idle API instances (called with the lock held)"""
+        while True:
+            try:
+                api, _ = self._apis.get_nowait()
+            except queue.Empty:
+                break
+            api.End()
+            self._created -= 1
+
+
+def rebuild_text(rows: List[Dict[str, str]]) -> str:
+    """
+    Reassemble plain text from TSV word rows
+
+    Words are joined by spaces, lines by newlines and paragraphs by blank
+    lines, the layout image_to_string produces.
+    """
+    paragraphs = []
+    lines = {}
+    for row in rows:
+        text = (row.get('text') or '').strip()
+        if row.get('level') != '5' or not text:
+            continue
+        paragraph = (row['page_num'], row['block_num'], row['par_num'])
+        line = paragraph + (row['line_num'],)
+        if line not in lines:
+            if not paragraphs or paragraphs[-1][0] != paragraph:
+                paragraphs.append((paragraph, []))
+            lines[line] = []
+            paragraphs[-1][1].append(lines[line])
+        lines[line].append(text)
+
+    return '\n\n'.join(
+        '\n'.join(' '.join(words) for words in paragraph_lines)
+        for _, paragraph_lines in paragraphs
+    )
+
+def mean_confidence(rows: List[Dict[str, str]]) -> float:
+    """Average word confidence (0-100) of TSV rows; 0 if there are no words"""
+    confidences = []
+    for row in rows:
+        try:
+            confidence = float(row.get('conf') or -1)
+        except ValueError:
+            continue
+        if confidence >= 0:
+            confidences.append(confidence)
+
+    return sum(confidences) / len(confidences) if confidences else 0.0
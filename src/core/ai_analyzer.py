@@ -2,41 +2,110 @@
 AI Analysis Orchestrator - Coordinates all AI processing
 """
 from pathlib import Path
-from typing import Dict, Callable
+from typing import Dict, Callable, Iterable, Iterator, List, Optional, Tuple
+import hashlib
 import json
-from .ai_service import AIService
+import threading
+from .ai_service import AIService, MODEL_NAMES
+from .analysis_pipeline import Pipeline, Stage, format_stats
+from ..ai.image_context import ImageContext
+from ..ai.text_prefilter import TextPrefilter
+from ..database.analysis_cache import get_analysis_cache
+from ..database.db_manager import case_id_for_id, case_in_use
+from ..database.face_repository import encoding_values
 from ..database.file_repository import FileRepository
+from ..database.maintenance import get_maintenance
+from ..utils.file_utils import get_file_hash
 from ..utils.logger import get_logger
+from ..utils.config_loader import get_config
+
+# Bump when analysis output changes; cached results of older versions are ignored
+ANALYZER_VERSION = 3
+
+# File types whose results are cached by content hash (the model-heavy ones)
+CACHED_FILE_TYPES = ('image',)
 
 class AIAnalyzer:
-    """Orchestrate AI analysis of evidence files using pre-loaded models from AIService."""
+    """Orchestrate AI analysis of evidence files using shared models from AIService."""
     
     def __init__(self, ai_service: AIService):
         self.logger = get_logger()
         self.file_repo = FileRepository()
         self.ai_service = ai_service
-
-        # Get pre-loaded models from the AI service
-        self.image_classifier = self.ai_service.image_classifier
-        self.face_detector = self.ai_service.face_detector
-        self.ocr_engine = self.ai_service.ocr_engine
-        self.object_detector = self.ai_service.object_detector
-        self.text_analyzer = self.ai_service.text_analyzer
+        
+        # Images per classifier forward pass and image decoding threads
+        config = get_config()
+        self.batch_size = config.get_int('AI', 'batch_size', 32)
+        self.num_workers = config.get_int('AI', 'max_workers', 4)
+        self.object_threshold = config.get_float('AI', 'object_detection_threshold', 0.5)
+        self._cancelled = threading.Event()
+        self.last_pipeline_stats = {}
+        self._cache_version = None  # analysis_version() of the running iter_analysis
+
+        # Skips OCR on images unlikely to contain text ([OCR] prefilter_*)
+        self.text_prefilter = TextPrefilter.from_config()
         
         self.logger.info("AIAnalyzer initialized with shared AI models.")
     
+    # Models come from the AI service, which loads each one on first use
+
+    @property
+    def image_classifier(self):
+        return self.ai_service.image_classifier
+
+    @property
+    def face_detector(self):
+        return self.ai_service.face_detector
+
+    @property
+    def ocr_engine(self):
+        return self.ai_service.ocr_engine
+
+    @property
+    def object_detector(self):
+        return self.ai_service.object_detector
+
+    @property
+    def text_analyzer(self):
+        return self.ai_service.text_analyzer
+    
     def analyze_file(self, file_id: int) -> Dict:
         """
         Analyze single file with all AI modules
         
+        Args:
+            file_id: File to analyze
+        
         Returns:
             Dictionary with analysis results
         """
-        # Get file info
-        file_data = self.file_repo.get_file(file_id)
-        if not file_data:
-            raise ValueError(f"File {file_id} not found")
+        with case_in_use(case_id_for_id(file_id)):
+            # Get file info
+            file_data = self.file_repo.get_file(file_id)
+            if not file_data:
+                raise ValueError(f"File {file_id} not found")
+            
+            results = self.cached_results(file_data)
+            if results is None:
+                with self.ai_service.in_use():
+                    results = self.run_analysis(file_data)
+                self.store_cached(file_data, results)
+            self.save_results(results)
+
+        self.logger.info(f"✓ Analysis complete for {file_data['file_name']}")
+
+        return results
+
+    def run_analysis(self, file_data) -> Dict:
+        """
+        Run the AI modules on one file without touching the database
         
+        Args:
+            file_data: Mapping with file_id, file_path and file_type
+        
+        Returns:
+            Dictionary with analysis results
+        """
         file_path = Path(file_data['file_path'])
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
@@ -44,14 +113,7 @@ class AIAnalyzer:
         file_type = file_data['file_type']
         self.logger.info(f"Analyzing {file_type} file: {file_path.name}")
 
-        results = {
-            'file_id': file_id,
-            'ai_tags': [],
-            'ai_confidence': 0.0,
-            'ocr_text': '',
-            'face_count': 0,
-            'objects_detected': []
-        }
+        results = self._new_results(file_data)
 
         # Route to appropriate analyzer based on file type
         if file_type == 'image':
@@ -75,68 +137,431 @@ class AIAnalyzer:
             results['ai_tags'] = [f'{file_type}_file']
             self.logger.info(f"  → Marked as {file_type} file")
 
-        # Update database
-        analysis_data = {
+        return results
+
+    @staticmethod
+    def _new_results(file_data) -> Dict:
+        """Empty run_analysis results of a file"""
+        return {
+            'file_id': file_data['file_id'],
+            'file_hash': file_data.get('file_hash'),
+            'ai_tags': [],
+            'ai_confidence': 0.0,
+            'ocr_text': '',
+            'face_count': 0,
+            'faces': [],
+            'objects': [],
+            'objects_detected': []
+        }
+
+    @staticmethod
+    def analysis_data(results: Dict) -> Dict:
+        """Convert run_analysis results to FileRepository.update_ai_analysis data"""
+        return {
             'ai_tags': json.dumps(results['ai_tags']),
+            'tags': results['ai_tags'],
             'ai_confidence': results['ai_confidence'],
             'ocr_text': results['ocr_text'],
-            'face_count': results['face_count']
+            'face_count': results['face_count'],
+            'faces': results.get('faces'),
+            'objects': results.get('objects'),
+            'file_hash': results.get('file_hash')
         }
 
-        self.file_repo.update_ai_analysis(file_id, analysis_data)
+    def save_results(self, results: Dict):
+        """Write run_analysis results to the database"""
+        self.file_repo.update_ai_analysis(results['file_id'], self.analysis_data(results))
 
-        self.logger.info(f"✓ Analysis complete for {file_path.name}")
+    @staticmethod
+    def analysis_version() -> str:
+        """
+        Cache key of the analysis settings
 
-        return results
+        ANALYZER_VERSION, the enabled models and every setting that changes
+        their output, so changing one of them re-analyzes files seen before.
+        Settings are fixed for a run; callers compute this once per run and
+        pass it to cached_results/store_cached.
+        """
+        service = AIService()
+        config = get_config()
+        enabled = [name for name in MODEL_NAMES if service.is_enabled(name)]
+        settings = [
+            config.get('AI', option, '').strip().lower() for option in (
+                'object_detection_threshold', 'inference_backend',
+                'face_two_stage', 'face_proposal_model', 'face_proposal_megapixels'
+            )
+        ] + [
+            config.get('OCR', option, '').strip().lower() for option in (
+                'languages', 'prefilter_enabled', 'prefilter_threshold', 'prefilter_size'
+            )
+        ]
+        digest = hashlib.sha1('|'.join(settings).encode('utf-8')).hexdigest()[:12]
+        return f"{ANALYZER_VERSION}:{'+'.join(enabled)}:{digest}"
+
+    @classmethod
+    def cached_results(cls, file_data, data: bytes = None,
+                       version: Optional[str] = None) -> Optional[Dict]:
+        """
+        Results stored for a file's content (see AnalysisCache), or None
+        
+        A file of CACHED_FILE_TYPES without a stored hash is hashed from
+        data (its bytes, when they were read already) or from disk, and
+        file_data['file_hash'] is set so the hash is saved with its results.
+        Results from the cache have 'cache_hit' set.
+        
+        Args:
+            file_data: Mapping with file_id, file_path, file_type and file_hash
+            data: Content of the file, if already read
+            version: analysis_version() of the run (computed if not given)
+        """
+        cache = get_analysis_cache()
+        if cache is None or file_data['file_type'] not in CACHED_FILE_TYPES:
+            return None
+
+        if not file_data.get('file_hash'):
+            try:
+                file_data['file_hash'] = (hashlib.sha256(data).hexdigest() if data is not None
+                                          else get_file_hash(Path(file_data['file_path'])))
+            except OSError:
+                return None  # Reported by run_analysis
+
+        cached = cache.get(file_data['file_hash'], version or cls.analysis_version())
+        if cached is None:
+            return None
+        return dict(cached, file_id=file_data['file_id'], file_hash=file_data['file_hash'],
+                    cache_hit=True)
+
+    @classmethod
+    def store_cached(cls, file_data, results: Dict, version: Optional[str] = None):
+        """Add one file's run_analysis results to the analysis cache (see cached_results)"""
+        cache = get_analysis_cache()
+        if (cache is None or file_data['file_type'] not in CACHED_FILE_TYPES
+                or not results.get('file_hash') or results.get('partial')
+                or results.get('cache_hit')):
+            return
+
+        try:
+            cache.put(results['file_hash'], version or cls.analysis_version(), results)
+        except Exception as e:
+            # The results are saved to the case either way
+            get_logger().warning(f"Could not cache analysis results: {e}")
+
+    def iter_analysis(self, files: Iterable, decode_workers: int = None) -> Iterator[Tuple[object, object]]:
+        """
+        Run the AI modules on many files without touching the database
+        
+        Files flow through a staged pipeline (see analysis_pipeline.py), each
+        stage with its own threads and a bounded input queue:
+        
+            read      read image files from disk, hash them and look them
+                      up in the analysis cache (hits skip the later stages)
+            other     analyze files that are not images
+            decode    decode images and build classifier input tensors
+            faces     face detection on the full-resolution image
+            ocr       text extraction
+            objects   object detection
+            classify  batch_size images per classifier forward pass
+        
+        Full-resolution images are released after object detection; only the
+        small classifier tensors wait for a batch. Results are yielded in
+        completion order and the caller's time per result is recorded as the
+        'write' stage. Stops early after cancel(). Stage statistics of the
+        run are left in last_pipeline_stats.
+        
+        Args:
+            files: Mappings with file_id, file_name, file_path and file_type
+                   (any iterable; it is consumed as the pipeline has room)
+            decode_workers: Image decoding threads (default: [AI] max_workers)
+        
+        Yields:
+            (file_data, results), or (file_data, exception) if analysis failed
+        """
+        pipeline = self._build_pipeline(decode_workers or self.num_workers)
+        self._cache_version = self.analysis_version()
+
+        with self.ai_service.in_use():
+            outputs = pipeline.run({'file_data': file_data} for file_data in files)
+            try:
+                for item, error in outputs:
+                    if self._cancelled.is_set():
+                        return
+                    yield item['file_data'], error if error is not None else item['results']
+            finally:
+                outputs.close()
+                self.last_pipeline_stats = pipeline.stats()
+
+    def _build_pipeline(self, decode_workers: int) -> Pipeline:
+        """Create the iter_analysis stages ([AI] pipeline_* sets concurrency)"""
+        config = get_config()
+        queue_size = config.get_int('AI', 'pipeline_queue_size', 16)
+        ocr_workers = config.get_int('AI', 'pipeline_ocr_workers', 0) or self.ai_service.ocr_workers
+
+        # The ONNX object detector has a pool of [AI] onnx_sessions models
+        object_workers = 1
+        if config.get('AI', 'inference_backend', 'torch').strip().lower() != 'torch':
+            object_workers = max(1, config.get_int('AI', 'onnx_sessions', 2))
+
+        # Face models are not safe to share between threads; OCR recognizes
+        # one image per tesseract worker, so several can run at once
+        return Pipeline([
+            Stage('read', self._read_stage,
+                  workers=config.get_int('AI', 'pipeline_read_workers', 2), queue_size=queue_size),
+            Stage('other', self._other_stage, queue_size=queue_size),
+            Stage('decode', self._decode_stage, workers=decode_workers, queue_size=queue_size),
+            Stage('faces', self._faces_stage, queue_size=2),
+            Stage('ocr', self._ocr_stage, workers=ocr_workers, queue_size=2 * ocr_workers),
+            Stage('objects', self._objects_stage, workers=object_workers,
+                  queue_size=2 * object_workers),
+            Stage('classify', self._classify_stage, queue_size=2 * self.batch_size,
+                  batch_size=self.batch_size),
+        ], sink_name='write')
+
+    # Pipeline stages: each takes and returns an item dict holding file_data,
+    # then data (file bytes), image (ImageContext), tensor and results
+
+    def _read_stage(self, item: Dict) -> Dict:
+        """Read image files from disk and reuse cached results of their content"""
+        file_data = item['file_data']
+        if file_data['file_type'] != 'image':
+            return item
+
+        file_path = Path(file_data['file_path'])
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        data = file_path.read_bytes()
+
+        cached = self.cached_results(file_data, data, self._cache_version)
+        if cached is not None:
+            item['results'] = cached
+            return item
+
+        item['data'] = data
+        item['results'] = self._new_results(file_data)
+        if file_data.get('file_hash') and get_analysis_cache() is not None:
+            item['results']['cache_hit'] = False
+        return item
+
+    def _other_stage(self, item: Dict) -> Dict:
+        """Analyze files that are not images"""
+        if item['file_data']['file_type'] != 'image':
+            item['results'] = self.run_analysis(item['file_data'])
+        return item
+
+    def _decode_stage(self, item: Dict) -> Dict:
+        """Decode images and prepare the classifier input"""
+        data = item.pop('data', None)
+        if data is None:
+            return item
+
+        file_data = item['file_data']
+        self.logger.info(f"Analyzing image file: {file_data['file_name']}")
+
+        image = ImageContext(file_data['file_path'], data)
+        item['image'] = image
+
+        try:
+            image.rgb
+        except Exception:
+            return item  # The context re-raises the error to every analyzer
+
+        classifier = self.image_classifier
+        if classifier:
+            try:
+                item['tensor'] = classifier.preprocess(image)
+            except Exception as e:
+                self.logger.error(f"  ✗ Image classification error: {e}")
+                item['results']['partial'] = True
+        else:
+            self._model_unavailable('image_classifier', item['results'])
+        return item
+
+    def _faces_stage(self, item: Dict) -> Dict:
+        if 'image' in item:
+            self._detect_faces(item['image'], item['results'])
+        return item
+
+    def _ocr_stage(self, item: Dict) -> Dict:
+        if 'image' in item:
+            self._extract_text(item['image'], item['results'])
+        return item
+
+    def _objects_stage(self, item: Dict) -> Dict:
+        # Last user of the full-resolution image
+        image = item.pop('image', None)
+        if image is not None:
+            self._detect_objects(image, item['results'])
+        return item
+
+    def _classify_stage(self, items: List[Dict]) -> List[Dict]:
+        """Classify the images of a batch in one forward pass"""
+        batch = [item for item in items if 'tensor' in item]
+        if not batch:
+            return items
+
+        tensors = [item.pop('tensor') for item in batch]
+        try:
+            predictions = self.image_classifier.predict_batch(tensors, top_k=10)
+        except Exception as e:
+            self.logger.error(f"  ✗ Image classification error ({len(batch)} images): {e}")
+            for item in batch:
+                item['results']['partial'] = True
+            return items
+
+        for item, image_predictions in zip(batch, predictions):
+            self._apply_classification(item['results'], image_predictions)
+        return items
+
+    @staticmethod
+    def pipeline_summary(stage_stats: Dict) -> List[str]:
+        """Log lines describing where a run spent its time (see analysis_pipeline)"""
+        return ["Analysis pipeline stages:"] + format_stats(stage_stats)
+
+    def cancel(self):
+        """Stop analyze_case / iter_analysis after the current file"""
+        self._cancelled.set()
+
+    @staticmethod
+    def new_stats(total: int) -> Dict:
+        """Empty analyze_case statistics"""
+        return {
+            'total': total,
+            'processed': 0,
+            'errors': 0,
+            'faces_found': 0,
+            'text_found': 0,
+            'objects_found': 0,
+            'ocr_skipped': 0,
+            'cache_lookups': 0,
+            'cache_hits': 0
+        }
+
+    @staticmethod
+    def cache_summary(stats: Dict) -> str:
+        """Describe the analysis cache hit rate of an analyze_case run"""
+        lookups = stats['cache_lookups']
+        rate = stats['cache_hits'] / lookups if lookups else 0.0
+        return f"Analysis cache: {stats['cache_hits']} of {lookups} files reused ({rate:.0%})"
+
+    @staticmethod
+    def count_results(stats: Dict, results: Dict):
+        """Add one file's results to analyze_case statistics"""
+        stats['processed'] += 1
+
+        if 'cache_hit' in results:
+            stats['cache_lookups'] += 1
+            stats['cache_hits'] += bool(results['cache_hit'])
+        stats['faces_found'] += results['face_count']
+
+        if results['ocr_text']:
+            stats['text_found'] += 1
+        elif results.get('ocr_skipped'):
+            stats['ocr_skipped'] += 1
+
+        if results['objects_detected']:
+            stats['objects_found'] += len(results['objects_detected'])
 
     def _analyze_image(self, file_path: Path, results: Dict):
         """Analyze image files"""
-        # Image classification
+        # Decoded once and shared by every analyzer below
+        image = ImageContext(file_path)
+
+        # Image classification (one forward pass gives tags and confidence)
         if self.image_classifier:
             try:
-                tags = self.image_classifier.get_tags(file_path)
-                results['ai_tags'] = tags
-
-                # Get average confidence
-                predictions = self.image_classifier.classify_image(file_path, top_k=3)
-                if predictions:
-                    results['ai_confidence'] = sum(p[1] for p in predictions) / len(predictions)
-
-                self.logger.info(f"  → Image classification: {tags}")
+                predictions = self.image_classifier.classify_image(image, top_k=10)
+                self._apply_classification(results, predictions)
             except Exception as e:
                 self.logger.error(f"  ✗ Image classification error: {e}")
+                results['partial'] = True
+        else:
+            self._model_unavailable('image_classifier', results)
+
+        self._detect_faces(image, results)
+        self._extract_text(image, results)
+        self._detect_objects(image, results)
+
+    def _apply_classification(self, results: Dict, predictions: List[Tuple[str, float]]):
+        """Add classifier predictions to results as tags and confidence"""
+        tags = self.image_classifier.tags_from_predictions(predictions)
+        results['ai_tags'] = list(dict.fromkeys(tags + results['ai_tags']))
+
+        # Get average confidence of the top 3
+        if predictions:
+            top = predictions[:3]
+            results['ai_confidence'] = sum(p[1] for p in top) / len(top)
+
+        self.logger.info(f"  → Image classification: {tags}")
+
+    def _model_unavailable(self, name: str, results: Dict):
+        """Mark results partial if an enabled model failed to load (not cached)"""
+        if self.ai_service.is_enabled(name):
+            results['partial'] = True
 
-        # Face detection
-        if self.face_detector:
+    def _detect_faces(self, image: ImageContext, results: Dict):
+        """Face detection"""
+        if not self.face_detector:
+            self._model_unavailable('face_detector', results)
+        else:
             try:
-                faces = self.face_detector.detect_faces(file_path)
+                faces = self.face_detector.detect_faces(image, raise_errors=True)
                 results['face_count'] = len(faces)
+                # Kept JSON-safe so the analysis cache carries them too
+                results['faces'] = [
+                    {
+                        'bounding_box': face['bounding_box'],
+                        'confidence': face['confidence'],
+                        'encoding': encoding_values(face.get('encoding'))
+                    }
+                    for face in faces
+                ]
                 self.logger.info(f"  → Faces detected: {len(faces)}")
             except Exception as e:
                 self.logger.error(f"  ✗ Face detection error: {e}")
+                results['partial'] = True
+
+    def _extract_text(self, image: ImageContext, results: Dict):
+        """OCR"""
+        if not self.ocr_engine:
+            self._model_unavailable('ocr_engine', results)
+        else:
+            if self.text_prefilter and not self.text_prefilter.has_text(image):
+                results['ocr_skipped'] = True
+                self.logger.info("  → OCR skipped: no text likely")
+                return
 
-        # OCR
-        if self.ocr_engine:
             try:
-                ocr_result = self.ocr_engine.extract_text(file_path)
-                if ocr_result['has_text'] and ocr_result['confidence'] > 0.5:
+                ocr_result = self.ocr_engine.extract_text(image)
+                if 'error' in ocr_result:
+                    # e.g. tesseract missing; keeps empty text out of the cache
+                    self.logger.error(f"  ✗ OCR error: {ocr_result['error']}")
+                    results['partial'] = True
+                elif ocr_result['has_text'] and ocr_result['confidence'] > 0.5:
                     results['ocr_text'] = ocr_result['text']
                     self.logger.info(f"  → OCR extracted {ocr_result['word_count']} words")
                 else:
                     self.logger.info(f"  → OCR: No text found")
             except Exception as e:
                 self.logger.error(f"  ✗ OCR error: {e}")
+                results['partial'] = True
 
-        # Object detection
-        if self.object_detector:
+    def _detect_objects(self, image: ImageContext, results: Dict):
+        """Object detection"""
+        if not self.object_detector:
+            self._model_unavailable('object_detector', results)
+        else:
             try:
-                objects = self.object_detector.get_forensic_objects(file_path)
+                detections = self.object_detector.detect_objects(image, self.object_threshold,
+                                                                 raise_errors=True)
+                # Every detection is stored; the forensic classes also become tags
+                results['objects'] = detections
+                objects = self.object_detector.forensic_objects(detections)
                 results['objects_detected'] = objects
                 results['ai_tags'].extend(objects)
                 results['ai_tags'] = list(set(results['ai_tags']))  # Remove duplicates
                 self.logger.info(f"  → Objects detected: {objects if objects else 'none'}")
             except Exception as e:
                 self.logger.error(f"  ✗ Object detection error: {e}")
+                results['partial'] = True
 
     def _analyze_video(self, file_path: Path, results: Dict):
         """Analyze video files - mark as analyzed for now"""
@@ -217,17 +642,18 @@ class AIAnalyzer:
         Returns:
             Summary statistics
         """
+        # The case cannot be deleted while it is analyzed
+        with case_in_use(case_id):
+            return self._analyze_case(case_id, progress_callback)
+
+    def _analyze_case(self, case_id: int, progress_callback: Callable = None) -> Dict:
+        """Analyze a case (the caller marks it in use)"""
+        self._cancelled.clear()
+
         # Get ALL unprocessed files (not just images)
-        files = self.file_repo.get_unprocessed_files(case_id)
+        files = self.file_repo.get_unprocessed_files(case_id, with_details=True)
 
-        stats = {
-            'total': len(files),
-            'processed': 0,
-            'errors': 0,
-            'faces_found': 0,
-            'text_found': 0,
-            'objects_found': 0
-        }
+        stats = self.new_stats(len(files))
 
         self.logger.info(f"Starting case analysis: {len(files)} files to process")
 
@@ -235,26 +661,36 @@ class AIAnalyzer:
             self.logger.info("No unprocessed files found")
             return stats
 
-        for idx, file_data in enumerate(files):
-            try:
-                if progress_callback:
-                    progress_callback(idx + 1, stats['total'], file_data['file_name'])
-
-                results = self.analyze_file(file_data['file_id'])
-
-                stats['processed'] += 1
-                stats['faces_found'] += results['face_count']
-
-                if results['ocr_text']:
-                    stats['text_found'] += 1
-
-                if results['objects_detected']:
-                    stats['objects_found'] += len(results['objects_detected'])
-
-            except Exception as e:
-                self.logger.error(f"Error analyzing {file_data['file_name']}: {e}")
+        # Files analyzed before, in this or another case, reuse the stored
+        # results (looked up by the pipeline's read stage)
+        version = self.analysis_version()
+        for position, (file_data, results) in enumerate(self.iter_analysis(files), 1):
+            if isinstance(results, Exception):
+                self.logger.error(f"Error analyzing {file_data['file_name']}: {results}")
                 stats['errors'] += 1
+            else:
+                try:
+                    self.save_results(results)
+                    self.count_results(stats, results)
+                    self.store_cached(file_data, results, version)
+                except Exception as e:
+                    self.logger.error(f"Error saving results for {file_data['file_name']}: {e}")
+                    stats['errors'] += 1
+
+            if progress_callback:
+                progress_callback(position, stats['total'], file_data['file_name'])
 
         self.logger.info(f"Case analysis complete. Processed: {stats['processed']}, Errors: {stats['errors']}")
+        if stats['cache_lookups']:
+            self.logger.info(self.cache_summary(stats))
+        if stats['ocr_skipped']:
+            self.logger.info(f"OCR skipped by the text prefilter: {stats['ocr_skipped']} images")
+        if self.last_pipeline_stats:
+            stats['pipeline'] = self.last_pipeline_stats
+            for line in self.pipeline_summary(self.last_pipeline_stats):
+                self.logger.info(line)
+
+        # Analysis rewrote most rows; optimize on the next idle pass
+        get_maintenance().mark_dirty(case_id)
 
         return stats
\ No newline at end of file
@@ -1,21 +1,49 @@
 """
 AI Service Singleton - Manages the lifecycle of AI models.
 """
-from ..ai.image_classifier import ImageClassifier
-from ..ai.face_detector import FaceDetector
-from ..ai.ocr_engine import OCREngine
-from ..ai.object_detector import ObjectDetector
-from ..ai.text_analyzer import TextAnalyzer
+import gc
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional
 from ..utils.logger import get_logger
 from ..utils.config_loader import get_config
 
+# Models managed by the service, in warm-up order
+MODEL_NAMES = ('image_classifier', 'face_detector', 'ocr_engine', 'object_detector', 'text_analyzer')
+
+# [AI] option that enables each model (models without one are always enabled)
+MODEL_ENABLED_OPTIONS = {
+    'face_detector': 'face_detection_enabled',
+    'ocr_engine': 'ocr_enabled',
+    'object_detector': 'object_detection_enabled'
+}
+
+def _model_property(name: str, doc: str) -> property:
+    """Attribute that loads the model on first access (None if unavailable)"""
+    return property(lambda self: self.get_model(name), doc=doc)
+
 class AIService:
     """
     A singleton service to manage and provide access to AI models.
     This ensures that models are loaded only once during the application's lifetime.
+
+    Models are loaded on first use, not at startup: opening a case to read it
+    never imports torch. Each model has its own lock, so concurrent first
+    uses load it once. warm_up() loads the enabled models in the background,
+    and models unused for [AI] model_idle_unload_minutes are unloaded again
+    (they reload on the next use).
     """
     _instance = None
 
+    image_classifier = _model_property('image_classifier', "ImageClassifier")
+    face_detector = _model_property('face_detector', "FaceDetector")
+    ocr_engine = _model_property('ocr_engine', "OCREngine")
+    object_detector = _model_property('object_detector', "ObjectDetector")
+    text_analyzer = _model_property('text_analyzer', "TextAnalyzer")
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(AIService, cls).__new__(cls)
@@ -25,11 +53,11 @@ class AIService:
     def __init__(self):
         if self._initialized:
             return
-        
+
         self.logger = get_logger()
         self.config = get_config()
         self._initialized = True
-        
+
         self.logger.info("Initializing AI Service Singleton...")
 
         # Check what AI modules are enabled in the config
@@ -37,60 +65,202 @@ class AIService:
         self.ocr_enabled = self.config.get_bool('AI', 'ocr_enabled', True)
         self.object_detection_enabled = self.config.get_bool('AI', 'object_detection_enabled', True)
 
-        # Initialize AI models
-        self.image_classifier = None
-        self.face_detector = None
-        self.ocr_engine = None
-        self.object_detector = None
-        self.text_analyzer = None
+        for name, option in MODEL_ENABLED_OPTIONS.items():
+            if not self.is_enabled(name):
+                self.logger.info(f"○ {name} is disabled ([AI] {option}).")
+
+        # Loaded models, models that failed to load and last use times
+        self._models: Dict[str, object] = {}
+        self._failed = set()
+        self._last_used: Dict[str, float] = {}
+        self._locks = {name: threading.Lock() for name in MODEL_NAMES}
+
+        # Analyses in progress; idle unloading waits for them
+        self._busy = 0
+        self._busy_lock = threading.Lock()
+
+        self.idle_unload_seconds = self.config.get_float('AI', 'model_idle_unload_minutes', 0) * 60
+
+        # CPU cores this process may use (set by analysis worker processes)
+        self.thread_budget = None
+
+        self._warm_up_thread = None
+        self._unload_thread = None
+        self._stop = threading.Event()
 
-        self._load_models()
+    def is_enabled(self, name: str) -> bool:
+        """Whether a model is enabled in [AI]"""
+        option = MODEL_ENABLED_OPTIONS.get(name)
+        return option is None or self.config.get_bool('AI', option, True)
 
-    def _load_models(self):
-        """Load all configured AI models."""
-        self.logger.info("Loading AI models...")
+    @property
+    def ocr_workers(self) -> int:
+        """Concurrent OCR recognitions ([OCR] tesseract_workers, 0 = all cores)"""
+        return (self.config.get_int('OCR', 'tesseract_workers', 0)
+                or self.thread_budget or os.cpu_count() or 1)
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether a model is currently in memory"""
+        return name in self._models
+
+    def get_model(self, name: str):
+        """
+        Get a model, loading it on first use
+
+        Returns:
+            The model, or None if it is disabled or failed to load
+        """
+        model = self._models.get(name)
+
+        if model is None:
+            if name in self._failed or not self.is_enabled(name):
+                return None
+
+            with self._locks[name]:
+                model = self._models.get(name)
+                if model is None and name not in self._failed:
+                    model = self._load(name)
+
+        if model is not None:
+            self._last_used[name] = time.monotonic()
+
+        return model
+
+    def _load(self, name: str):
+        """Create one model (called with its lock held)"""
+        started = time.perf_counter()
 
         try:
-            self.image_classifier = ImageClassifier()
-            self.logger.info("✓ Image classifier loaded")
+            model = getattr(self, f'_create_{name}')()
         except Exception as e:
-            self.logger.error(f"✗ Image classifier failed to load: {e}")
-
-        if self.face_detection_enabled:
-            try:
-                self.face_detector = FaceDetector()
-                self.logger.info("✓ Face detector loaded")
-            except Exception as e:
-                self.logger.error(f"✗ Face detector failed to load: {e}")
-        else:
-            self.logger.info("○ Face detection is disabled.")
-
-        if self.ocr_enabled:
-            try:
-                tesseract_path = self.config.get('OCR', 'tesseract_path')
-                self.ocr_engine = OCREngine(tesseract_path)
-                self.logger.info("✓ OCR engine loaded")
-            except Exception as e:
-                self.logger.error(f"✗ OCR engine failed to load: {e}")
-        else:
-            self.logger.info("○ OCR is disabled.")
-
-        if self.object_detection_enabled:
-            try:
-                self.object_detector = ObjectDetector()
-                self.logger.info("✓ Object detector loaded")
-            except Exception as e:
-                self.logger.error(f"✗ Object detector failed to load: {e}")
-        else:
-            self.logger.info("○ Object detection is disabled.")
-            
+            self.logger.error(f"✗ {name} failed to load: {e}")
+            self._failed.add(name)
+            return None
+
+        self._models[name] = model
+        self.logger.info(f"✓ {name} loaded in {time.perf_counter() - started:.1f}s")
+        return model
+
+    # Model imports are deferred so torch, cv2 and friends load with the model
+
+    def _create_image_classifier(self):
+        from ..ai.image_classifier import ImageClassifier
+        return ImageClassifier()
+
+    def _create_face_detector(self):
+        from ..ai.face_detector import FaceDetector
+        return FaceDetector.from_config()
+
+    def _create_ocr_engine(self):
+        from ..ai.ocr_engine import OCREngine
+        return OCREngine(self.config.get('OCR', 'tesseract_path'), workers=self.ocr_workers,
+                         languages=self.config.get('OCR', 'languages', 'eng').strip())
+
+    def _create_object_detector(self):
+        from ..ai.object_detector import ObjectDetector
+        return ObjectDetector()
+
+    def _create_text_analyzer(self):
+        from ..ai.text_analyzer import TextAnalyzer
+        return TextAnalyzer()
+
+    @contextmanager
+    def in_use(self):
+        """Keep idle unloading from dropping models during an analysis"""
+        with self._busy_lock:
+            self._busy += 1
         try:
-            self.text_analyzer = TextAnalyzer()
-            self.logger.info("✓ Text analyzer loaded")
-        except Exception as e:
-            self.logger.error(f"✗ Text analyzer failed to load: {e}")
+            yield self
+        finally:
+            with self._busy_lock:
+                self._busy -= 1
+
+    def warm_up(self, names: Iterable[str] = MODEL_NAMES) -> Optional[threading.Thread]:
+        """
+        Load models in a background thread
+
+        Returns:
+            The loading thread, or None if a warm-up is already running
+        """
+        if self._warm_up_thread and self._warm_up_thread.is_alive():
+            return None
+
+        names = [name for name in names if self.is_enabled(name)]
+
+        def _run():
+            self.logger.info("Warming up AI models...")
+            for name in names:
+                if self._stop.is_set():
+                    return
+                self.get_model(name)
+            self.logger.info("AI model warm-up complete.")
+
+        self._warm_up_thread = threading.Thread(target=_run, name='ModelWarmUp', daemon=True)
+        self._warm_up_thread.start()
+        return self._warm_up_thread
+
+    def unload(self, name: str) -> bool:
+        """Drop a loaded model; it is loaded again on next use"""
+        with self._locks[name]:
+            model = self._models.pop(name, None)
+            self._last_used.pop(name, None)
+
+        if model is None:
+            return False
+
+        del model
+        gc.collect()
+
+        # Return cached GPU memory too, if torch was ever imported
+        torch = sys.modules.get('torch')
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+        self.logger.info(f"○ {name} unloaded")
+        return True
+
+    def unload_idle(self, idle_seconds: Optional[float] = None) -> int:
+        """
+        Unload models unused for idle_seconds (default: the configured time)
+
+        Returns:
+            Number of models unloaded
+        """
+        idle_seconds = self.idle_unload_seconds if idle_seconds is None else idle_seconds
+
+        with self._busy_lock:
+            if self._busy:
+                return 0
+
+        now = time.monotonic()
+        idle = [name for name, used in list(self._last_used.items())
+                if now - used >= idle_seconds]
+
+        return sum(self.unload(name) for name in idle)
+
+    def start_idle_unload(self) -> bool:
+        """Start the idle-unload thread if [AI] model_idle_unload_minutes is set"""
+        if self.idle_unload_seconds <= 0:
+            return False
+        if self._unload_thread and self._unload_thread.is_alive():
+            return True
+
+        self._stop.clear()
+
+        def _run():
+            while not self._stop.wait(min(60.0, self.idle_unload_seconds / 2)):
+                try:
+                    self.unload_idle()
+                except Exception as e:
+                    self.logger.error(f"Unloading idle AI models failed: {e}")
+
+        self._unload_thread = threading.Thread(target=_run, name='ModelIdleUnload', daemon=True)
+        self._unload_thread.start()
+        return True
 
-        self.logger.info("AI model loading complete.")
+    def stop(self):
+        """Stop the warm-up and idle-unload threads"""
+        self._stop.set()
 
 def get_ai_service():
     """Global accessor for the AIService singleton instance."""
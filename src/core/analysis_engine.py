@@ -0,0 +1,326 @@
+"""
+Multi-process analysis engine
+
+Runs AIAnalyzer.iter_analysis in worker processes. Each worker loads the AI
+models once and runs one analysis pipeline for the whole case, fed with
+work units (up to [AI] batch_size files, images first) taken from a shared
+queue. Results stream back over a result queue and are written to the
+database by the calling thread as they arrive, so workers never open the
+case database.
+
+Torch, OpenCV and BLAS intra-op threads are limited to an equal share of the
+CPU cores per worker, so N workers do not each start one thread per core.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from .ai_analyzer import AIAnalyzer
+from .analysis_pipeline import merge_stats
+from ..database.db_manager import case_in_use
+from ..database.file_repository import FileRepository
+from ..database.maintenance import get_maintenance
+from ..utils.logger import get_logger
+from ..utils.config_loader import get_config
+
+# Thread pools sized from these variables when the libraries are imported
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+def _limit_threads(threads: int):
+    """Cap intra-op threads of the libraries used by the models"""
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    except (ImportError, RuntimeError):
+        pass
+
+    try:
+        import cv2
+        cv2.setNumThreads(threads)
+    except ImportError:
+        pass
+
+def _worker_main(worker_id: int, threads: int, task_queue, result_queue):
+    """
+    Worker process: load models once, then analyze work units until None
+
+    The units feed one long-lived pipeline, so its stages stay busy across
+    unit boundaries.
+
+    Messages put on result_queue:
+        ('ready', worker_id, None)
+        ('start', worker_id, unit_id)
+        ('result', unit_id, results)
+        ('error', unit_id, (file_id, message))
+        ('done', worker_id, pipeline stage statistics)
+        ('fatal', worker_id, message)
+    """
+    try:
+        _limit_threads(threads)
+
+        from .ai_service import AIService
+        service = AIService()
+        service.thread_budget = threads
+        analyzer = AIAnalyzer(service)
+    except Exception as e:
+        result_queue.put(('fatal', worker_id, str(e)))
+        return
+
+    result_queue.put(('ready', worker_id, None))
+
+    unit_of = {}  # file_id -> unit_id of the files in the pipeline
+
+    def _files():
+        """Files of the work units, pulled as the pipeline has room"""
+        while True:
+            unit = task_queue.get()
+            if unit is None:
+                return
+
+            unit_id, files = unit
+            result_queue.put(('start', worker_id, unit_id))
+            for file_data in files:
+                unit_of[file_data['file_id']] = unit_id
+                yield file_data
+
+    for file_data, results in analyzer.iter_analysis(_files(), decode_workers=threads):
+        unit_id = unit_of.pop(file_data['file_id'])
+        if isinstance(results, Exception):
+            result_queue.put(('error', unit_id, (file_data['file_id'], str(results))))
+        else:
+            result_queue.put(('result', unit_id, results))
+
+    result_queue.put(('done', worker_id, analyzer.last_pipeline_stats))
+
+
+class AnalysisEngine:
+    """Analyze a case with a pool of worker processes"""
+
+    def __init__(self, num_workers: int = 4, unit_size: int = 32,
+                 threads_per_worker: Optional[int] = None):
+        """
+        Args:
+            num_workers: Worker processes
+            unit_size: Files per work unit (also the image batch size)
+            threads_per_worker: Intra-op threads per worker
+                                (default: CPU cores / num_workers)
+        """
+        self.num_workers = max(1, num_workers)
+        self.unit_size = max(1, unit_size)
+        self.threads_per_worker = threads_per_worker or max(
+            1, (os.cpu_count() or 1) // self.num_workers
+        )
+        self.file_repo = FileRepository()
+        self.logger = get_logger()
+        self._cancelled = threading.Event()
+        self._context = multiprocessing.get_context('spawn')
+
+    @classmethod
+    def from_config(cls) -> 'AnalysisEngine':
+        """Create from [AI] max_workers and batch_size"""
+        config = get_config()
+        return cls(
+            num_workers=config.get_int('AI', 'max_workers', 4),
+            unit_size=config.get_int('AI', 'batch_size', 32)
+        )
+
+    def cancel(self):
+        """Stop analyze_case; files already analyzed stay saved"""
+        self._cancelled.set()
+
+    def _build_units(self, files) -> Dict[int, List[Dict]]:
+        """Split files into work units; images are grouped for batched classification"""
+        payloads = [
+            {
+                'file_id': f['file_id'],
+                'file_name': f['file_name'],
+                'file_path': f['file_path'],
+                'file_type': f['file_type'],
+                'file_hash': f.get('file_hash')
+            }
+            for f in files
+        ]
+        payloads.sort(key=lambda f: f['file_type'] != 'image')
+
+        return {
+            unit_id: payloads[start:start + self.unit_size]
+            for unit_id, start in enumerate(range(0, len(payloads), self.unit_size))
+        }
+
+    def _start_worker(self, worker_id: int, task_queue, result_queue):
+        """Spawn one worker process"""
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, self.threads_per_worker, task_queue, result_queue),
+            name=f'AnalysisWorker-{worker_id}',
+            daemon=True
+        )
+
+        # The child imports torch before _worker_main runs; thread pools
+        # read these when they are created, so they must be inherited
+        saved = {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+        os.environ.update({name: str(self.threads_per_worker) for name in THREAD_ENV_VARS})
+        try:
+            process.start()
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+        return process
+
+    def analyze_case(self, case_id: int, progress_callback: Callable = None) -> Dict:
+        """
+        Analyze all unprocessed files in a case (see AIAnalyzer.analyze_case)
+
+        Args:
+            case_id: Case ID to analyze
+            progress_callback: Function(current, total, filename)
+
+        Returns:
+            Summary statistics
+        """
+        # The case cannot be deleted while it is analyzed
+        with case_in_use(case_id):
+            return self._analyze_case(case_id, progress_callback)
+
+    def _analyze_case(self, case_id: int, progress_callback: Callable = None) -> Dict:
+        """Analyze a case (the caller marks it in use)"""
+        self._cancelled.clear()
+
+        files = self.file_repo.get_unprocessed_files(case_id, with_details=True)
+        stats = AIAnalyzer.new_stats(len(files))
+
+        if not files:
+            self.logger.info("No unprocessed files found")
+            return stats
+
+        # Workers look files up in the analysis cache as they read them
+        by_id = {f['file_id']: f for f in files}
+        version = AIAnalyzer.analysis_version()
+        done = 0
+
+        units = self._build_units(files)
+        pending = {unit_id: {f['file_id']: f['file_name'] for f in unit}
+                   for unit_id, unit in units.items()}
+        worker_count = min(self.num_workers, len(units))
+
+        self.logger.info(
+            f"Starting case analysis: {len(files)} files in {len(units)} units, "
+            f"{worker_count} worker processes x {self.threads_per_worker} threads"
+        )
+
+        task_queue = self._context.Queue()
+        result_queue = self._context.Queue()
+        for unit_id, unit in units.items():
+            task_queue.put((unit_id, unit))
+        for _ in range(worker_count):
+            task_queue.put(None)
+
+        workers = {
+            worker_id: self._start_worker(worker_id, task_queue, result_queue)
+            for worker_id in range(worker_count)
+        }
+        started_units = {}  # worker_id -> units it took
+        finished = set()  # Workers that sent their pipeline statistics
+        fatal = 0
+
+        def _finish(unit_id, file_id, error=None):
+            nonlocal done
+            file_name = pending[unit_id].pop(file_id, None)
+            if file_name is None:
+                return
+            done += 1
+            if error is not None:
+                self.logger.error(f"Error analyzing {file_name}: {error}")
+                stats['errors'] += 1
+            if progress_callback:
+                progress_callback(done, stats['total'], file_name)
+
+        try:
+            # Runs until every file is done and every live worker has sent 'done'
+            while ((any(pending.values()) or set(workers) - finished)
+                   and not self._cancelled.is_set()):
+                try:
+                    kind, key, payload = result_queue.get(timeout=0.5)
+                except queue.Empty:
+                    # A worker that died took the files of its units with it
+                    for worker_id, process in list(workers.items()):
+                        if process.is_alive():
+                            continue
+                        del workers[worker_id]
+                        for unit_id in started_units.pop(worker_id, ()):
+                            for file_id in list(pending[unit_id]):
+                                _finish(unit_id, file_id, "analysis worker exited")
+                    if not workers:
+                        if any(pending.values()):
+                            raise RuntimeError("All analysis workers exited")
+                        break
+                    continue
+
+                if kind == 'result':
+                    try:
+                        self.file_repo.update_ai_analysis(payload['file_id'],
+                                                          AIAnalyzer.analysis_data(payload))
+                        AIAnalyzer.count_results(stats, payload)
+                        AIAnalyzer.store_cached(by_id[payload['file_id']], payload, version)
+                        _finish(key, payload['file_id'])
+                    except Exception as e:
+                        _finish(key, payload['file_id'], e)
+                elif kind == 'error':
+                    file_id, message = payload
+                    _finish(key, file_id, message)
+                elif kind == 'start':
+                    started_units.setdefault(key, []).append(payload)
+                elif kind == 'done':
+                    finished.add(key)
+                    started_units.pop(key, None)
+                    merge_stats(stats.setdefault('pipeline', {}), payload)
+                elif kind == 'fatal':
+                    fatal += 1
+                    self.logger.error(f"Analysis worker {key} failed to start: {payload}")
+                    if fatal == worker_count:
+                        raise RuntimeError(f"Analysis workers failed to start: {payload}")
+        finally:
+            self._stop_workers(workers.values())
+
+        if self._cancelled.is_set():
+            self.logger.info(f"Case analysis cancelled after {done} of {stats['total']} files")
+        self._finish_case(case_id, stats)
+
+        return stats
+
+    def _finish_case(self, case_id: int, stats: Dict):
+        """Log the summary and schedule maintenance of the rewritten rows"""
+        self.logger.info(f"Case analysis complete. Processed: {stats['processed']}, Errors: {stats['errors']}")
+        if stats['cache_lookups']:
+            self.logger.info(AIAnalyzer.cache_summary(stats))
+        if stats['ocr_skipped']:
+            self.logger.info(f"OCR skipped by the text prefilter: {stats['ocr_skipped']} images")
+        if stats.get('pipeline'):
+            # Summed over all worker processes
+            for line in AIAnalyzer.pipeline_summary(stats['pipeline']):
+                self.logger.info(line)
+
+        # Analysis rewrote most rows; optimize on the next idle pass
+        get_maintenance().mark_dirty(case_id)
+
+    def _stop_workers(self, processes, timeout: float = 5.0):
+        """Wait briefly for workers to exit, then terminate the rest"""
+        deadline = time.monotonic() + timeout
+        for process in processes:
+            if self._cancelled.is_set():
+                process.terminate()
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+                process.join(1.0)
@@ -0,0 +1,283 @@
+"""
+Staged analysis pipeline with bounded queues
+
+Each stage runs its function on its own worker threads and passes items to
+the next stage over a bounded queue. A stage that falls behind fills its
+input queue, which blocks the stages before it (backpressure), so memory
+stays bounded while every stage works in parallel: files are read while
+others are decoded while the models run.
+
+Every stage records how its workers spent their time:
+
+    busy     running the stage function
+    starved  waiting for input (the stages before it are slower)
+    blocked  waiting for room in the next queue (the stages after it are slower)
+
+The stage with the highest utilization (busy / worker time) is the
+bottleneck on the current machine.
+"""
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Queue end marker
+_END = object()
+
+# How long a batch stage waits for more items before running a partial batch
+BATCH_WAIT_SECONDS = 0.05
+
+class Stage:
+    """One pipeline step"""
+
+    def __init__(self, name: str, func: Callable, workers: int = 1,
+                 queue_size: int = 16, batch_size: int = 1):
+        """
+        Args:
+            name: Stage name used in statistics
+            func: item -> item, or [items] -> [items] when batch_size > 1
+            workers: Threads running func
+            queue_size: Capacity of the stage's input queue
+            batch_size: Items per call of func (1 = one item per call)
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+
+        self.items = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+        self.capacity = 0.0  # Worker seconds (lifetime x workers)
+        self._lock = threading.Lock()
+
+    def record(self, items: int = 0, busy: float = 0.0,
+               starved: float = 0.0, blocked: float = 0.0):
+        """Add to the stage's counters (called by its workers)"""
+        with self._lock:
+            self.items += items
+            self.busy += busy
+            self.starved += starved
+            self.blocked += blocked
+
+    def stats(self) -> Dict:
+        """Get counters as a dict (see merge_stats)"""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'items': self.items,
+                'busy': self.busy,
+                'starved': self.starved,
+                'blocked': self.blocked,
+                'capacity': self.capacity,
+                'utilization': self.busy / self.capacity if self.capacity else 0.0
+            }
+
+
+class Pipeline:
+    """
+    Run items through stages, each with its own threads and bounded input queue
+
+    Iterate run(items) to get (item, error) pairs in completion order. An
+    exception raised by a stage function is returned as the error of the
+    items it was processing, and those items skip the remaining stages. An
+    exception raised by the input iterable ends the run: it is re-raised by
+    run() once the items already fed have completed.
+
+    The time the caller spends between iterations is recorded as a final
+    stage (sink_name), so consumer work such as database writes shows up in
+    the statistics too.
+    """
+
+    def __init__(self, stages: List[Stage], sink_name: str = 'consumer'):
+        self.stages = stages
+        self.sink = Stage(sink_name, func=None)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._feed_error: Optional[BaseException] = None
+
+    def stop(self):
+        """Stop all stages; items in flight are dropped"""
+        self._stop.set()
+
+    def _put(self, target: queue.Queue, entry, stage: Optional[Stage] = None) -> bool:
+        """Put with backpressure, giving up if the pipeline is stopped"""
+        started = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    target.put(entry, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            if stage is not None:
+                stage.record(blocked=time.perf_counter() - started)
+
+    def _get(self, source: queue.Queue, timeout: Optional[float] = None):
+        """Get, returning _END once the pipeline is stopped (queue.Empty on timeout)"""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while not self._stop.is_set():
+            wait = 0.1 if deadline is None else min(0.1, deadline - time.perf_counter())
+            if wait <= 0:
+                raise queue.Empty
+            try:
+                return source.get(timeout=wait)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _worker(self, stage: Stage, source: queue.Queue, target: queue.Queue,
+                remaining: List[int], lock: threading.Lock):
+        """Worker thread: apply stage.func until the end marker arrives"""
+        while True:
+            started = time.perf_counter()
+            entry = self._get(source)
+            if entry is _END:
+                break
+
+            batch = [entry]
+            ended = False
+            while len(batch) < stage.batch_size:
+                try:
+                    entry = self._get(source, BATCH_WAIT_SECONDS)
+                except queue.Empty:
+                    break
+                if entry is _END:
+                    ended = True
+                    break
+                batch.append(entry)
+
+            stage.record(starved=time.perf_counter() - started)
+
+            # Items that failed upstream skip this stage
+            work = [entry for entry in batch if entry[1] is None]
+            if work:
+                started = time.perf_counter()
+                try:
+                    if stage.batch_size > 1:
+                        outputs = stage.func([item for item, _ in work])
+                    else:
+                        outputs = [stage.func(work[0][0])]
+                    done = [(item, None) for item in outputs]
+                except Exception as e:
+                    done = [(item, e) for item, _ in work]
+                stage.record(items=len(work), busy=time.perf_counter() - started)
+
+                failed = [entry for entry in batch if entry[1] is not None]
+                batch = done + failed
+
+            stopped = False
+            for entry in batch:
+                if not self._put(target, entry, stage):
+                    stopped = True
+                    break
+
+            if ended or stopped:
+                break
+
+        # Let sibling workers see the end marker; the last one forwards it
+        # (and records the stage's capacity, also when stopped early)
+        self._put(source, _END)
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            stage.capacity = (time.perf_counter() - self._started) * stage.workers
+            self._put(target, _END)
+
+    def _feed(self, items: Iterable, target: queue.Queue):
+        """Source thread: put the input items on the first queue"""
+        try:
+            for item in items:
+                if not self._put(target, (item, None)):
+                    return
+        except BaseException as e:
+            self._feed_error = e
+        finally:
+            # Always end the stream, or the stages and run() wait forever
+            self._put(target, _END)
+
+    def run(self, items: Iterable) -> Iterator[Tuple[object, Optional[Exception]]]:
+        """
+        Start the stages and yield (item, error) as items complete
+
+        Closing the iterator early stops the pipeline.
+        """
+        self._stop.clear()
+        self._feed_error = None
+        self._started = time.perf_counter()
+
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        output = queue.Queue(maxsize=max(s.queue_size for s in self.stages))
+        queues.append(output)
+
+        self._threads = [threading.Thread(target=self._feed, args=(items, queues[0]),
+                                          name='Pipeline-feed', daemon=True)]
+        for index, stage in enumerate(self.stages):
+            remaining, lock = [stage.workers], threading.Lock()
+            for number in range(stage.workers):
+                self._threads.append(threading.Thread(
+                    target=self._worker,
+                    args=(stage, queues[index], queues[index + 1], remaining, lock),
+                    name=f'Pipeline-{stage.name}-{number}',
+                    daemon=True
+                ))
+
+        for thread in self._threads:
+            thread.start()
+
+        try:
+            while True:
+                started = time.perf_counter()
+                entry = self._get(output)
+                self.sink.record(starved=time.perf_counter() - started)
+                if entry is _END:
+                    if self._feed_error is not None:
+                        raise self._feed_error
+                    break
+
+                started = time.perf_counter()
+                yield entry
+                self.sink.record(items=1, busy=time.perf_counter() - started)
+        finally:
+            self.stop()
+            for thread in self._threads:
+                thread.join()
+            self.sink.capacity = time.perf_counter() - self._started
+
+    def stats(self) -> Dict[str, Dict]:
+        """Get per-stage statistics, in pipeline order"""
+        return {stage.name: stage.stats() for stage in self.stages + [self.sink]}
+
+
+def merge_stats(total: Dict[str, Dict], stats: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Add the statistics of one pipeline run to a running total (in place)"""
+    for name, stage in stats.items():
+        merged = total.setdefault(name, {
+            'workers': stage['workers'], 'items': 0, 'busy': 0.0,
+            'starved': 0.0, 'blocked': 0.0, 'capacity': 0.0
+        })
+        for key in ('items', 'busy', 'starved', 'blocked', 'capacity'):
+            merged[key] += stage[key]
+        merged['utilization'] = merged['busy'] / merged['capacity'] if merged['capacity'] else 0.0
+    return total
+
+def format_stats(stats: Dict[str, Dict]) -> List[str]:
+    """One summary line per stage; the busiest stage is marked as the bottleneck"""
+    if not stats:
+        return []
+
+    bottleneck = max(stats, key=lambda name: stats[name]['utilization'])
+    lines = []
+    for name, stage in stats.items():
+        marker = '  <- bottleneck' if name == bottleneck else ''
+        lines.append(
+            f"{name:<10} {stage['workers']:>2} workers {stage['items']:>7} items  "
+            f"busy {stage['utilization']:>4.0%}  starved {stage['starved']:>7.1f}s  "
+            f"blocked {stage['blocked']:>7.1f}s{marker}"
+        )
+    return lines
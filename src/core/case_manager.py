@@ -8,6 +8,9 @@ from ..database.case_repository import CaseRepository
 from ..database.file_repository import FileRepository
 from ..database.audit_repository import AuditRepository
 
+# File IDs recorded in a bulk action's audit entry (the count is always kept)
+AUDIT_FILE_ID_LIMIT = 100
+
 class CaseManager:
     """Manage forensic cases"""
     
@@ -64,6 +67,7 @@ class CaseManager:
             action='close_case',
             case_id=case_id
         )
+        self.audit_repo.flush()
     
     def get_case_summary(self, case_id: int) -> Dict:
         """Get comprehensive case summary"""
@@ -95,10 +99,62 @@ class CaseManager:
             action='delete_case',
             case_id=case_id
         )
+        self.audit_repo.flush()
         
-        # Delete case (cascade deletes files, faces, etc.)
+        # Delete the case database files, then the case record
         return self.case_repo.delete_case(case_id)
     
+    def triage_files(self, case_id: int, action: str, file_ids: Optional[List[int]] = None,
+                     search_params: Optional[Dict] = None, value: str = '') -> int:
+        """
+        Flag, unflag, tag or annotate many files at once
+
+        Runs as one transaction, writes one audit entry and refreshes the
+        case counts once.
+
+        Args:
+            case_id: Case ID
+            action: 'flag', 'unflag', 'tag' or 'note'
+            file_ids: Files to change, or
+            search_params: search_files filters selecting the files
+            value: Flag reason, tag name or note text
+
+        Returns:
+            Number of files selected
+        """
+        if file_ids is not None:
+            file_ids = list(file_ids)  # May be a generator; it is used twice
+
+        if action == 'flag':
+            count = self.file_repo.flag_files(case_id, file_ids, search_params, reason=value)
+        elif action == 'unflag':
+            count = self.file_repo.unflag_files(case_id, file_ids, search_params)
+        elif action == 'tag':
+            count = self.file_repo.tag_files(case_id, value, file_ids, search_params)
+        elif action == 'note':
+            count = self.file_repo.add_note_to_files(case_id, value, file_ids, search_params)
+        else:
+            raise ValueError(f"Unknown triage action: {action}")
+
+        if action in ('flag', 'unflag'):
+            self.case_repo.update_file_counts(case_id)
+
+        details = {'file_count': count, 'value': value}
+        if search_params is not None:
+            details['search_params'] = search_params
+        else:
+            details['file_ids'] = file_ids[:AUDIT_FILE_ID_LIMIT]
+            if len(file_ids) > AUDIT_FILE_ID_LIMIT:
+                details['file_ids_omitted'] = len(file_ids) - AUDIT_FILE_ID_LIMIT
+
+        self.audit_repo.log_action(
+            action=f'bulk_{action}',
+            case_id=case_id,
+            details=details
+        )
+
+        return count
+
     def _generate_case_number(self) -> str:
         """Generate unique case number"""
         # Format: CASE-YYYY-NNNN
@@ -27,6 +27,7 @@ from threading import Thread
 from ..utils.logger import get_logger
 from ..database.file_repository import FileRepository
 from ..database.case_repository import CaseRepository
+from ..database.maintenance import get_maintenance
 
 
 @dataclass
@@ -352,6 +353,7 @@ class ExtractionLoader:
                 progress_callback(95, 100, "Finalizing...")
 
             self.case_repo.update_file_counts(case_id)
+            get_maintenance().after_import(case_id, stats['processed'])
 
             # Complete
             elapsed = (datetime.now() - start_time).total_seconds()
@@ -7,6 +7,7 @@ from ..utils.file_utils import scan_directory, get_file_category, get_file_hash
 from .metadata_extractor import MetadataExtractor
 from ..database.file_repository import FileRepository
 from ..database.case_repository import CaseRepository
+from ..database.maintenance import get_maintenance
 
 from ..utils.logger import get_logger
 
@@ -102,6 +103,9 @@ class FileScanner:
         # Update case file counts
         self.case_repo.update_file_counts(case_id)
 
+        # Refresh planner statistics (ANALYZE now if the import was large)
+        get_maintenance().after_import(case_id, stats['imported'])
+
         return stats
     
     def _import_file(self, file_path: Path, case_id: int, file_type: str, base_directory: Path = None):
@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Dict, List
 from datetime import datetime
 from ..database.file_repository import FileRepository
+from ..database.tag_repository import TagRepository
 from ..utils.logger import get_logger
 import json
 
@@ -15,6 +16,7 @@ class ForensicSearchEngine:
     def __init__(self):
         self.logger = get_logger()
         self.file_repo = FileRepository()
+        self.tag_repo = TagRepository()
 
     def search(self, case_id: int, search_params: Dict) -> List[Dict]:
         """
@@ -37,7 +39,7 @@ class ForensicSearchEngine:
         self.logger.info(f"Search params: {search_params}")
 
         # Get files from case
-        all_files = self.file_repo.get_files_by_case(case_id)
+        all_files = self.file_repo.get_files_by_case(case_id, with_details=True)
 
         # Filter by file type if specified
         if search_params.get('file_types') != 'all':
@@ -46,10 +48,26 @@ class ForensicSearchEngine:
 
         self.logger.info(f"Searching through {len(all_files)} files")
 
+        # Resolve keyword -> tagged file IDs once instead of decoding tags per file
+        tag_hits = {
+            keyword: set(self.tag_repo.get_file_ids_matching(case_id, keyword))
+            for keyword in search_params.get('keywords') or []
+        }
+
+        # Same for OCR text, via the full-text index (text may be compressed);
+        # terms match word prefixes, not substrings inside words
+        terms = list(search_params.get('keywords') or [])
+        if search_params.get('person'):
+            terms.append(search_params['person'])
+        text_hits = {
+            term: set(self.file_repo.get_file_ids_matching_text(case_id, term))
+            for term in terms
+        }
+
         results = []
 
         for file_data in all_files:
-            matches = self._check_file_matches(file_data, search_params)
+            matches = self._check_file_matches(file_data, search_params, tag_hits, text_hits)
             if matches['is_match']:
                 file_data['match_details'] = matches
                 results.append(file_data)
@@ -61,10 +79,17 @@ class ForensicSearchEngine:
 
         return results
 
-    def _check_file_matches(self, file_data: Dict, search_params: Dict) -> Dict:
+    def _check_file_matches(self, file_data: Dict, search_params: Dict,
+                            tag_hits: Dict = None, text_hits: Dict = None) -> Dict:
         """
         Check if a file matches search criteria
 
+        Args:
+            file_data: File record
+            search_params: Search criteria
+            tag_hits: Optional mapping of keyword -> set of file IDs with a matching tag
+            text_hits: Optional mapping of term -> set of file IDs with matching OCR text
+
         Returns:
             Dictionary with match details
         """
@@ -81,8 +106,8 @@ class ForensicSearchEngine:
                 match_info['match_count'] += 1
 
         # Search in OCR text
-        if file_data.get('ocr_text') and search_params.get('person'):
-            if self._search_in_text(file_data['ocr_text'], search_params['person']):
+        if search_params.get('person'):
+            if self._text_matches(file_data, search_params['person'], text_hits):
                 match_info['matches'].append(f"Name found in file content")
                 match_info['match_count'] += 1
 
@@ -95,12 +120,16 @@ class ForensicSearchEngine:
                     match_info['match_count'] += 1
 
                 # Check in OCR text
-                if file_data.get('ocr_text') and self._search_in_text(file_data['ocr_text'], keyword):
+                if self._text_matches(file_data, keyword, text_hits):
                     match_info['matches'].append(f"Keyword '{keyword}' in content")
                     match_info['match_count'] += 1
 
                 # Check in AI tags
-                if file_data.get('ai_tags'):
+                if tag_hits is not None and keyword in tag_hits:
+                    if file_data['file_id'] in tag_hits[keyword]:
+                        match_info['matches'].append(f"Keyword '{keyword}' in AI tags")
+                        match_info['match_count'] += 1
+                elif file_data.get('ai_tags'):
                     try:
                         tags = json.loads(file_data['ai_tags']) if isinstance(file_data['ai_tags'], str) else file_data['ai_tags']
                         for tag in tags:
@@ -123,6 +152,12 @@ class ForensicSearchEngine:
 
         return match_info
 
+    def _text_matches(self, file_data: Dict, term: str, text_hits: Dict = None) -> bool:
+        """Check OCR text via precomputed full-text hits, else by loading the text"""
+        if text_hits is not None and term in text_hits:
+            return file_data['file_id'] in text_hits[term]
+        return self._search_in_text(file_data.get('ocr_text'), term)
+
     def _search_in_text(self, text: str, search_term: str) -> bool:
         """Case-insensitive text search"""
         if not text or not search_term:
@@ -171,13 +206,23 @@ class ForensicSearchEngine:
             self.logger.info("Performing face matching search")
 
             # Get all image files from case
-            all_images = [f for f in self.file_repo.get_files_by_case(case_id)
+            all_images = [f for f in self.file_repo.get_files_by_case(case_id, with_details=True)
                          if f['file_type'] == 'image']
 
+            # Faces stored during analysis are matched in one vectorized query;
+            # images without stored faces are checked one by one
+            indexed = {m['file_id']: m for m in face_matcher.match_case(case_id)}
+            unstored = face_matcher.unmatched_file_ids(case_id)
+
             for img_data in all_images:
                 try:
-                    file_path = Path(img_data['file_path'])
-                    match_result = face_matcher.match_faces_in_image(file_path)
+                    if img_data['ai_processed'] and img_data['file_id'] not in unstored:
+                        match = indexed.get(img_data['file_id'])
+                        match_result = {'has_match': match is not None,
+                                        'confidence': match['confidence'] if match else 0.0}
+                    else:
+                        file_path = Path(img_data['file_path'])
+                        match_result = face_matcher.match_faces_in_image(file_path)
 
                     if match_result['has_match']:
                         # Add to results if not already there
@@ -18,6 +18,7 @@ import json
 from ..database.case_repository import CaseRepository
 from ..database.file_repository import FileRepository
 from ..database.audit_repository import AuditRepository
+from ..database.tag_repository import TagRepository
 from ..utils.logger import get_logger
 
 class ReportGenerator:
@@ -28,6 +29,7 @@ class ReportGenerator:
         self.case_repo = CaseRepository()
         self.file_repo = FileRepository()
         self.audit_repo = AuditRepository()
+        self.tag_repo = TagRepository()
     
     def generate_report(self, case_id: int, output_path: Path,
                        include_thumbnails: bool = True,
@@ -54,7 +56,7 @@ class ReportGenerator:
                 raise ValueError(f"Case {case_id} not found")
 
             stats = self.case_repo.get_case_statistics(case_id)
-            flagged_files = self.file_repo.get_files_by_case(case_id, flagged_only=True)
+            flagged_files = self.file_repo.get_files_by_case(case_id, flagged_only=True, with_details=True)
 
             # Get files based on report type
             if flagged_only:
@@ -62,8 +64,14 @@ class ReportGenerator:
                 if not files:
                     raise ValueError("No flagged evidence found in this case")
             else:
-                files = self.file_repo.get_files_by_case(case_id)
+                files = self.file_repo.get_files_by_case(case_id, with_details=True)
 
+            # Record the report in the audit trail; get_case_logs flushes it
+            self.audit_repo.log_action(
+                action='generate_report',
+                case_id=case_id,
+                details={'report_type': report_type, 'output': str(output_path)}
+            )
             audit_logs = self.audit_repo.get_case_logs(case_id, limit=50)
             
             # Create PDF
@@ -106,7 +114,7 @@ class ReportGenerator:
             story.append(PageBreak())
             
             # AI Analysis Results
-            story.extend(self._build_ai_analysis(files, styles))
+            story.extend(self._build_ai_analysis(case_id, files, styles, flagged_only))
             story.append(PageBreak())
             
             # Audit Trail
@@ -224,7 +232,7 @@ class ReportGenerator:
         • Files with AI analysis: {stats.get('processed_files', 0)}<br/>
         • Flagged items requiring attention: {stats.get('flagged_files', 0)}<br/>
         • Faces detected across evidence: {stats.get('total_faces', 0)}<br/>
-        • Files containing text: {stats.get('files_with_faces', 0)}<br/>
+        • Files containing text: {stats.get('files_with_text', 0)}<br/>
         """
         
         story.append(Paragraph(summary_text, styles['Normal']))
@@ -289,6 +297,7 @@ class ReportGenerator:
             ['Flagged Files', str(stats.get('flagged_files', 0))],
             ['Files with Faces', str(stats.get('files_with_faces', 0))],
             ['Total Faces Detected', str(stats.get('total_faces', 0))],
+            ['Files with Text', str(stats.get('files_with_text', 0))],
             ['Unique Dates', str(stats.get('unique_dates', 0))],
         ]
         
@@ -412,7 +421,8 @@ class ReportGenerator:
         
         return story
     
-    def _build_ai_analysis(self, files: List[Dict], styles) -> List:
+    def _build_ai_analysis(self, case_id: int, files: List[Dict], styles,
+                           flagged_only: bool = False) -> List:
         """Build AI analysis results section"""
         story = []
         
@@ -426,27 +436,16 @@ class ReportGenerator:
             story.append(Paragraph("No AI analysis has been performed yet.", styles['Normal']))
             return story
         
-        # Tag frequency analysis
-        all_tags = []
-        for file_data in analyzed:
-            if file_data.get('ai_tags'):
-                try:
-                    tags = json.loads(file_data['ai_tags'])
-                    all_tags.extend(tags)
-                except:
-                    pass
+        # Tag frequency analysis (GROUP BY over normalized file_tags)
+        top_tags = self.tag_repo.get_tag_counts(case_id, flagged_only=flagged_only, limit=10)
         
-        if all_tags:
-            from collections import Counter
-            tag_counts = Counter(all_tags)
-            top_tags = tag_counts.most_common(10)
-            
+        if top_tags:
             story.append(Paragraph("Top 10 Detected Tags:", styles['CustomSubHeading']))
             story.append(Spacer(1, 0.1*inch))
             
             tag_data = [['Tag', 'Occurrences']]
-            for tag, count in top_tags:
-                tag_data.append([tag, str(count)])
+            for tag in top_tags:
+                tag_data.append([tag['tag_name'], str(tag['file_count'])])
             
             tag_table = Table(tag_data, colWidths=[3*inch, 1.5*inch])
             tag_table.setStyle(TableStyle([
@@ -474,7 +473,7 @@ class ReportGenerator:
         ))
         
         # OCR summary
-        files_with_text = len([f for f in analyzed if f.get('ocr_text')])
+        files_with_text = len([f for f in analyzed if f.get('has_text')])
         
         story.append(Spacer(1, 0.2*inch))
         story.append(Paragraph("Text Extraction Summary:", styles['CustomSubHeading']))
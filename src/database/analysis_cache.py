@@ -0,0 +1,190 @@
+"""
+Content-addressed cache of AI analysis results
+
+The same images recur across devices and cases (forwarded photos, stock
+images, app assets). Results are stored by SHA-256 of the file content plus
+the analyzer version, in a database shared by all cases, so a repeated file
+gets the stored tags, faces, OCR text and objects instead of running the
+models again.
+
+The cache is bounded by the total size of the stored results; the least
+recently used entries are evicted first.
+"""
+import json
+import threading
+import time
+from typing import Dict, Iterable, Optional
+from .compression import compress_text, decompress_text
+from .db_manager import DatabaseManager, analysis_cache_path
+
+# Defaults, overridden by [AI] analysis_cache_enabled / analysis_cache_max_mb
+DEFAULT_MAX_MB = 256
+
+# Eviction frees space down to this fraction of the limit
+EVICT_TO = 0.9
+
+# Bound parameters per SELECT ... IN (...)
+LOOKUP_CHUNK = 500
+
+# Keys of AIAnalyzer results that describe the file or lookup, not its content
+FILE_KEYS = ('file_id', 'file_hash', 'cache_hit')
+
+class AnalysisCache:
+    """Persistent (content hash, analyzer version) -> analysis results map"""
+
+    def __init__(self, db: DatabaseManager, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.db = db
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = None  # Loaded on first put
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls) -> Optional['AnalysisCache']:
+        """Create from settings.ini (None if [AI] analysis_cache_enabled is off)"""
+        max_mb = DEFAULT_MAX_MB
+        try:
+            from ..utils.config_loader import get_config
+            config = get_config()
+            if not config.get_bool('AI', 'analysis_cache_enabled', True):
+                return None
+            max_mb = config.get_float('AI', 'analysis_cache_max_mb', max_mb)
+        except FileNotFoundError:
+            pass
+
+        db = DatabaseManager(analysis_cache_path(), schema_name='analysis_cache_schema.sql')
+        return cls(db, int(max_mb * 1024 * 1024))
+
+    def get_many(self, content_hashes: Iterable[str], version: str) -> Dict[str, Dict]:
+        """
+        Look up results of many files
+
+        Returns:
+            content_hash -> results for the hashes found
+        """
+        hashes = list(dict.fromkeys(h for h in content_hashes if h))
+        found = {}
+
+        for start in range(0, len(hashes), LOOKUP_CHUNK):
+            chunk = hashes[start:start + LOOKUP_CHUNK]
+            placeholders = ', '.join('?' * len(chunk))
+            rows = self.db.execute_query(f'''
+                SELECT content_hash, results FROM analysis_cache
+                WHERE analyzer_version = ? AND content_hash IN ({placeholders})
+            ''', (version, *chunk))
+
+            for row in rows:
+                found[row['content_hash']] = json.loads(decompress_text(row['results']))
+
+        if found:
+            now = time.time()
+            with self.db.transaction() as conn:
+                conn.executemany('''
+                    UPDATE analysis_cache
+                    SET hit_count = hit_count + 1, last_used = ?
+                    WHERE content_hash = ? AND analyzer_version = ?
+                ''', [(now, content_hash, version) for content_hash in found])
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(hashes) - len(found)
+
+        return found
+
+    def get(self, content_hash: str, version: str) -> Optional[Dict]:
+        """Look up the results of one file, or None"""
+        return self.get_many([content_hash], version).get(content_hash)
+
+    def put(self, content_hash: str, version: str, results: Dict):
+        """Store the results of a file (file_id and file_hash are dropped)"""
+        if not content_hash or self.max_bytes <= 0:
+            return
+
+        payload = {key: value for key, value in results.items() if key not in FILE_KEYS}
+        blob = compress_text(json.dumps(payload), min_bytes=0)
+        size = len(blob)
+
+        with self._lock:
+            with self.db.transaction() as conn:
+                if self._total_bytes is None:
+                    self._total_bytes = conn.execute(
+                        'SELECT IFNULL(SUM(result_size), 0) FROM analysis_cache'
+                    ).fetchone()[0]
+
+                previous = conn.execute('''
+                    SELECT result_size FROM analysis_cache
+                    WHERE content_hash = ? AND analyzer_version = ?
+                ''', (content_hash, version)).fetchone()
+
+                conn.execute('''
+                    INSERT OR REPLACE INTO analysis_cache
+                    (content_hash, analyzer_version, results, result_size, last_used)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (content_hash, version, blob, size, time.time()))
+
+                self._total_bytes += size - (previous[0] if previous else 0)
+                self.stores += 1
+
+                if self._total_bytes > self.max_bytes:
+                    self._evict(conn, int(self.max_bytes * EVICT_TO))
+
+    def _evict(self, conn, target_bytes: int):
+        """Delete least recently used entries until at most target_bytes remain"""
+        victims = []
+        for row in conn.execute('''
+            SELECT content_hash, analyzer_version, result_size
+            FROM analysis_cache ORDER BY last_used
+        '''):
+            if self._total_bytes <= target_bytes:
+                break
+            victims.append((row[0], row[1]))
+            self._total_bytes -= row[2]
+
+        conn.executemany('''
+            DELETE FROM analysis_cache WHERE content_hash = ? AND analyzer_version = ?
+        ''', victims)
+        self.evictions += len(victims)
+
+    def clear(self):
+        """Delete every cached result"""
+        with self._lock:
+            self.db.execute_delete('DELETE FROM analysis_cache')
+            self._total_bytes = 0
+
+    def stats(self) -> Dict:
+        """Get cache counters (entries, bytes, hits, misses, hit_rate, ...)"""
+        row = self.db.execute_query(
+            'SELECT COUNT(*), IFNULL(SUM(result_size), 0) FROM analysis_cache'
+        )[0]
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': row[0],
+                'bytes': row[1],
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'stores': self.stores,
+                'evictions': self.evictions
+            }
+
+
+_analysis_cache = None
+_analysis_cache_loaded = False
+_analysis_cache_lock = threading.Lock()
+
+def get_analysis_cache() -> Optional[AnalysisCache]:
+    """Get global analysis cache (None if disabled in settings.ini)"""
+    global _analysis_cache, _analysis_cache_loaded
+
+    with _analysis_cache_lock:
+        if not _analysis_cache_loaded:
+            _analysis_cache = AnalysisCache.from_config()
+            _analysis_cache_loaded = True
+
+    return _analysis_cache
@@ -0,0 +1,18 @@
+-- Forenstiq Evidence Analyzer Analysis Cache Schema
+-- SQLite Database (AI results by file content, shared by all cases; see analysis_cache.py)
+
+-- One row per (content hash, analyzer version); results are JSON, compressed
+CREATE TABLE IF NOT EXISTS analysis_cache (
+    content_hash TEXT NOT NULL,
+    analyzer_version TEXT NOT NULL,
+    results BLOB NOT NULL,
+    result_size INTEGER NOT NULL,
+    hit_count INTEGER DEFAULT 0,
+    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_used REAL NOT NULL,
+
+    PRIMARY KEY (content_hash, analyzer_version)
+) WITHOUT ROWID;
+
+-- Least recently used entries are evicted first
+CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_used ON analysis_cache(last_used);
@@ -1,92 +1,240 @@
 """
 Audit log data access layer
 """
+import atexit
+import sqlite3
+import threading
 from datetime import datetime
 from typing import List, Dict, Optional
 import json
-from .db_manager import get_db_manager
+from .db_manager import get_db_manager, DatabaseManager
+from ..utils.logger import get_logger
+
+INSERT_EVENT = '''
+    INSERT INTO audit_log (case_id, user_name, action, details, timestamp)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+# Errors caused by an event itself (retrying cannot help), as opposed to
+# OperationalError (database locked, disk full), after which the batch is kept
+EVENT_ERRORS = (sqlite3.IntegrityError, sqlite3.InterfaceError, sqlite3.ProgrammingError)
+
+class AuditWriter:
+    """
+    Buffered audit log writer
+
+    Events are queued in memory and written by a background thread in one
+    transaction per flush. Flushes are serialized, so rows are committed in
+    exactly the order log_action was called. Events are durable once flushed.
+
+    If a batch is rejected because of one of its events, the events are
+    written one at a time instead. An event for a case that no longer exists
+    (logged after delete_case) is kept without its case_id, as ON DELETE SET
+    NULL would have left it; other invalid events are logged and dropped, so
+    they cannot hold up the rest of the queue.
+    """
+
+    def __init__(self, db: DatabaseManager, flush_interval: float = 0.5,
+                 max_batch: int = 1000):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending = []
+        self._queue_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='AuditWriter', daemon=True)
+        self._thread.start()
+
+    def enqueue(self, event: tuple):
+        """Queue (case_id, user_name, action, details_json, timestamp)"""
+        with self._queue_lock:
+            self._pending.append(event)
+            full = len(self._pending) >= self.max_batch
+
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Write all queued events now; returns number written"""
+        with self._flush_lock:
+            with self._queue_lock:
+                batch, self._pending = self._pending, []
+
+            if not batch:
+                return 0
+
+            try:
+                try:
+                    with self.db.transaction() as conn:
+                        conn.executemany(INSERT_EVENT, batch)
+                    return len(batch)
+                except EVENT_ERRORS as e:
+                    get_logger().warning(
+                        f"Audit batch of {len(batch)} events rejected ({e}); writing them one at a time"
+                    )
+                    return self._write_each(batch)
+            except Exception:
+                # Put the batch back in front so ordering is preserved
+                with self._queue_lock:
+                    self._pending[:0] = batch
+                raise
+
+    def _write_each(self, batch: List[tuple]) -> int:
+        """Write events one by one in one transaction, skipping invalid ones"""
+        logger = get_logger()
+        written = 0
+
+        with self.db.transaction() as conn:
+            for event in batch:
+                try:
+                    conn.execute(INSERT_EVENT, event)
+                    written += 1
+                    continue
+                except EVENT_ERRORS as e:
+                    error = e
+
+                if event[0] is not None:
+                    try:
+                        conn.execute(INSERT_EVENT, (None,) + tuple(event[1:]))
+                        written += 1
+                        logger.warning(f"Audit event {event[2]!r} of missing case {event[0]} "
+                                       f"stored without its case ({error})")
+                        continue
+                    except EVENT_ERRORS as e:
+                        error = e
+
+                logger.error(f"Dropped invalid audit event {event!r}: {error}")
+
+        return written
+
+    def close(self):
+        """Stop the background thread and write remaining events"""
+        self._stopped = True
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def _run(self):
+        """Background flush loop"""
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # The events stay queued and are retried on the next interval
+                get_logger().error(f"Audit log write failed: {e}")
+
+
+# Global audit writer instance
+_audit_writer = None
+_audit_writer_lock = threading.Lock()
+
+def get_audit_writer() -> AuditWriter:
+    """Get global audit writer (flushed automatically at exit)"""
+    global _audit_writer
+
+    with _audit_writer_lock:
+        if _audit_writer is None:
+            _audit_writer = AuditWriter(get_db_manager())
+            atexit.register(_audit_writer.close)
+
+    return _audit_writer
+
 
 class AuditRepository:
     """Repository for audit logging"""
-    
+
     def __init__(self):
         self.db = get_db_manager()
-    
+        self.writer = get_audit_writer()
+
     def log_action(self, action: str, case_id: Optional[int] = None,
                    user_name: str = 'System', details: Dict = None):
         """
-        Log an action
-        
+        Log an action (queued; written on the next flush)
+
         Args:
             action: Action name (e.g., 'create_case', 'analyze_file')
             case_id: Associated case ID (optional)
             user_name: User who performed action
             details: Additional details as dictionary
         """
-        query = '''
-            INSERT INTO audit_log (case_id, user_name, action, details)
-            VALUES (?, ?, ?, ?)
-        '''
-        
         details_json = json.dumps(details) if details else None
-        
-        params = (case_id, user_name, action, details_json)
-        self.db.execute_insert(query, params)
-    
-    def get_case_logs(self, case_id: int, limit: int = 100) -> List[Dict]:
-        """Get audit logs for a case"""
-        query = '''
-            SELECT * FROM audit_log 
-            WHERE case_id = ?
-            ORDER BY timestamp DESC
-            LIMIT ?
-        '''
-        
-        results = self.db.execute_query(query, (case_id, limit))
-        logs = []
-        
-        for row in results:
-            log = dict(row)
-            # Parse JSON details
-            if log.get('details'):
-                try:
-                    log['details'] = json.loads(log['details'])
-                except:
-                    pass
-            logs.append(log)
-        
-        return logs
-    
+
+        # Same format as CURRENT_TIMESTAMP, taken when the event happens
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+
+        self.writer.enqueue((case_id, user_name, action, details_json, timestamp))
+
+    def flush(self) -> int:
+        """Force queued audit events to disk"""
+        return self.writer.flush()
+
+    def get_case_logs(self, case_id: int, limit: int = 100,
+                      before_id: Optional[int] = None) -> List[Dict]:
+        """
+        Get audit logs for a case, newest first
+
+        Args:
+            case_id: Case ID
+            limit: Page size
+            before_id: Return logs older than this log_id (next page)
+        """
+        self.flush()
+
+        query = 'SELECT * FROM audit_log WHERE case_id = ?'
+        params = [case_id]
+
+        if before_id is not None:
+            query += ' AND log_id < ?'
+            params.append(before_id)
+
+        query += ' ORDER BY log_id DESC LIMIT ?'
+        params.append(limit)
+
+        results = self.db.execute_query(query, tuple(params))
+        return [self._parse_log(row) for row in results]
+
     def get_all_logs(self, limit: int = 1000) -> List[Dict]:
         """Get all audit logs"""
+        self.flush()
+
         query = '''
-            SELECT * FROM audit_log 
-            ORDER BY timestamp DESC
+            SELECT * FROM audit_log
+            ORDER BY log_id DESC
             LIMIT ?
         '''
-        
+
         results = self.db.execute_query(query, (limit,))
-        logs = []
-        
-        for row in results:
-            log = dict(row)
-            if log.get('details'):
-                try:
-                    log['details'] = json.loads(log['details'])
-                except:
-                    pass
-            logs.append(log)
-        
-        return logs
-    
-    def get_logs_by_action(self, action: str, limit: int = 100) -> List[Dict]:
-        """Get logs filtered by action type"""
-        query = '''
-            SELECT * FROM audit_log 
-            WHERE action = ?
-            ORDER BY timestamp DESC
-            LIMIT ?
-        '''
-        
-        results = self.db.execute_query(query, (action, limit))
-        return [dict(row) for row in results]
\ No newline at end of file
+        return [self._parse_log(row) for row in results]
+
+    def get_logs_by_action(self, action: str, limit: int = 100,
+                           before_id: Optional[int] = None) -> List[Dict]:
+        """Get logs filtered by action type, newest first (see get_case_logs)"""
+        self.flush()
+
+        query = 'SELECT * FROM audit_log WHERE action = ?'
+        params = [action]
+
+        if before_id is not None:
+            query += ' AND log_id < ?'
+            params.append(before_id)
+
+        query += ' ORDER BY log_id DESC LIMIT ?'
+        params.append(limit)
+
+        results = self.db.execute_query(query, tuple(params))
+        return [dict(row) for row in results]
+
+    def _parse_log(self, row) -> Dict:
+        """Convert row to dict and parse JSON details"""
+        log = dict(row)
+        if log.get('details'):
+            try:
+                log['details'] = json.loads(log['details'])
+            except:
+                pass
+        return log
@@ -0,0 +1,261 @@
+"""
+Online database backups
+
+Uses the SQLite online backup API, copying a bounded number of pages per step
+and sleeping between steps, so analysis keeps writing while a backup runs.
+Each snapshot is a directory of gzip files (the catalog plus one file per
+case database):
+
+    <backup_dir>/backup_YYYYMMDD_HHMMSS/forenstiq_cases.db.gz
+    <backup_dir>/backup_YYYYMMDD_HHMMSS/cases/case_000001.db.gz
+"""
+import gzip
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .db_manager import get_db_manager, case_db_path
+from .audit_repository import get_audit_writer
+from ..utils.logger import get_logger
+
+SNAPSHOT_PREFIX = 'backup_'
+SNAPSHOT_FORMAT = SNAPSHOT_PREFIX + '%Y%m%d_%H%M%S'
+
+class BackupManager:
+    """Create and rotate compressed online backups"""
+
+    def __init__(self, backup_dir: Path, keep: int = 7,
+                 pages_per_step: int = 256, step_sleep: float = 0.02):
+        """
+        Args:
+            backup_dir: Directory holding snapshot directories
+            keep: Number of snapshots kept by rotate()
+            pages_per_step: Pages copied while holding the source lock
+            step_sleep: Seconds to sleep between steps
+        """
+        self.backup_dir = Path(backup_dir)
+        self.keep = keep
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.logger = get_logger()
+
+    @classmethod
+    def from_config(cls) -> 'BackupManager':
+        """Create manager from [Paths] backup_dir and [Database] backup_* settings"""
+        from ..utils.config_loader import get_config
+        config = get_config()
+
+        database_dir = config.get_path('Paths', 'database_dir') or Path('./data')
+        backup_dir = config.get_path('Paths', 'backup_dir') or database_dir / 'backups'
+
+        return cls(
+            backup_dir,
+            keep=config.get_int('Database', 'backup_keep', 7),
+            pages_per_step=config.get_int('Database', 'backup_pages_per_step', 256),
+            step_sleep=config.get_int('Database', 'backup_step_sleep_ms', 20) / 1000.0
+        )
+
+    def backup_database(self, source: Path, target: Path,
+                        progress_callback: Optional[Callable] = None) -> int:
+        """
+        Copy one live database into a gzip file
+
+        Args:
+            source: Database file to back up
+            target: Output .gz file
+            progress_callback: Called with (pages_done, pages_total)
+
+        Returns:
+            Size of the uncompressed copy in bytes
+        """
+        target.parent.mkdir(parents=True, exist_ok=True)
+        copy_path = target.with_suffix('')  # Uncompressed copy, removed below
+
+        src = sqlite3.connect(str(source))
+        dst = sqlite3.connect(str(copy_path))
+        try:
+            # Keep a read transaction open so every step reads the same
+            # snapshot. In WAL mode this does not block writers, and the copy
+            # is not restarted when they commit.
+            src.execute('BEGIN')
+            src.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+
+            # Called after every step. The backup API's own sleep only
+            # applies when a step finds the database busy, so the pause
+            # between steps that lets writers in is taken here.
+            def _progress(status, remaining, total):
+                if progress_callback:
+                    progress_callback(total - remaining, total)
+                if remaining and self.step_sleep > 0:
+                    time.sleep(self.step_sleep)
+
+            src.backup(dst, pages=self.pages_per_step, progress=_progress,
+                       sleep=self.step_sleep)
+            src.rollback()
+        finally:
+            dst.close()
+            src.close()
+
+        size = copy_path.stat().st_size
+        with open(copy_path, 'rb') as f_in, gzip.open(target, 'wb', compresslevel=6) as f_out:
+            shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+        copy_path.unlink()
+
+        return size
+
+    def create_backup(self, progress_callback: Optional[Callable] = None) -> Dict:
+        """
+        Back up the catalog and every case database, then rotate
+
+        Args:
+            progress_callback: Called with (db_index, db_count, db_name,
+                               pages_done, pages_total)
+
+        Returns:
+            Dictionary with path, databases, size_bytes, compressed_bytes,
+            duration (seconds) and removed (old snapshots deleted)
+        """
+        started = time.monotonic()
+
+        # Buffered audit events belong in the snapshot
+        get_audit_writer().flush()
+
+        catalog = get_db_manager()
+        sources = [(catalog.db_path.name, catalog.db_path)]
+        for row in catalog.execute_query('SELECT case_id FROM cases ORDER BY case_id'):
+            path = case_db_path(row['case_id'])
+            if path.exists():
+                sources.append((f'cases/{path.name}', path))
+
+        snapshot = self.backup_dir / datetime.now().strftime(SNAPSHOT_FORMAT)
+        partial = snapshot.with_name(snapshot.name + '.partial')
+        if partial.exists():
+            shutil.rmtree(partial)
+
+        self.logger.info(f"Starting backup of {len(sources)} database(s) to {snapshot}")
+
+        size = 0
+        for index, (name, path) in enumerate(sources):
+            def _progress(done, total, index=index, name=name):
+                if progress_callback:
+                    progress_callback(index, len(sources), name, done, total)
+
+            size += self.backup_database(path, partial / f'{name}.gz', _progress)
+
+        # Only complete snapshots carry the final name
+        partial.rename(snapshot)
+
+        compressed = sum(f.stat().st_size for f in snapshot.rglob('*.gz'))
+        removed = self.rotate()
+        duration = time.monotonic() - started
+
+        self.logger.info(
+            f"Backup complete: {snapshot.name}, {len(sources)} database(s), "
+            f"{size / 1e6:.1f} MB -> {compressed / 1e6:.1f} MB in {duration:.1f}s"
+        )
+
+        return {
+            'path': snapshot,
+            'databases': len(sources),
+            'size_bytes': size,
+            'compressed_bytes': compressed,
+            'duration': duration,
+            'removed': removed
+        }
+
+    def list_backups(self) -> List[Path]:
+        """Get complete snapshots, oldest first"""
+        if not self.backup_dir.exists():
+            return []
+
+        snapshots = []
+        for path in self.backup_dir.iterdir():
+            if path.is_dir() and self._snapshot_time(path):
+                snapshots.append(path)
+
+        return sorted(snapshots, key=lambda p: p.name)
+
+    def rotate(self) -> int:
+        """Delete the oldest snapshots beyond `keep`; returns number removed"""
+        snapshots = self.list_backups()
+        expired = snapshots[:-self.keep] if self.keep > 0 else []
+
+        for path in expired:
+            shutil.rmtree(path, ignore_errors=True)
+
+        return len(expired)
+
+    def last_backup_time(self) -> Optional[datetime]:
+        """Get time of the newest complete snapshot"""
+        snapshots = self.list_backups()
+        return self._snapshot_time(snapshots[-1]) if snapshots else None
+
+    def _snapshot_time(self, path: Path) -> Optional[datetime]:
+        """Parse snapshot time from directory name (None if not a snapshot)"""
+        try:
+            return datetime.strptime(path.name, SNAPSHOT_FORMAT)
+        except ValueError:
+            return None
+
+
+class BackupScheduler:
+    """Run BackupManager.create_backup periodically in a background thread"""
+
+    def __init__(self, manager: BackupManager, interval_hours: float = 24):
+        self.manager = manager
+        self.interval = timedelta(hours=interval_hours)
+        self.logger = get_logger()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start scheduler thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='BackupScheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop scheduler (a backup already running is not interrupted)"""
+        self._stop.set()
+
+    def _run(self):
+        """Back up whenever the newest snapshot is older than the interval"""
+        while not self._stop.is_set():
+            last = self.manager.last_backup_time()
+            due = last + self.interval if last else datetime.now()
+            wait = (due - datetime.now()).total_seconds()
+
+            if wait <= 0:
+                try:
+                    self.manager.create_backup()
+                except Exception as e:
+                    self.logger.error(f"Backup failed: {e}")
+                    wait = 3600  # Retry in an hour
+                else:
+                    continue
+
+            self._stop.wait(min(wait, 3600))
+
+
+def start_backup_scheduler() -> Optional[BackupScheduler]:
+    """Start scheduled backups if [Database] backup_enabled is set"""
+    from ..utils.config_loader import get_config
+    config = get_config()
+
+    if not config.get_bool('Database', 'backup_enabled', False):
+        return None
+
+    scheduler = BackupScheduler(
+        BackupManager.from_config(),
+        interval_hours=config.get_float('Database', 'backup_interval_hours', 24)
+    )
+    scheduler.start()
+
+    return scheduler
@@ -1,13 +1,22 @@
 """
 Case data access layer
 """
+import sqlite3
 from datetime import datetime
 from typing import List, Optional, Dict
 from pathlib import Path
-from .db_manager import get_db_manager
+from .db_manager import (
+    get_db_manager, get_case_db, release_case_db, case_deletion, close_case_db_files
+)
+from .record_cache import get_record_cache
 
 class CaseRepository:
-    """Repository for case operations"""
+    """
+    Repository for case operations
+    
+    Case records live in the catalog database; each case's evidence lives in
+    its own database file, created when the case is created.
+    """
     
     def __init__(self):
         self.db = get_db_manager()
@@ -40,7 +49,12 @@ class CaseRepository:
             case_data.get('evidence_source_path')
         )
         
-        return self.db.execute_insert(query, params)
+        case_id = self.db.execute_insert(query, params)
+        
+        # Create the case's own database
+        get_case_db(case_id)
+        
+        return case_id
     
     def get_case(self, case_id: int) -> Optional[Dict]:
         """Get case by ID"""
@@ -103,43 +117,156 @@ class CaseRepository:
         return affected > 0
     
     def delete_case(self, case_id: int) -> bool:
-        """Delete case (cascade deletes all related data)"""
-        query = 'DELETE FROM cases WHERE case_id = ?'
-        affected = self.db.execute_delete(query, (case_id,))
+        """
+        Delete case record and its database files
+        
+        All of a case's evidence lives in its own database, so the files are
+        unlinked rather than purged row by row. The case is marked 'deleting'
+        first and its record removed last, so an interrupted deletion can
+        simply be run again.
+        
+        Raises:
+            RuntimeError: The case is being analyzed, or a file could not be
+                          removed (e.g. open in another program on Windows);
+                          the case stays marked 'deleting'
+        """
+        with case_deletion(case_id):
+            self.update_case(case_id, {'status': 'deleting'})
+            get_record_cache().invalidate_case(case_id)
+            
+            # Unmap the face index and close the database before unlinking;
+            # Windows refuses to remove files that are still open
+            from .face_index import release_face_index
+            index = release_face_index(case_id)
+            db_path = release_case_db(case_id)
+            try:
+                index.delete()
+                close_case_db_files(db_path)
+                for suffix in ('', '-wal', '-shm'):
+                    path = Path(str(db_path) + suffix)
+                    if path.exists():
+                        path.unlink()
+            except (OSError, sqlite3.Error) as e:
+                raise RuntimeError(
+                    f"Could not remove the files of case {case_id} ({e}). Close any "
+                    f"program using them and delete the case again to finish."
+                ) from e
+            
+            query = 'DELETE FROM cases WHERE case_id = ?'
+            affected = self.db.execute_delete(query, (case_id,))
+        
         return affected > 0
     
     def update_file_counts(self, case_id: int):
-        """Update total_files and total_flagged counts"""
+        """Update total_files and total_flagged counts from case_stats"""
         query = '''
             UPDATE cases 
-            SET total_files = (
-                SELECT COUNT(*) FROM evidence_files WHERE case_id = ?
-            ),
-            total_flagged = (
-                SELECT COUNT(*) FROM evidence_files WHERE case_id = ? AND is_flagged = 1
-            ),
+            SET total_files = IFNULL((
+                SELECT total_files FROM case_db.case_stats WHERE case_id = ?
+            ), 0),
+            total_flagged = IFNULL((
+                SELECT flagged_files FROM case_db.case_stats WHERE case_id = ?
+            ), 0),
             last_modified = ?
             WHERE case_id = ?
         '''
         
         timestamp = datetime.now().isoformat()
-        self.db.execute_update(query, (case_id, case_id, timestamp, case_id))
+        with self.db.attached({'case_db': get_case_db(case_id).db_path}) as conn:
+            conn.execute(query, (case_id, case_id, timestamp, case_id))
     
     def get_case_statistics(self, case_id: int) -> Dict:
-        """Get case statistics"""
-        query = '''
-            SELECT 
-                COUNT(*) as total_files,
-                SUM(CASE WHEN ai_processed = 1 THEN 1 ELSE 0 END) as processed_files,
-                SUM(CASE WHEN is_flagged = 1 THEN 1 ELSE 0 END) as flagged_files,
-                SUM(CASE WHEN face_count > 0 THEN 1 ELSE 0 END) as files_with_faces,
-                SUM(face_count) as total_faces,
-                COUNT(DISTINCT date_taken) as unique_dates
-            FROM evidence_files
-            WHERE case_id = ?
-        '''
+        """
+        Get case statistics
         
-        results = self.db.execute_query(query, (case_id,))
-        if results:
-            return dict(results[0])
-        return {}
\ No newline at end of file
+        Reads the trigger-maintained case_stats tables, so the cost does not
+        depend on the number of files in the case.
+        """
+        stats = {
+            'total_files': 0,
+            'processed_files': 0,
+            'flagged_files': 0,
+            'files_with_faces': 0,
+            'total_faces': 0,
+            'files_with_text': 0,
+            'unique_dates': 0,
+            'files_by_type': {}
+        }
+        
+        with get_case_db(case_id).transaction() as conn:
+            row = conn.execute(
+                'SELECT * FROM case_stats WHERE case_id = ?', (case_id,)
+            ).fetchone()
+            type_rows = conn.execute('''
+                SELECT file_type, file_count FROM case_type_stats
+                WHERE case_id = ? AND file_count > 0
+            ''', (case_id,)).fetchall()
+        
+        if row:
+            stats.update({key: row[key] for key in row.keys() if key != 'case_id'})
+        stats['files_by_type'] = {r['file_type']: r['file_count'] for r in type_rows}
+        
+        return stats
+    
+    def rebuild_case_statistics(self, case_id: Optional[int] = None) -> int:
+        """
+        Recompute case_stats from evidence_files (fixes drift)
+        
+        Args:
+            case_id: Case to rebuild, or None to rebuild all cases
+        
+        Returns:
+            Number of cases with statistics after the rebuild
+        """
+        if case_id is None:
+            case_ids = [case['case_id'] for case in self.get_all_cases()]
+        else:
+            case_ids = [case_id]
+        
+        rebuilt = 0
+        for cid in case_ids:
+            rebuilt += self._rebuild_case_db_statistics(cid)
+            self.update_file_counts(cid)
+        
+        return rebuilt
+    
+    def _rebuild_case_db_statistics(self, case_id: int) -> int:
+        """Recompute the stats tables of one case database"""
+        with get_case_db(case_id).transaction() as conn:
+            for table in ('case_stats', 'case_type_stats', 'case_date_stats'):
+                conn.execute(f'DELETE FROM {table} WHERE case_id = ?', (case_id,))
+            
+            cursor = conn.execute('''
+                INSERT INTO case_stats (
+                    case_id, total_files, processed_files, flagged_files,
+                    files_with_faces, total_faces, files_with_text, unique_dates
+                )
+                SELECT
+                    case_id,
+                    COUNT(*),
+                    SUM(IFNULL(ai_processed, 0) = 1),
+                    SUM(IFNULL(is_flagged, 0) = 1),
+                    SUM(IFNULL(face_count, 0) > 0),
+                    SUM(IFNULL(face_count, 0)),
+                    SUM(IFNULL(has_text, 0) = 1),
+                    COUNT(DISTINCT date_taken)
+                FROM evidence_files WHERE case_id = ?
+                GROUP BY case_id
+            ''', (case_id,))
+            rebuilt = cursor.rowcount
+            
+            conn.execute('''
+                INSERT INTO case_type_stats (case_id, file_type, file_count)
+                SELECT case_id, file_type, COUNT(*)
+                FROM evidence_files WHERE case_id = ?
+                GROUP BY case_id, file_type
+            ''', (case_id,))
+            
+            conn.execute('''
+                INSERT INTO case_date_stats (case_id, date_taken, file_count)
+                SELECT case_id, date_taken, COUNT(*)
+                FROM evidence_files WHERE case_id = ? AND date_taken IS NOT NULL
+                GROUP BY case_id, date_taken
+            ''', (case_id,))
+        
+        return rebuilt
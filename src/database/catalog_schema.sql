@@ -0,0 +1,44 @@
+-- Forenstiq Evidence Analyzer Catalog Schema
+-- SQLite Database (case list; evidence lives in per-case databases, see schema.sql)
+
+-- Cases table
+CREATE TABLE IF NOT EXISTS cases (
+    case_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    case_number TEXT UNIQUE NOT NULL,
+    case_name TEXT NOT NULL,
+    investigator_name TEXT,
+    agency_name TEXT,
+    incident_date DATE,
+    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    status TEXT DEFAULT 'open',
+    notes TEXT,
+    evidence_source_path TEXT,
+    total_files INTEGER DEFAULT 0,
+    total_flagged INTEGER DEFAULT 0
+);
+
+-- Audit log table
+CREATE TABLE IF NOT EXISTS audit_log (
+    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    case_id INTEGER,
+    user_name TEXT,
+    action TEXT NOT NULL,
+    details TEXT,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (case_id) REFERENCES cases(case_id) ON DELETE SET NULL
+);
+
+-- System settings
+CREATE TABLE IF NOT EXISTS settings (
+    setting_key TEXT PRIMARY KEY,
+    setting_value TEXT,
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create indexes (rowid log_id is implicitly the last index column, so
+-- these also serve ORDER BY log_id pagination)
+CREATE INDEX IF NOT EXISTS idx_audit_case ON audit_log(case_id);
+CREATE INDEX IF NOT EXISTS idx_audit_action ON audit_log(action);
+CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log(timestamp);
@@ -0,0 +1,91 @@
+"""
+Transparent compression for large text columns (ocr_text, analyst_notes)
+
+Short values are stored as plain TEXT. Longer ones are stored as a BLOB that
+starts with a two-byte format marker:
+
+    b'Z1' + zlib stream
+    b'X1' + lzma (xz) stream
+
+Readers pass whatever the column holds to decompress_text, which returns
+plain text for every format. DatabaseManager connections also register it
+as the SQL function decompress_text(x) for ad-hoc queries; nothing in the
+schema depends on it (the full-text index is fed plain text by
+FileRepository.set_text).
+"""
+import lzma
+import zlib
+from typing import Optional, Union
+
+ZLIB_MARKER = b'Z1'
+LZMA_MARKER = b'X1'
+
+# Defaults, overridden by [Database] text_compression / text_compression_min_bytes
+DEFAULT_METHOD = 'zlib'
+DEFAULT_MIN_BYTES = 256
+
+_settings = None
+
+def _configured_settings() -> tuple:
+    """Get (method, min_bytes) from settings.ini, with defaults"""
+    global _settings
+
+    if _settings is None:
+        method, min_bytes = DEFAULT_METHOD, DEFAULT_MIN_BYTES
+        try:
+            from ..utils.config_loader import get_config
+            config = get_config()
+            method = config.get('Database', 'text_compression', method).strip().lower()
+            min_bytes = config.get_int('Database', 'text_compression_min_bytes', min_bytes)
+        except FileNotFoundError:
+            pass
+        _settings = (method, min_bytes)
+
+    return _settings
+
+def compress_text(text: Optional[str], method: Optional[str] = None,
+                  min_bytes: Optional[int] = None) -> Union[str, bytes, None]:
+    """
+    Encode text for storage
+
+    Args:
+        text: Text to store
+        method: 'zlib', 'lzma' or 'none' (default: configured method)
+        min_bytes: Values shorter than this stay plain text
+
+    Returns:
+        The original text, or a marked compressed BLOB if that is smaller
+    """
+    if text is None or isinstance(text, bytes):
+        return text
+
+    configured_method, configured_min = _configured_settings()
+    method = method or configured_method
+    min_bytes = configured_min if min_bytes is None else min_bytes
+
+    raw = text.encode('utf-8')
+    if method == 'none' or len(raw) < min_bytes:
+        return text
+
+    if method == 'lzma':
+        packed = LZMA_MARKER + lzma.compress(raw, preset=6)
+    else:
+        packed = ZLIB_MARKER + zlib.compress(raw, 6)
+
+    return packed if len(packed) < len(raw) else text
+
+def decompress_text(value: Union[str, bytes, None]) -> Optional[str]:
+    """Decode a stored text column value (plain or compressed)"""
+    if not isinstance(value, (bytes, memoryview)):
+        return value
+
+    value = bytes(value)
+    marker, payload = value[:2], value[2:]
+
+    if marker == ZLIB_MARKER:
+        return zlib.decompress(payload).decode('utf-8')
+    if marker == LZMA_MARKER:
+        return lzma.decompress(payload).decode('utf-8')
+
+    # Unmarked BLOB: not written by this module
+    return value.decode('utf-8', errors='replace')
@@ -1,46 +1,96 @@
 """
 Database connection manager
+
+Storage layout:
+    <database_dir>/<db_name>          Catalog (case list, audit log, settings)
+    <database_dir>/cases/case_N.db    One database per case (files, faces, tags, stats)
+    <database_dir>/analysis_cache.db  AI results by content hash, shared by all cases
+
+Row IDs in per-case tables are allocated from case_id << CASE_ID_SHIFT, so the
+owning case of any file_id / face_id / detection_id can be derived from the
+ID alone (see case_id_for_id).
 """
 import sqlite3
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Dict, List
 from contextlib import contextmanager
+from .compression import decompress_text
+from . import migrations
+
+# Per-case AUTOINCREMENT tables whose IDs encode the owning case
+CASE_ID_SHIFT = 32
+CASE_SCOPED_TABLES = ('evidence_files', 'face_detections', 'object_detections')
 
 class DatabaseManager:
     """Manage SQLite database connections"""
-    
-    def __init__(self, db_path: Path):
+
+    def __init__(self, db_path: Path, schema_name: str = 'schema.sql',
+                 id_base: int = 0):
         self.db_path = db_path
+        self.schema_name = schema_name
+        self.id_base = id_base
         self.connection = None
         self._ensure_database()
-    
+
     def _ensure_database(self):
         """Ensure database and schema exist"""
         # Create directory if needed
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        
+
         # Create database and schema
         conn = self.get_connection()
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')  # Only applies to new files
+        conn.execute('PRAGMA journal_mode = WAL')  # Readers don't block the writer
+        self._migrate(conn)
         self._create_schema(conn)
+        if self.id_base:
+            self._seed_id_ranges(conn)
         conn.close()
-    
+
+    def _migrate(self, conn: sqlite3.Connection):
+        """Apply pending migrations (see migrations.py) before the schema file"""
+        applied = migrations.migrate(conn, self.schema_name)
+        if applied:
+            from ..utils.logger import get_logger
+            get_logger().info(f"Migrated {self.db_path.name} to schema version {applied[-1]}")
+
     def _create_schema(self, conn: sqlite3.Connection):
         """Create database schema"""
-        schema_file = Path(__file__).parent / 'schema.sql'
-        
+        schema_file = Path(__file__).parent / self.schema_name
+
         if schema_file.exists():
             with open(schema_file, 'r') as f:
                 schema_sql = f.read()
                 conn.executescript(schema_sql)
                 conn.commit()
-    
+
+    def _seed_id_ranges(self, conn: sqlite3.Connection):
+        """Start AUTOINCREMENT sequences of case-scoped tables at id_base"""
+        for table in CASE_SCOPED_TABLES:
+            exists = conn.execute(
+                'SELECT 1 FROM sqlite_sequence WHERE name = ?', (table,)
+            ).fetchone()
+            if not exists:
+                conn.execute(
+                    'INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)',
+                    (table, self.id_base)
+                )
+        conn.commit()
+
     def get_connection(self) -> sqlite3.Connection:
         """Get database connection"""
+        global _last_activity
+        _last_activity = time.monotonic()
+
         conn = sqlite3.connect(str(self.db_path))
         conn.row_factory = sqlite3.Row  # Access columns by name
         conn.execute('PRAGMA foreign_keys = ON')  # Enable foreign keys
+        # Lets queries read compressed text columns (see compression.py)
+        conn.create_function('decompress_text', 1, decompress_text, deterministic=True)
         return conn
-    
+
     @contextmanager
     def transaction(self):
         """Context manager for database transactions"""
@@ -53,35 +103,55 @@ class DatabaseManager:
             raise e
         finally:
             conn.close()
-    
+
+    @contextmanager
+    def attached(self, attachments: Dict[str, Path]):
+        """
+        Transaction with other database files attached
+
+        Args:
+            attachments: Mapping of schema alias -> database path
+        """
+        conn = self.get_connection()
+        try:
+            for alias, path in attachments.items():
+                conn.execute(f'ATTACH DATABASE ? AS {alias}', (str(path),))
+            yield conn
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+
     def execute_query(self, query: str, params: tuple = ()):
         """Execute query and return results"""
         with self.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
             return cursor.fetchall()
-    
+
     def execute_insert(self, query: str, params: tuple = ()) -> int:
         """Execute insert and return last row ID"""
         with self.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
             return cursor.lastrowid
-    
+
     def execute_update(self, query: str, params: tuple = ()) -> int:
         """Execute update and return affected rows"""
         with self.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
             return cursor.rowcount
-    
+
     def execute_delete(self, query: str, params: tuple = ()) -> int:
         """Execute delete and return affected rows"""
         with self.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
             return cursor.rowcount
-    
+
     def close(self):
         """Close database connection"""
         if self.connection:
@@ -89,16 +159,151 @@ class DatabaseManager:
             self.connection = None
 
 
-# Global database instance
+def _configured_paths() -> tuple:
+    """Get (database_dir, db_name) from settings.ini, with defaults"""
+    database_dir, db_name = Path('./data'), 'forenstiq_cases.db'
+
+    try:
+        from ..utils.config_loader import get_config
+        config = get_config()
+        database_dir = config.get_path('Paths', 'database_dir') or database_dir
+        db_name = config.get('Database', 'db_name', db_name)
+    except FileNotFoundError:
+        pass
+
+    return database_dir, db_name
+
+
+def case_id_for_id(row_id: int) -> int:
+    """Get the owning case of a file_id, face_id or detection_id"""
+    return int(row_id) >> CASE_ID_SHIFT
+
+
+def case_db_path(case_id: int) -> Path:
+    """Get the database file of a case"""
+    database_dir, _ = _configured_paths()
+    return database_dir / 'cases' / f'case_{int(case_id):06d}.db'
+
+
+def analysis_cache_path() -> Path:
+    """Get the database file of the cross-case analysis result cache"""
+    database_dir, _ = _configured_paths()
+    return database_dir / 'analysis_cache.db'
+
+
+def seconds_since_activity() -> float:
+    """Seconds since any DatabaseManager last opened a connection"""
+    return time.monotonic() - _last_activity
+
+
+# Global database instances
+_last_activity = time.monotonic()
 _db_manager = None
+_case_managers: Dict[int, DatabaseManager] = {}
+_case_users: Dict[int, int] = {}  # case_id -> running analyses
+_deleting_cases = set()
+_case_lock = threading.Lock()
 
 def get_db_manager(db_path: Optional[Path] = None) -> DatabaseManager:
-    """Get global database manager instance"""
+    """Get global catalog database manager instance"""
     global _db_manager
-    
+
     if _db_manager is None:
         if db_path is None:
-            db_path = Path('./data/forenstiq_cases.db')
-        _db_manager = DatabaseManager(db_path)
-    
-    return _db_manager
\ No newline at end of file
+            database_dir, db_name = _configured_paths()
+            db_path = database_dir / db_name
+        _db_manager = DatabaseManager(db_path, schema_name='catalog_schema.sql')
+
+        legacy = _db_manager.execute_query(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'evidence_files'"
+        )
+        if legacy:
+            from ..utils.logger import get_logger
+            get_logger().warning(
+                "Catalog still contains shared evidence tables; "
+                "run scripts/split_case_databases_migration.py"
+            )
+
+    return _db_manager
+
+def get_case_db(case_id: int) -> DatabaseManager:
+    """Get database manager of a case, creating its database on first use"""
+    case_id = int(case_id)
+
+    with _case_lock:
+        manager = _case_managers.get(case_id)
+        if manager is None:
+            manager = DatabaseManager(
+                case_db_path(case_id),
+                schema_name='schema.sql',
+                id_base=case_id << CASE_ID_SHIFT
+            )
+            _case_managers[case_id] = manager
+
+    return manager
+
+def get_db_for_id(row_id: int) -> DatabaseManager:
+    """Get database manager of the case owning a file_id/face_id/detection_id"""
+    return get_case_db(case_id_for_id(row_id))
+
+def open_case_ids() -> List[int]:
+    """Get IDs of cases whose database was opened in this process"""
+    with _case_lock:
+        return list(_case_managers)
+
+def release_case_db(case_id: int) -> Optional[Path]:
+    """Forget a case database manager; returns its path"""
+    with _case_lock:
+        manager = _case_managers.pop(int(case_id), None)
+    return manager.db_path if manager else case_db_path(case_id)
+
+@contextmanager
+def case_in_use(case_id: int):
+    """Mark a case as being analyzed (case_deletion refuses meanwhile)"""
+    case_id = int(case_id)
+
+    with _case_lock:
+        if case_id in _deleting_cases:
+            raise RuntimeError(f"Case {case_id} is being deleted")
+        _case_users[case_id] = _case_users.get(case_id, 0) + 1
+    try:
+        yield
+    finally:
+        with _case_lock:
+            _case_users[case_id] -= 1
+            if not _case_users[case_id]:
+                del _case_users[case_id]
+
+@contextmanager
+def case_deletion(case_id: int):
+    """Reserve a case for deletion; raises RuntimeError while it is analyzed"""
+    case_id = int(case_id)
+
+    with _case_lock:
+        if _case_users.get(case_id):
+            raise RuntimeError(
+                f"Case {case_id} is being analyzed; stop the analysis before deleting it"
+            )
+        _deleting_cases.add(case_id)
+    try:
+        yield
+    finally:
+        with _case_lock:
+            _deleting_cases.discard(case_id)
+
+def close_case_db_files(db_path: Path):
+    """
+    Checkpoint a case database and leave rollback-journal mode
+
+    Moves the WAL into the main file and lets SQLite remove the -wal and
+    -shm files, so only the database file itself is left to unlink.
+    """
+    if not db_path.exists():
+        return
+
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        conn.execute('PRAGMA journal_mode = DELETE')
+    finally:
+        conn.close()
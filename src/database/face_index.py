@@ -0,0 +1,257 @@
+"""
+Per-case face embedding store for vectorized suspect matching
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .db_manager import get_case_db, case_db_path
+from .face_repository import FaceRepository, ENCODING_SIZE, ENCODING_DTYPE
+
+# Suffixes of the store files next to cases/case_N.db
+INDEX_SUFFIXES = ('.faces.npy', '.face_ids.npy', '.face_norms.npy')
+
+# Rows compared per step; bounds the temporary distance matrix
+CHUNK_ROWS = 262144
+
+def index_paths(case_id: int) -> Tuple[Path, Path, Path]:
+    """(embeddings, ids, norms) files of a case's face index"""
+    db_path = case_db_path(case_id)
+    return tuple(db_path.with_name(db_path.stem + suffix) for suffix in INDEX_SUFFIXES)
+
+class FaceIndex:
+    """
+    Face encodings of one case as a memory-mapped float32 matrix
+
+    Three .npy files sit next to the case database:
+
+        case_N.faces.npy       N x 128 float32 encodings, one row per face
+        case_N.face_ids.npy    N x 2 int64 (face_id, file_id) of each row
+        case_N.face_norms.npy  N float32 squared norms of the rows
+
+    The files are mapped read-only, so only the pages a query touches are
+    read and the OS shares them between processes. sync() brings the index
+    up to date with face_detections: new faces (higher face_id) are
+    appended, and the files are rebuilt if faces were deleted or replaced.
+
+    A query is one matrix product per CHUNK_ROWS rows, using
+    |a - b|^2 = |a|^2 + |b|^2 - 2ab with the stored norms.
+    """
+
+    def __init__(self, case_id: int):
+        self.case_id = int(case_id)
+        self.paths = index_paths(self.case_id)
+        self._embeddings = None
+        self._ids = None
+        self._norms = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return 0 if self._ids is None else len(self._ids)
+
+    def sync(self) -> int:
+        """
+        Update the index from face_detections
+
+        Returns:
+            Number of faces in the index
+        """
+        with self._lock:
+            if self._ids is None:
+                self._open()
+
+            count, max_face_id = self._database_state()
+            indexed = len(self)
+            last_indexed = int(self._ids[-1, 0]) if indexed else 0
+
+            if count == indexed and max_face_id == last_indexed:
+                return indexed
+
+            face_ids, file_ids, encodings = FaceRepository().get_case_encodings(
+                self.case_id, after_face_id=last_indexed
+            )
+
+            if indexed + len(face_ids) == count:
+                self._write(face_ids, file_ids, encodings, append=True)
+            else:
+                # Faces were removed (file re-analyzed or deleted): rebuild
+                face_ids, file_ids, encodings = FaceRepository().get_case_encodings(self.case_id)
+                self._write(face_ids, file_ids, encodings, append=False)
+
+            return len(self)
+
+    def _database_state(self) -> Tuple[int, int]:
+        """(faces with an encoding, highest such face_id) in the case database"""
+        results = get_case_db(self.case_id).execute_query('''
+            SELECT COUNT(*) AS count, IFNULL(MAX(face_id), 0) AS max_face_id
+            FROM face_detections
+            WHERE case_id = ? AND face_encoding IS NOT NULL
+        ''', (self.case_id,))
+        return results[0]['count'], results[0]['max_face_id']
+
+    def _open(self):
+        """Map the index files (an inconsistent or missing set maps as empty)"""
+        self._close()
+        embeddings_path, ids_path, norms_path = self.paths
+        try:
+            embeddings = np.load(embeddings_path, mmap_mode='r')
+            ids = np.load(ids_path, mmap_mode='r')
+            norms = np.load(norms_path, mmap_mode='r')
+        except (OSError, ValueError):
+            embeddings = ids = norms = None
+
+        if (embeddings is None or embeddings.shape[1:] != (ENCODING_SIZE,)
+                or not len(embeddings) == len(ids) == len(norms)):
+            embeddings = np.empty((0, ENCODING_SIZE), dtype=ENCODING_DTYPE)
+            ids = np.empty((0, 2), dtype=np.int64)
+            norms = np.empty(0, dtype=ENCODING_DTYPE)
+
+        self._embeddings, self._ids, self._norms = embeddings, ids, norms
+
+    def _close(self):
+        """Drop the mappings (Windows cannot replace mapped files)"""
+        self._embeddings = self._ids = self._norms = None
+
+    def _write(self, face_ids: np.ndarray, file_ids: np.ndarray,
+               encodings: np.ndarray, append: bool):
+        """Write the index files, keeping the current rows if append"""
+        keep = len(self) if append else 0
+        total = keep + len(face_ids)
+        shapes = ((total, ENCODING_SIZE), (total, 2), (total,))
+        dtypes = (ENCODING_DTYPE, np.int64, ENCODING_DTYPE)
+        new_rows = (
+            encodings,
+            np.column_stack((face_ids, file_ids)).astype(np.int64).reshape(-1, 2),
+            np.einsum('ij,ij->i', encodings, encodings).astype(ENCODING_DTYPE)
+        )
+        current = (self._embeddings, self._ids, self._norms)
+
+        self.paths[0].parent.mkdir(parents=True, exist_ok=True)
+        temp_paths = [path.with_name(path.name + '.tmp') for path in self.paths]
+
+        for temp_path, shape, dtype, old, new in zip(temp_paths, shapes, dtypes, current, new_rows):
+            array = np.lib.format.open_memmap(temp_path, mode='w+', dtype=dtype, shape=shape)
+            if keep:
+                array[:keep] = old[:keep]
+            array[keep:] = new
+            array.flush()
+            del array
+
+        self._close()
+        for temp_path, path in zip(temp_paths, self.paths):
+            os.replace(temp_path, path)
+        self._open()
+
+    def search(self, encodings: np.ndarray, tolerance: float = 0.6,
+               top_k: Optional[int] = None) -> List[Dict]:
+        """
+        Find faces within tolerance of any of the given encodings
+
+        Args:
+            encodings: K x 128 (or one 128) query encodings, e.g. the faces
+                       of a suspect photo
+            tolerance: Maximum euclidean distance (face_recognition's scale)
+            top_k: Keep only the closest top_k faces
+
+        Returns:
+            List of {'face_id', 'file_id', 'distance'}, closest first
+        """
+        queries = np.asarray(encodings, dtype=ENCODING_DTYPE).reshape(-1, ENCODING_SIZE)
+
+        # Held for the whole query, so sync() cannot replace mapped files under it
+        with self._lock:
+            if self._ids is None:
+                self._open()
+            return self._search(queries, tolerance, top_k)
+
+    def _search(self, queries: np.ndarray, tolerance: float,
+                top_k: Optional[int]) -> List[Dict]:
+        """search() with the lock held"""
+        embeddings, ids, norms = self._embeddings, self._ids, self._norms
+        if not len(ids) or not len(queries):
+            return []
+
+        query_norms = np.einsum('ij,ij->i', queries, queries)
+        limit = tolerance * tolerance
+        rows, distances = [], []
+
+        for start in range(0, len(ids), CHUNK_ROWS):
+            chunk = embeddings[start:start + CHUNK_ROWS]
+            squared = norms[start:start + CHUNK_ROWS, None] + query_norms[None, :] - 2.0 * (chunk @ queries.T)
+            best = squared.min(axis=1)
+
+            hits = np.flatnonzero(best <= limit)
+            rows.append(hits + start)
+            distances.append(best[hits])
+
+        rows = np.concatenate(rows)
+        distances = np.sqrt(np.maximum(np.concatenate(distances), 0.0))
+
+        if top_k is not None and len(rows) > top_k:
+            closest = np.argpartition(distances, top_k - 1)[:top_k]
+            rows, distances = rows[closest], distances[closest]
+
+        order = np.argsort(distances, kind='stable')
+        return [
+            {'face_id': int(ids[row, 0]), 'file_id': int(ids[row, 1]), 'distance': float(distance)}
+            for row, distance in zip(rows[order], distances[order])
+        ]
+
+    def match_files(self, encodings: np.ndarray, tolerance: float = 0.6,
+                    top_k: Optional[int] = None) -> List[Dict]:
+        """
+        Files containing a face within tolerance, best match first
+
+        Returns:
+            List of {'file_id', 'face_ids', 'distance' (closest face),
+            'confidence' ((1 - distance) * 100, as FaceMatcher reports it),
+            'match_count'}
+        """
+        files: Dict[int, Dict] = {}
+        for match in self.search(encodings, tolerance, top_k):
+            entry = files.get(match['file_id'])
+            if entry is None:
+                files[match['file_id']] = {
+                    'file_id': match['file_id'],
+                    'face_ids': [match['face_id']],
+                    'distance': match['distance'],
+                    'confidence': (1.0 - match['distance']) * 100,
+                    'match_count': 1
+                }
+            else:
+                entry['face_ids'].append(match['face_id'])
+                entry['match_count'] += 1
+
+        return list(files.values())
+
+    def delete(self):
+        """Remove the index files"""
+        with self._lock:
+            self._close()
+            for path in self.paths:
+                if path.exists():
+                    path.unlink()
+
+
+# Global index instances
+_indexes: Dict[int, FaceIndex] = {}
+_index_lock = threading.Lock()
+
+def get_face_index(case_id: int) -> FaceIndex:
+    """Get the face index of a case (call sync() before searching)"""
+    case_id = int(case_id)
+
+    with _index_lock:
+        index = _indexes.get(case_id)
+        if index is None:
+            index = FaceIndex(case_id)
+            _indexes[case_id] = index
+
+    return index
+
+def release_face_index(case_id: int) -> FaceIndex:
+    """Forget a case's face index; returns it (e.g. to delete its files)"""
+    with _index_lock:
+        index = _indexes.pop(int(case_id), None)
+    return index or FaceIndex(case_id)
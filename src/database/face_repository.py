@@ -0,0 +1,192 @@
+"""
+Face detection data access layer (face_detections table)
+"""
+import json
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from .db_manager import get_case_db, get_db_for_id, case_id_for_id
+
+# face_recognition encodings have 128 dimensions; they are stored as float32
+ENCODING_SIZE = 128
+ENCODING_DTYPE = np.float32
+
+# Rows fetched per cursor step when loading a case's encodings
+FETCH_SIZE = 4096
+
+def encoding_values(encoding) -> Optional[List[float]]:
+    """
+    JSON-safe values of a face encoding (None if there is none)
+
+    Args:
+        encoding: float64 bytes as FaceDetector returns them, or an array/sequence
+    """
+    if encoding is None:
+        return None
+    if isinstance(encoding, (bytes, bytearray, memoryview)):
+        encoding = np.frombuffer(encoding, dtype=np.float64)
+    return np.asarray(encoding, dtype=ENCODING_DTYPE).tolist()
+
+def encoding_blob(encoding) -> Optional[bytes]:
+    """Compact float32 blob of an encoding (values, array or float64 bytes)"""
+    values = encoding_values(encoding)
+    return None if values is None else np.asarray(values, dtype=ENCODING_DTYPE).tobytes()
+
+def encoding_array(blob: Optional[bytes]) -> Optional[np.ndarray]:
+    """Encoding stored by encoding_blob as a float32 array"""
+    return None if blob is None else np.frombuffer(blob, dtype=ENCODING_DTYPE)
+
+class FaceRepository:
+    """
+    Repository for detected faces (per-case databases)
+
+    Faces are written while a file's analysis results are saved (see
+    FileRepository.update_ai_analysis), so suspect matching and clustering
+    read boxes and encodings from here instead of decoding images again.
+    """
+
+    @staticmethod
+    def replace_file_faces(conn: sqlite3.Connection, file_id: int, faces: Iterable[Dict]):
+        """
+        Replace the detected faces of a file inside an open transaction
+
+        Args:
+            conn: Connection with an open transaction
+            file_id: File the faces were found in
+            faces: Dicts with bounding_box, confidence and encoding
+        """
+        case_id = case_id_for_id(file_id)
+        conn.execute('DELETE FROM face_detections WHERE file_id = ?', (file_id,))
+        conn.executemany('''
+            INSERT INTO face_detections (file_id, case_id, face_encoding, bounding_box, confidence)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [
+            (file_id, case_id, encoding_blob(face.get('encoding')),
+             json.dumps(face.get('bounding_box')), face.get('confidence'))
+            for face in faces
+        ])
+
+    def get_file_faces(self, file_id: int) -> List[Dict]:
+        """
+        Get the faces detected in a file
+
+        Returns:
+            List of {'face_id', 'bounding_box', 'confidence', 'encoding' (float32
+            array or None), 'face_cluster_id', 'identified_person'}
+        """
+        query = '''
+            SELECT face_id, face_encoding, bounding_box, confidence,
+                   face_cluster_id, identified_person
+            FROM face_detections
+            WHERE file_id = ?
+            ORDER BY face_id
+        '''
+        faces = []
+        for row in get_db_for_id(file_id).execute_query(query, (file_id,)):
+            face = dict(row)
+            face['encoding'] = encoding_array(face.pop('face_encoding'))
+            face['bounding_box'] = json.loads(face['bounding_box']) if face['bounding_box'] else None
+            faces.append(face)
+        return faces
+
+    def get_case_encodings(self, case_id: int,
+                           after_face_id: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get every face encoding of a case as one matrix
+
+        Args:
+            case_id: Case to read
+            after_face_id: Only faces with a greater face_id (incremental loads)
+
+        Returns:
+            (face_ids, file_ids, encodings) with encodings an N x ENCODING_SIZE
+            float32 matrix; faces without an encoding are left out
+        """
+        query = '''
+            SELECT face_id, file_id, face_encoding
+            FROM face_detections
+            WHERE case_id = ? AND face_id > ? AND face_encoding IS NOT NULL
+            ORDER BY face_id
+        '''
+        face_ids, file_ids, blobs = [], [], []
+        with get_case_db(case_id).transaction() as conn:
+            cursor = conn.execute(query, (case_id, after_face_id))
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                for face_id, file_id, blob in rows:
+                    face_ids.append(face_id)
+                    file_ids.append(file_id)
+                    blobs.append(blob)
+
+        encodings = np.frombuffer(b''.join(blobs), dtype=ENCODING_DTYPE)
+        return (np.array(face_ids, dtype=np.int64), np.array(file_ids, dtype=np.int64),
+                encodings.reshape(-1, ENCODING_SIZE))
+
+    def get_faces(self, face_ids: Sequence[int]) -> List[Dict]:
+        """Get face rows (without encodings) by ID, with their file names"""
+        if not face_ids:
+            return []
+
+        faces = []
+        by_case: Dict[int, List[int]] = {}
+        for face_id in face_ids:
+            by_case.setdefault(case_id_for_id(face_id), []).append(int(face_id))
+
+        for case_id, ids in by_case.items():
+            placeholders = ', '.join('?' for _ in ids)
+            query = f'''
+                SELECT fd.face_id, fd.file_id, fd.bounding_box, fd.confidence,
+                       fd.face_cluster_id, fd.identified_person, ef.file_name
+                FROM face_detections fd
+                JOIN evidence_files ef ON ef.file_id = fd.file_id
+                WHERE fd.face_id IN ({placeholders})
+            '''
+            for row in get_case_db(case_id).execute_query(query, tuple(ids)):
+                face = dict(row)
+                face['bounding_box'] = json.loads(face['bounding_box']) if face['bounding_box'] else None
+                faces.append(face)
+
+        return faces
+
+    def set_clusters(self, case_id: int, assignments: Iterable[Tuple[int, Optional[int]]]) -> int:
+        """
+        Store face clustering results
+
+        Args:
+            case_id: Case the faces belong to
+            assignments: (face_id, face_cluster_id) pairs
+
+        Returns:
+            Number of faces updated
+        """
+        with get_case_db(case_id).transaction() as conn:
+            cursor = conn.executemany(
+                'UPDATE face_detections SET face_cluster_id = ? WHERE face_id = ?',
+                [(cluster_id, face_id) for face_id, cluster_id in assignments]
+            )
+            return cursor.rowcount
+
+    def identify_person(self, face_id: int, person: Optional[str]):
+        """Record (or clear) who a face belongs to"""
+        with get_db_for_id(face_id).transaction() as conn:
+            conn.execute('UPDATE face_detections SET identified_person = ? WHERE face_id = ?',
+                         (person, face_id))
+
+    def get_unstored_file_ids(self, case_id: int) -> List[int]:
+        """Get IDs of files with faces counted but none stored (analyzed before faces were kept)"""
+        query = '''
+            SELECT ef.file_id FROM evidence_files ef
+            WHERE ef.case_id = ? AND ef.face_count > 0
+              AND NOT EXISTS (SELECT 1 FROM face_detections fd WHERE fd.file_id = ef.file_id)
+        '''
+        results = get_case_db(case_id).execute_query(query, (case_id,))
+        return [row['file_id'] for row in results]
+
+    def count_faces(self, case_id: int) -> int:
+        """Number of stored faces in a case"""
+        results = get_case_db(case_id).execute_query(
+            'SELECT COUNT(*) AS count FROM face_detections WHERE case_id = ?', (case_id,)
+        )
+        return results[0]['count'] if results else 0
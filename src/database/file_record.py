@@ -0,0 +1,155 @@
+"""
+Compact evidence file record
+"""
+from typing import Any, Dict, Iterator, List, Tuple
+from .db_manager import get_db_for_id
+from .compression import decompress_text
+from .record_cache import get_record_cache
+
+# Columns of evidence_files (hot table), loaded with every record
+HOT_COLUMNS = (
+    'file_id', 'case_id', 'file_name', 'file_type', 'file_size', 'date_taken',
+    'ai_processed', 'face_count', 'has_text', 'is_flagged', 'imported_date'
+)
+
+# Columns of evidence_file_details, fetched by file_id on first access
+# unless the query already joined them
+DETAIL_COLUMNS = (
+    'file_path', 'file_relative_path', 'file_hash', 'source_archive',
+    'date_created', 'date_modified', 'date_accessed',
+    'gps_latitude', 'gps_longitude', 'gps_altitude', 'location_name',
+    'camera_make', 'camera_model',
+    'ai_confidence', 'flag_reason', 'analyzed_date'
+)
+
+# Large text columns of evidence_file_details, fetched separately
+LAZY_COLUMNS = ('ai_tags', 'ocr_text', 'analyst_notes')
+
+COLD_COLUMNS = DETAIL_COLUMNS + LAZY_COLUMNS
+
+_HOT = frozenset(HOT_COLUMNS)
+_DETAIL = frozenset(DETAIL_COLUMNS)
+_LAZY = frozenset(LAZY_COLUMNS)
+
+class FileRecord:
+    """
+    Evidence file row with a fixed, slotted memory layout
+
+    Supports the dict operations callers used on dict(row): record['key'],
+    record.get('key'), 'key' in record, record['key'] = value, keys/items
+    and dict(record). Keys that are not evidence file columns (for example
+    'match_details' added by search) are kept in a small side dict.
+
+    Hot columns live in slots. Detail columns and the large text columns are
+    loaded from evidence_file_details (or the shared record cache), one group
+    at a time, the first time one of them is read. Compressed text is
+    decompressed when loaded.
+    """
+
+    __slots__ = HOT_COLUMNS + ('_cold', '_extra')
+
+    def __init__(self, values=None):
+        for column in HOT_COLUMNS:
+            setattr(self, column, None)
+        self._cold = None
+        self._extra = None
+
+        if values is not None:
+            for key in values.keys():
+                value = values[key]
+                self[key] = decompress_text(value) if key in _LAZY else value
+
+    @classmethod
+    def from_rows(cls, rows) -> List['FileRecord']:
+        """Build records from sqlite3.Row results"""
+        return [cls(row) for row in rows]
+
+    def _load(self, columns: Tuple[str, ...]):
+        """Fetch a group of cold columns; values already set on the record win"""
+        loaded = dict.fromkeys(columns)
+        # peek: a lazy load is not a get_file lookup and must not skew hit_rate
+        cached = get_record_cache().peek(self.file_id) if self.file_id is not None else None
+
+        if cached is not None:
+            loaded.update({key: cached[key] for key in columns})
+        elif self.file_id is not None:
+            query = f"SELECT {', '.join(columns)} FROM evidence_file_details WHERE file_id = ?"
+            results = get_db_for_id(self.file_id).execute_query(query, (self.file_id,))
+            if results:
+                row = results[0]
+                loaded.update({key: decompress_text(row[key]) for key in row.keys()})
+
+        if self._cold:
+            loaded.update(self._cold)
+        self._cold = loaded
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _HOT:
+            return getattr(self, key)
+        if key in _DETAIL or key in _LAZY:
+            if self._cold is None or key not in self._cold:
+                self._load(LAZY_COLUMNS if key in _LAZY else DETAIL_COLUMNS)
+            return self._cold[key]
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in _HOT:
+            setattr(self, key, value)
+        elif key in _DETAIL or key in _LAZY:
+            if self._cold is None:
+                self._cold = {}
+            self._cold[key] = value
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names that are not slots
+        if name in _DETAIL or name in _LAZY:
+            return self[name]
+        raise AttributeError(name)
+
+    def __contains__(self, key: str) -> bool:
+        return key in _HOT or key in _DETAIL or key in _LAZY or (
+            self._extra is not None and key in self._extra
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(HOT_COLUMNS) + len(COLD_COLUMNS) + len(self._extra or ())
+
+    def __repr__(self) -> str:
+        return f"FileRecord(file_id={self.file_id}, file_name={self.file_name!r})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """dict.get equivalent"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        """Column names plus any extra keys"""
+        return list(HOT_COLUMNS) + list(COLD_COLUMNS) + list(self._extra or ())
+
+    def items(self) -> List[tuple]:
+        """(key, value) pairs; loads cold columns"""
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self, include_cold: bool = True) -> Dict:
+        """Plain dict copy of the record"""
+        data = {column: getattr(self, column) for column in HOT_COLUMNS}
+        if include_cold:
+            data.update({column: self[column] for column in COLD_COLUMNS})
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def is_loaded(self) -> bool:
+        """Whether all cold columns are in memory"""
+        return self._cold is not None and all(c in self._cold for c in COLD_COLUMNS)
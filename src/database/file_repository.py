@@ -2,126 +2,342 @@
 Evidence file data access layer
 """
 from datetime import datetime
-from typing import List, Optional, Dict
-from .db_manager import get_db_manager
+from typing import Iterable, List, Optional, Dict
+from .db_manager import get_case_db, get_db_for_id
+from .tag_repository import TagRepository
+from .face_repository import FaceRepository
+from .object_repository import ObjectRepository, CLASS_FILES_QUERY
+from .file_record import FileRecord, HOT_COLUMNS, DETAIL_COLUMNS, COLD_COLUMNS
+from .compression import compress_text, decompress_text
+from .record_cache import get_record_cache
+
+# List queries read the hot table only (FileRecord loads the rest lazily)
+LIST_COLUMNS = ', '.join(HOT_COLUMNS)
+
+# ... or also join the non-text detail columns
+DETAIL_LIST_COLUMNS = LIST_COLUMNS + ', ' + ', '.join(f'd.{c}' for c in DETAIL_COLUMNS)
+
+# Selection of a bulk operation (see _select_bulk_ids)
+BULK_IDS = 'SELECT file_id FROM temp.bulk_ids'
 
 class FileRepository:
-    """Repository for evidence file operations"""
+    """
+    Repository for evidence file operations
     
-    def __init__(self):
-        self.db = get_db_manager()
+    Each case lives in its own database; calls are routed by case_id, or by
+    the case encoded in file_id. Rows are returned as FileRecord objects,
+    which support the same key access as the dicts used previously.
+    
+    A file is stored as a narrow evidence_files row (columns used by lists,
+    filters and statistics) plus an evidence_file_details row (paths,
+    metadata, text). Callers only see the combined record.
+    
+    get_file reads through a shared LRU cache of complete rows; every write
+    below updates or drops the cached row in the same call.
+    """
     
     def add_file(self, file_data: Dict) -> int:
         """Add evidence file to database"""
         query = '''
             INSERT INTO evidence_files (
-                case_id, file_path, file_relative_path, file_name, file_type, file_size, file_hash,
-                source_archive, date_created, date_modified, date_accessed, date_taken,
-                gps_latitude, gps_longitude, gps_altitude,
-                camera_make, camera_model
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                case_id, file_name, file_type, file_size, date_taken
+            ) VALUES (?, ?, ?, ?, ?)
         '''
 
         params = (
             file_data.get('case_id'),
-            file_data.get('file_path'),
-            file_data.get('file_relative_path'),
             file_data.get('file_name'),
             file_data.get('file_type'),
             file_data.get('file_size'),
-            file_data.get('file_hash'),
-            file_data.get('source_archive'),
-            file_data.get('date_created'),
-            file_data.get('date_modified'),
-            file_data.get('date_accessed'),
-            file_data.get('date_taken'),
-            file_data.get('gps_latitude'),
-            file_data.get('gps_longitude'),
-            file_data.get('gps_altitude'),
-            file_data.get('camera_make'),
-            file_data.get('camera_model')
+            file_data.get('date_taken')
         )
 
-        return self.db.execute_insert(query, params)
+        detail_query = '''
+            INSERT INTO evidence_file_details (
+                file_id, file_path, file_relative_path, file_hash, source_archive,
+                date_created, date_modified, date_accessed,
+                gps_latitude, gps_longitude, gps_altitude,
+                camera_make, camera_model
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+
+        with get_case_db(file_data['case_id']).transaction() as conn:
+            file_id = conn.execute(query, params).lastrowid
+            conn.execute(detail_query, (
+                file_id,
+                file_data.get('file_path'),
+                file_data.get('file_relative_path'),
+                file_data.get('file_hash'),
+                file_data.get('source_archive'),
+                file_data.get('date_created'),
+                file_data.get('date_modified'),
+                file_data.get('date_accessed'),
+                file_data.get('gps_latitude'),
+                file_data.get('gps_longitude'),
+                file_data.get('gps_altitude'),
+                file_data.get('camera_make'),
+                file_data.get('camera_model')
+            ))
+
+        return file_id
     
-    def get_file(self, file_id: int) -> Optional[Dict]:
-        """Get file by ID"""
-        query = 'SELECT * FROM evidence_files WHERE file_id = ?'
-        results = self.db.execute_query(query, (file_id,))
+    def get_file(self, file_id: int) -> Optional[FileRecord]:
+        """Get file by ID (all columns loaded)"""
+        cache = get_record_cache()
+        cached = cache.get(file_id)
+        if cached is not None:
+            return FileRecord(cached)
+        
+        query = f'''
+            SELECT ef.*, {', '.join(f'd.{c}' for c in COLD_COLUMNS)}
+            FROM evidence_files ef
+            LEFT JOIN evidence_file_details d ON d.file_id = ef.file_id
+            WHERE ef.file_id = ?
+        '''
+        results = get_db_for_id(file_id).execute_query(query, (file_id,))
         
         if results:
-            return dict(results[0])
+            record = FileRecord(results[0])
+            cache.put(file_id, record.to_dict())
+            return record
         return None
     
-    def get_files_by_case(self, case_id: int, 
-                          flagged_only: bool = False) -> List[Dict]:
-        """Get all files for a case"""
+    def get_files_by_case(self, case_id: int, flagged_only: bool = False,
+                          with_details: bool = False) -> List[FileRecord]:
+        """
+        Get all files for a case
+        
+        Args:
+            case_id: Case ID
+            flagged_only: Only flagged files
+            with_details: Also load paths and metadata in the same query
+                          (for callers that read them for every file)
+        """
+        query = self._list_query(with_details) + ' WHERE case_id = ?'
         if flagged_only:
-            query = '''
-                SELECT * FROM evidence_files 
-                WHERE case_id = ? AND is_flagged = 1
-                ORDER BY date_taken DESC
-            '''
-        else:
-            query = '''
-                SELECT * FROM evidence_files 
-                WHERE case_id = ?
-                ORDER BY date_taken DESC
-            '''
+            query += ' AND is_flagged = 1'
+        query += ' ORDER BY date_taken DESC'
         
-        results = self.db.execute_query(query, (case_id,))
-        return [dict(row) for row in results]
+        results = get_case_db(case_id).execute_query(query, (case_id,))
+        return FileRecord.from_rows(results)
+    
+    def _list_query(self, with_details: bool = False) -> str:
+        """SELECT ... FROM clause for record lists"""
+        if with_details:
+            return f'''
+                SELECT {DETAIL_LIST_COLUMNS} FROM evidence_files
+                LEFT JOIN evidence_file_details d USING (file_id)
+            '''
+        return f'SELECT {LIST_COLUMNS} FROM evidence_files'
     
     def update_ai_analysis(self, file_id: int, analysis_data: Dict):
-        """Update file with AI analysis results"""
+        """
+        Update file with AI analysis results
+        
+        If analysis_data contains a 'tags' list, the file's AI tags are also
+        written to the normalized tags/file_tags tables in the same transaction.
+        A 'faces' list (bounding_box, confidence, encoding) and an 'objects'
+        list (class, confidence, bounding_box) replace the file's
+        face_detections and object_detections rows the same way. A 'file_hash' computed during
+        analysis is stored if the file had none.
+        """
+        ocr_text = analysis_data.get('ocr_text')
+        analyzed_date = datetime.now().isoformat()
+        
         query = '''
             UPDATE evidence_files 
             SET ai_processed = 1,
-                ai_tags = ?,
-                ai_confidence = ?,
-                ocr_text = ?,
                 face_count = ?,
-                analyzed_date = ?
+                has_text = ?
             WHERE file_id = ?
         '''
         
         params = (
+            analysis_data.get('face_count', 0),
+            1 if ocr_text else 0,
+            file_id
+        )
+        
+        detail_query = '''
+            UPDATE evidence_file_details
+            SET ai_tags = ?,
+                ai_confidence = ?,
+                analyzed_date = ?
+            WHERE file_id = ?
+        '''
+        
+        detail_params = (
             analysis_data.get('ai_tags'),
             analysis_data.get('ai_confidence'),
-            analysis_data.get('ocr_text'),
-            analysis_data.get('face_count', 0),
-            datetime.now().isoformat(),
+            analyzed_date,
             file_id
         )
         
-        self.db.execute_update(query, params)
+        with get_db_for_id(file_id).transaction() as conn:
+            conn.execute(query, params)
+            conn.execute(detail_query, detail_params)
+            self.set_text(conn, 'ocr_text', ocr_text, '?', (file_id,))
+            if analysis_data.get('file_hash'):
+                conn.execute('''
+                    UPDATE evidence_file_details SET file_hash = ?
+                    WHERE file_id = ? AND file_hash IS NULL
+                ''', (analysis_data['file_hash'], file_id))
+            if analysis_data.get('tags') is not None:
+                TagRepository.replace_file_tags(conn, file_id, analysis_data['tags'])
+            if analysis_data.get('faces') is not None:
+                FaceRepository.replace_file_faces(conn, file_id, analysis_data['faces'])
+            if analysis_data.get('objects') is not None:
+                ObjectRepository.replace_file_objects(conn, file_id, analysis_data['objects'])
+        
+        cached = {
+            'ai_processed': 1,
+            'face_count': params[0],
+            'has_text': params[1],
+            'ai_tags': detail_params[0],
+            'ai_confidence': detail_params[1],
+            'ocr_text': ocr_text,
+            'analyzed_date': analyzed_date
+        }
+        if analysis_data.get('file_hash'):
+            cached['file_hash'] = analysis_data['file_hash']
+        get_record_cache().update(file_id, cached)
     
     def flag_file(self, file_id: int, reason: str = ''):
         """Flag file as evidence"""
-        query = '''
-            UPDATE evidence_files 
-            SET is_flagged = 1, flag_reason = ?
-            WHERE file_id = ?
-        '''
-        self.db.execute_update(query, (reason, file_id))
+        with get_db_for_id(file_id).transaction() as conn:
+            conn.execute('UPDATE evidence_files SET is_flagged = 1 WHERE file_id = ?', (file_id,))
+            conn.execute(
+                'UPDATE evidence_file_details SET flag_reason = ? WHERE file_id = ?',
+                (reason, file_id)
+            )
+        get_record_cache().update(file_id, {'is_flagged': 1, 'flag_reason': reason})
     
     def unflag_file(self, file_id: int):
         """Remove flag from file"""
-        query = '''
-            UPDATE evidence_files 
-            SET is_flagged = 0, flag_reason = NULL
-            WHERE file_id = ?
-        '''
-        self.db.execute_update(query, (file_id,))
+        with get_db_for_id(file_id).transaction() as conn:
+            conn.execute('UPDATE evidence_files SET is_flagged = 0 WHERE file_id = ?', (file_id,))
+            conn.execute(
+                'UPDATE evidence_file_details SET flag_reason = NULL WHERE file_id = ?',
+                (file_id,)
+            )
+        get_record_cache().update(file_id, {'is_flagged': 0, 'flag_reason': None})
     
     def add_note(self, file_id: int, note: str):
         """Add analyst note to file"""
-        query = 'UPDATE evidence_files SET analyst_notes = ? WHERE file_id = ?'
-        self.db.execute_update(query, (note, file_id))
+        with get_db_for_id(file_id).transaction() as conn:
+            self.set_text(conn, 'analyst_notes', note, '?', (file_id,))
+        get_record_cache().update(file_id, {'analyst_notes': note})
+    
+    def flag_files(self, case_id: int, file_ids: Optional[Iterable[int]] = None,
+                   search_params: Optional[Dict] = None, reason: str = '') -> int:
+        """
+        Flag many files in one transaction
+        
+        Args:
+            case_id: Case ID
+            file_ids: Files to flag, or
+            search_params: search_files filters selecting the files to flag
+            reason: Flag reason stored on every file
+        
+        Returns:
+            Number of files selected
+        """
+        with get_case_db(case_id).transaction() as conn:
+            ids = self._select_bulk_ids(conn, case_id, file_ids, search_params)
+            conn.execute(f'''
+                UPDATE evidence_files SET is_flagged = 1
+                WHERE file_id IN ({BULK_IDS}) AND IFNULL(is_flagged, 0) != 1
+            ''')
+            conn.execute(
+                f'UPDATE evidence_file_details SET flag_reason = ? WHERE file_id IN ({BULK_IDS})',
+                (reason,)
+            )
+        
+        get_record_cache().update_many(ids, {'is_flagged': 1, 'flag_reason': reason})
+        return len(ids)
+    
+    def unflag_files(self, case_id: int, file_ids: Optional[Iterable[int]] = None,
+                     search_params: Optional[Dict] = None) -> int:
+        """Remove the flag from many files in one transaction (see flag_files)"""
+        with get_case_db(case_id).transaction() as conn:
+            ids = self._select_bulk_ids(conn, case_id, file_ids, search_params)
+            conn.execute(f'''
+                UPDATE evidence_files SET is_flagged = 0
+                WHERE file_id IN ({BULK_IDS}) AND is_flagged = 1
+            ''')
+            conn.execute(
+                f'UPDATE evidence_file_details SET flag_reason = NULL WHERE file_id IN ({BULK_IDS})'
+            )
+        
+        get_record_cache().update_many(ids, {'is_flagged': 0, 'flag_reason': None})
+        return len(ids)
+    
+    def add_note_to_files(self, case_id: int, note: str,
+                          file_ids: Optional[Iterable[int]] = None,
+                          search_params: Optional[Dict] = None) -> int:
+        """Set the analyst note of many files in one transaction (see flag_files)"""
+        with get_case_db(case_id).transaction() as conn:
+            ids = self._select_bulk_ids(conn, case_id, file_ids, search_params)
+            self.set_text(conn, 'analyst_notes', note, BULK_IDS)
+        
+        get_record_cache().update_many(ids, {'analyst_notes': note})
+        return len(ids)
     
-    def search_files(self, case_id: int, search_params: Dict) -> List[Dict]:
+    def tag_files(self, case_id: int, tag_name: str,
+                  file_ids: Optional[Iterable[int]] = None,
+                  search_params: Optional[Dict] = None,
+                  category: str = 'analyst') -> int:
+        """Add a tag to many files in one transaction (see flag_files)"""
+        with get_case_db(case_id).transaction() as conn:
+            ids = self._select_bulk_ids(conn, case_id, file_ids, search_params)
+            TagRepository.add_tag_to_files(conn, tag_name, BULK_IDS, category)
+        
+        return len(ids)
+    
+    def _select_bulk_ids(self, conn, case_id: int, file_ids: Optional[Iterable[int]],
+                         search_params: Optional[Dict]) -> List[int]:
+        """
+        Fill temp.bulk_ids with the files of a bulk operation
+        
+        Either file_ids (IDs not in the case are dropped) or search_params
+        must be given. The temp table lives until the connection is closed.
+        """
+        if (file_ids is None) == (search_params is None):
+            raise ValueError("Pass either file_ids or search_params")
+        
+        conn.execute('CREATE TEMP TABLE bulk_ids (file_id INTEGER PRIMARY KEY)')
+        
+        if file_ids is not None:
+            conn.executemany(
+                'INSERT OR IGNORE INTO temp.bulk_ids (file_id) VALUES (?)',
+                ((int(file_id),) for file_id in file_ids)
+            )
+            conn.execute('''
+                DELETE FROM temp.bulk_ids WHERE NOT EXISTS (
+                    SELECT 1 FROM evidence_files ef
+                    WHERE ef.file_id = bulk_ids.file_id AND ef.case_id = ?
+                )
+            ''', (case_id,))
+        else:
+            conditions, params = self._search_conditions(case_id, search_params)
+            conn.execute(
+                f'INSERT INTO temp.bulk_ids (file_id) SELECT file_id FROM evidence_files WHERE {conditions}',
+                params
+            )
+        
+        return [row[0] for row in conn.execute(BULK_IDS)]
+    
+    def search_files(self, case_id: int, search_params: Dict) -> List[FileRecord]:
         """Search files with various filters"""
-        query = 'SELECT * FROM evidence_files WHERE case_id = ?'
+        conditions, params = self._search_conditions(case_id, search_params)
+        query = self._list_query() + ' WHERE ' + conditions + ' ORDER BY date_taken DESC'
+        
+        results = get_case_db(case_id).execute_query(query, tuple(params))
+        return FileRecord.from_rows(results)
+    
+    def _search_conditions(self, case_id: int, search_params: Dict) -> tuple:
+        """WHERE conditions (on evidence_files) and parameters for search filters"""
+        query = 'case_id = ?'
         params = [case_id]
         
         # Date range filter
@@ -146,36 +362,141 @@ class FileRepository:
         if search_params.get('has_faces'):
             query += ' AND face_count > 0'
         
-        # Text search in OCR
+        # Text search in OCR (full-text index; ocr_text may be compressed).
+        # Matches words starting with the text, not arbitrary substrings.
         if search_params.get('text_search'):
-            query += ' AND ocr_text LIKE ?'
-            params.append(f'%{search_params["text_search"]}')
+            query += ''' AND file_id IN (
+                SELECT rowid FROM evidence_text_fts WHERE evidence_text_fts MATCH ?
+            )'''
+            params.append(self._fts_query(search_params['text_search'], 'ocr_text'))
         
-        # Tag search
+        # Tag search (normalized tags, uses idx_file_tags_tag)
         if search_params.get('tag_search'):
-            query += ' AND ai_tags LIKE ?'
-            params.append(f'%{search_params["tag_search"]}')
+            query += ''' AND file_id IN (
+                SELECT ft.file_id FROM tags t
+                JOIN file_tags ft ON ft.tag_id = t.tag_id
+                WHERE t.tag_name LIKE ?
+            )'''
+            params.append(f'%{search_params["tag_search"]}%')
         
-        query += ' ORDER BY date_taken DESC'
+        # Detected object class, optionally above a confidence (uses idx_object_class)
+        if search_params.get('object_class'):
+            query += f' AND file_id IN ({CLASS_FILES_QUERY})'
+            params.extend([case_id, search_params['object_class'],
+                           search_params.get('min_object_confidence', 0.0)])
         
-        results = self.db.execute_query(query, tuple(params))
-        return [dict(row) for row in results]
+        return query, params
+    
+    def get_file_ids_matching_text(self, case_id: int, text: str) -> List[int]:
+        """
+        Get IDs of files whose OCR text or notes contain words starting with text
+
+        Matching is by word prefix through the full-text index, not by
+        arbitrary substring: 'pay' finds 'payment' but not 'repay'.
+        """
+        query = '''
+            SELECT rowid FROM evidence_text_fts WHERE evidence_text_fts MATCH ?
+        '''
+        results = get_case_db(case_id).execute_query(query, (self._fts_query(text),))
+        return [row[0] for row in results]
+    
+    def rebuild_text_index(self, case_id: int) -> int:
+        """
+        Rebuild the full-text index of a case from evidence_file_details
+        
+        Returns:
+            Number of files indexed
+        """
+        with get_case_db(case_id).transaction() as conn:
+            return self.reindex_text(conn)
+    
+    # evidence_text_fts is maintained here rather than by triggers: it is fed
+    # the decompressed text, and triggers would need a Python SQL function
+    # that plain sqlite3 connections (scripts, external tools) do not have.
+    # Every write of ocr_text / analyst_notes goes through set_text.
+    
+    @staticmethod
+    def set_text(conn, column: str, text: Optional[str], file_id_query: str,
+                 params: tuple = ()):
+        """
+        Set ocr_text or analyst_notes of files and update the full-text index
+        
+        Args:
+            conn: Connection with an open transaction
+            column: 'ocr_text' or 'analyst_notes'
+            text: Plain text (compressed for storage here), or None
+            file_id_query: SQL yielding the file_ids ('?' or a SELECT)
+            params: Parameters of file_id_query
+        """
+        if column not in ('ocr_text', 'analyst_notes'):
+            raise ValueError(f"Not a text column: {column}")
+        
+        old = FileRepository._unindex_text(conn, file_id_query, params)
+        conn.execute(
+            f'UPDATE evidence_file_details SET {column} = ? WHERE file_id IN ({file_id_query})',
+            (compress_text(text), *params)
+        )
+        
+        new = [(file_id, text, notes) if column == 'ocr_text' else (file_id, ocr_text, text)
+               for file_id, ocr_text, notes in old]
+        conn.executemany(
+            'INSERT INTO evidence_text_fts (rowid, ocr_text, analyst_notes) VALUES (?, ?, ?)',
+            [entry for entry in new if entry[1] is not None or entry[2] is not None]
+        )
+    
+    @staticmethod
+    def _unindex_text(conn, file_id_query: str, params: tuple = ()) -> List[tuple]:
+        """Remove files from the full-text index; returns their (file_id, ocr_text, notes)"""
+        rows = conn.execute(f'''
+            SELECT file_id, ocr_text, analyst_notes FROM evidence_file_details
+            WHERE file_id IN ({file_id_query})
+        ''', params).fetchall()
+        old = [(row[0], decompress_text(row[1]), decompress_text(row[2])) for row in rows]
+        
+        # A contentless index deletes by the values it was given
+        conn.executemany('''
+            INSERT INTO evidence_text_fts (evidence_text_fts, rowid, ocr_text, analyst_notes)
+            VALUES ('delete', ?, ?, ?)
+        ''', [entry for entry in old if entry[1] is not None or entry[2] is not None])
+        return old
+    
+    @staticmethod
+    def reindex_text(conn) -> int:
+        """Rebuild the full-text index from evidence_file_details (open transaction)"""
+        conn.execute("INSERT INTO evidence_text_fts (evidence_text_fts) VALUES ('delete-all')")
+        rows = conn.execute('''
+            SELECT file_id, ocr_text, analyst_notes FROM evidence_file_details
+            WHERE ocr_text IS NOT NULL OR analyst_notes IS NOT NULL
+        ''')
+        cursor = conn.executemany(
+            'INSERT INTO evidence_text_fts (rowid, ocr_text, analyst_notes) VALUES (?, ?, ?)',
+            ((row[0], decompress_text(row[1]), decompress_text(row[2])) for row in rows)
+        )
+        return cursor.rowcount
+    
+    def _fts_query(self, text: str, column: Optional[str] = None) -> str:
+        """Build an FTS5 prefix-phrase query for user text"""
+        phrase = '"' + text.replace('"', '""') + '"*'
+        return f'{column} : {phrase}' if column else phrase
     
     def delete_file(self, file_id: int) -> bool:
         """Delete file from database"""
-        query = 'DELETE FROM evidence_files WHERE file_id = ?'
-        affected = self.db.execute_delete(query, (file_id,))
+        with get_db_for_id(file_id).transaction() as conn:
+            self._unindex_text(conn, '?', (file_id,))
+            affected = conn.execute(
+                'DELETE FROM evidence_files WHERE file_id = ?', (file_id,)
+            ).rowcount
+        get_record_cache().invalidate(file_id)
         return affected > 0
     
-    def get_unprocessed_files(self, case_id: int) -> List[Dict]:
-        """Get files that haven't been processed by AI yet"""
-        query = '''
-            SELECT * FROM evidence_files
+    def get_unprocessed_files(self, case_id: int, with_details: bool = False) -> List[FileRecord]:
+        """Get files that haven't been processed by AI yet (see get_files_by_case)"""
+        query = self._list_query(with_details) + '''
             WHERE case_id = ? AND ai_processed = 0
             ORDER BY imported_date ASC
         '''
-        results = self.db.execute_query(query, (case_id,))
-        return [dict(row) for row in results]
+        results = get_case_db(case_id).execute_query(query, (case_id,))
+        return FileRecord.from_rows(results)
 
     def get_unprocessed_count(self, case_id: int) -> int:
         """Get count of files that haven't been processed by AI yet"""
@@ -184,8 +505,13 @@ class FileRepository:
             FROM evidence_files
             WHERE case_id = ? AND ai_processed = 0
         '''
-        results = self.db.execute_query(query, (case_id,))
+        results = get_case_db(case_id).execute_query(query, (case_id,))
 
         if results:
             return results[0][0]
-        return 0
\ No newline at end of file
+        return 0
+
+    @staticmethod
+    def cache_stats() -> Dict:
+        """Get record cache counters (size, hits, misses, hit_rate, ...)"""
+        return get_record_cache().stats()
\ No newline at end of file
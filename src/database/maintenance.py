@@ -0,0 +1,278 @@
+"""
+Database maintenance
+
+Keeps planner statistics current and the WAL bounded on long-lived cases:
+
+    analyze      ANALYZE; full statistics rebuild after large imports
+    optimize     PRAGMA optimize; re-analyzes only tables that changed enough
+    checkpoint   PRAGMA wal_checkpoint(TRUNCATE); resets the -wal file
+    vacuum       PRAGMA incremental_vacuum; returns free pages to the filesystem
+    quick_check  PRAGMA quick_check; on demand
+
+Large imports run analyze right away. Other databases written to are
+marked dirty and maintained by MaintenanceScheduler once no connection has
+been opened for a while. The timings of the last run on each database are
+stored in the catalog settings table under 'maintenance:<file name>'.
+"""
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .db_manager import (
+    get_db_manager, get_case_db, case_db_path, open_case_ids, seconds_since_activity
+)
+from ..utils.logger import get_logger
+
+IDLE_TASKS = ('optimize', 'checkpoint', 'vacuum')
+IMPORT_TASKS = ('analyze', 'optimize', 'checkpoint')
+
+class DatabaseMaintenance:
+    """Run maintenance tasks on the catalog and case databases"""
+
+    def __init__(self, import_threshold: int = 10000, vacuum_pages: int = 1024):
+        """
+        Args:
+            import_threshold: Imported rows that trigger an immediate ANALYZE
+            vacuum_pages: Pages released per incremental_vacuum step
+        """
+        self.import_threshold = import_threshold
+        self.vacuum_pages = vacuum_pages
+        self.logger = get_logger()
+        self._dirty = set()
+        self._dirty_lock = threading.Lock()
+        self._run_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> 'DatabaseMaintenance':
+        """Create from [Database] analyze_after_import_rows"""
+        from ..utils.config_loader import get_config
+        return cls(
+            import_threshold=get_config().get_int('Database', 'analyze_after_import_rows', 10000)
+        )
+
+    def run_tasks(self, db_path: Path, tasks: Sequence[str] = IDLE_TASKS) -> Dict:
+        """
+        Run maintenance tasks on one database file
+
+        Uses its own connection, so it does not count as activity for the
+        idle check.
+
+        Args:
+            db_path: Database file
+            tasks: Task names, run in order
+
+        Returns:
+            Dictionary with database, timings (seconds per task), wal_pages
+            (WAL size before the checkpoint), released_pages and quick_check
+            (list of problems, empty if ok) for the tasks that ran
+        """
+        result = {'database': Path(db_path).name, 'timings': {}}
+
+        with self._run_lock:
+            conn = sqlite3.connect(str(db_path), timeout=30)
+            try:
+                for task in tasks:
+                    started = time.perf_counter()
+                    self._run_task(conn, task, result)
+                    result['timings'][task] = round(time.perf_counter() - started, 4)
+            finally:
+                conn.close()
+
+        total = sum(result['timings'].values())
+        self.logger.info(
+            f"Maintenance of {result['database']}: "
+            + ', '.join(f"{task} {seconds * 1000:.0f}ms" for task, seconds in result['timings'].items())
+            + f" (total {total:.2f}s)"
+        )
+        self._record(result)
+
+        return result
+
+    def _run_task(self, conn: sqlite3.Connection, task: str, result: Dict):
+        """Run one task on an open connection"""
+        if task == 'analyze':
+            conn.execute('ANALYZE')
+            conn.commit()
+        elif task == 'optimize':
+            conn.execute('PRAGMA optimize').fetchall()
+            conn.commit()
+        elif task == 'checkpoint':
+            busy, wal_pages, _ = conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+            result['wal_pages'] = wal_pages
+            if busy:
+                self.logger.warning(f"WAL checkpoint of {result['database']} blocked by a reader")
+        elif task == 'vacuum':
+            free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            conn.execute(f'PRAGMA incremental_vacuum({int(self.vacuum_pages)})').fetchall()
+            conn.commit()
+            result['released_pages'] = free - conn.execute('PRAGMA freelist_count').fetchone()[0]
+        elif task == 'quick_check':
+            rows = [row[0] for row in conn.execute('PRAGMA quick_check')]
+            result['quick_check'] = [] if rows == ['ok'] else rows
+        else:
+            raise ValueError(f"Unknown maintenance task: {task}")
+
+    def _record(self, result: Dict):
+        """Store the timings of a run in the catalog settings table"""
+        conn = sqlite3.connect(str(get_db_manager().db_path), timeout=30)
+        try:
+            conn.execute(
+                '''
+                INSERT OR REPLACE INTO settings (setting_key, setting_value, last_updated)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ''',
+                (f"maintenance:{result['database']}",
+                 json.dumps(dict(result, run_at=datetime.now().isoformat())))
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not record maintenance timings: {e}")
+        finally:
+            conn.close()
+
+    def last_run(self, db_path: Path) -> Optional[Dict]:
+        """Get the recorded result of the last run on a database"""
+        results = get_db_manager().execute_query(
+            'SELECT setting_value FROM settings WHERE setting_key = ?',
+            (f'maintenance:{Path(db_path).name}',)
+        )
+        return json.loads(results[0]['setting_value']) if results else None
+
+    def mark_dirty(self, case_id: int):
+        """Queue a case database for the next idle maintenance pass"""
+        with self._dirty_lock:
+            self._dirty.add(int(case_id))
+
+    def has_pending(self) -> bool:
+        """Whether any case database was written since the last idle pass"""
+        with self._dirty_lock:
+            return bool(self._dirty)
+
+    def after_import(self, case_id: int, rows: int) -> Optional[Dict]:
+        """
+        Refresh statistics after rows were imported into a case
+
+        Imports of at least import_threshold rows are analyzed immediately;
+        smaller ones are left to the next idle pass.
+
+        Returns:
+            run_tasks result, or None if the case was only marked dirty
+        """
+        if rows < self.import_threshold:
+            self.mark_dirty(case_id)
+            return None
+
+        with self._dirty_lock:
+            self._dirty.discard(int(case_id))
+        return self.run_tasks(get_case_db(case_id).db_path, IMPORT_TASKS)
+
+    def run_idle(self) -> List[Dict]:
+        """Maintain the catalog, dirty case databases and open case databases"""
+        with self._dirty_lock:
+            case_ids = self._dirty | set(open_case_ids())
+            self._dirty.clear()
+
+        paths = [get_db_manager().db_path]
+        paths += [case_db_path(case_id) for case_id in sorted(case_ids)]
+
+        results = []
+        for path in paths:
+            if path.exists():
+                results.append(self.run_tasks(path, IDLE_TASKS))
+        return results
+
+    def quick_check(self, case_id: Optional[int] = None) -> List[str]:
+        """
+        Run PRAGMA quick_check on a case database (or the catalog)
+
+        Returns:
+            Problems reported; empty if the database is ok
+        """
+        db = get_case_db(case_id) if case_id is not None else get_db_manager()
+        return self.run_tasks(db.db_path, ('quick_check',))['quick_check']
+
+
+class MaintenanceScheduler:
+    """Run DatabaseMaintenance.run_idle when the databases are idle"""
+
+    def __init__(self, maintenance: DatabaseMaintenance,
+                 interval_minutes: float = 30, idle_seconds: float = 60):
+        """
+        Args:
+            maintenance: Maintenance to run
+            interval_minutes: Minimum time between idle passes, unless a
+                              case was marked dirty
+            idle_seconds: Time without database activity that counts as idle
+        """
+        self.maintenance = maintenance
+        self.interval = interval_minutes * 60
+        self.idle_seconds = idle_seconds
+        self.logger = get_logger()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_pass = time.monotonic()
+
+    def start(self):
+        """Start scheduler thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='MaintenanceScheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop scheduler (a pass already running is not interrupted)"""
+        self._stop.set()
+
+    def _run(self):
+        """Poll for idle periods"""
+        while not self._stop.wait(self.idle_seconds / 2):
+            due = (self.maintenance.has_pending()
+                   or time.monotonic() - self._last_pass >= self.interval)
+            if not due or seconds_since_activity() < self.idle_seconds:
+                continue
+
+            try:
+                self.maintenance.run_idle()
+            except Exception as e:
+                self.logger.error(f"Database maintenance failed: {e}")
+            self._last_pass = time.monotonic()
+
+
+_maintenance = None
+_maintenance_lock = threading.Lock()
+
+def get_maintenance() -> DatabaseMaintenance:
+    """Get global maintenance instance"""
+    global _maintenance
+
+    with _maintenance_lock:
+        if _maintenance is None:
+            try:
+                _maintenance = DatabaseMaintenance.from_config()
+            except FileNotFoundError:
+                _maintenance = DatabaseMaintenance()
+
+    return _maintenance
+
+def start_maintenance_scheduler() -> Optional[MaintenanceScheduler]:
+    """Start idle maintenance if [Database] maintenance_enabled is set"""
+    from ..utils.config_loader import get_config
+    config = get_config()
+
+    if not config.get_bool('Database', 'maintenance_enabled', True):
+        return None
+
+    scheduler = MaintenanceScheduler(
+        get_maintenance(),
+        interval_minutes=config.get_float('Database', 'maintenance_interval_minutes', 30),
+        idle_seconds=config.get_float('Database', 'maintenance_idle_seconds', 60)
+    )
+    scheduler.start()
+
+    return scheduler
@@ -0,0 +1,213 @@
+"""
+In-place schema migrations, tracked with PRAGMA user_version
+
+DatabaseManager runs the pending migrations of a database before applying
+its schema file. Databases created from the current schema file are stamped
+with the latest version and skip them.
+"""
+import json
+import sqlite3
+from typing import Callable, Dict, List, Tuple
+
+# Hot (evidence_files) / cold (evidence_file_details) split, see schema.sql
+HOT_COLUMNS = (
+    'file_id', 'case_id', 'file_name', 'file_type', 'file_size', 'date_taken',
+    'ai_processed', 'face_count', 'is_flagged', 'imported_date'
+)
+DETAIL_COLUMNS = (
+    'file_path', 'file_relative_path', 'file_hash', 'source_archive',
+    'date_created', 'date_modified', 'date_accessed',
+    'gps_latitude', 'gps_longitude', 'gps_altitude', 'location_name',
+    'camera_make', 'camera_model',
+    'ai_tags', 'ai_confidence', 'ocr_text', 'flag_reason', 'analyst_notes',
+    'analyzed_date'
+)
+
+def _split_evidence_files(conn: sqlite3.Connection):
+    """v1: split the wide evidence_files table into hot and detail tables"""
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(evidence_files)')]
+    if 'file_path' not in columns:
+        return  # Already split
+
+    seq = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'evidence_files'"
+    ).fetchone()
+
+    conn.execute('''
+        CREATE TABLE evidence_files_hot (
+            file_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            case_id INTEGER NOT NULL,
+            file_name TEXT NOT NULL,
+            file_type TEXT NOT NULL,
+            file_size INTEGER,
+            date_taken TIMESTAMP,
+            ai_processed BOOLEAN DEFAULT 0,
+            face_count INTEGER DEFAULT 0,
+            has_text BOOLEAN DEFAULT 0,
+            is_flagged BOOLEAN DEFAULT 0,
+            imported_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE evidence_file_details (
+            file_id INTEGER PRIMARY KEY,
+            file_path TEXT NOT NULL,
+            file_relative_path TEXT,
+            file_hash TEXT,
+            source_archive TEXT,
+            date_created TIMESTAMP,
+            date_modified TIMESTAMP,
+            date_accessed TIMESTAMP,
+            gps_latitude REAL,
+            gps_longitude REAL,
+            gps_altitude REAL,
+            location_name TEXT,
+            camera_make TEXT,
+            camera_model TEXT,
+            ai_tags TEXT,
+            ai_confidence REAL,
+            ocr_text TEXT,
+            flag_reason TEXT,
+            analyst_notes TEXT,
+            analyzed_date TIMESTAMP,
+            FOREIGN KEY (file_id) REFERENCES evidence_files(file_id) ON DELETE CASCADE
+        )
+    ''')
+
+    hot = ', '.join(HOT_COLUMNS)
+    conn.execute(f'''
+        INSERT INTO evidence_files_hot ({hot}, has_text)
+        SELECT {hot}, IFNULL(ocr_text, '') != '' FROM evidence_files
+    ''')
+
+    detail = ', '.join(DETAIL_COLUMNS)
+    conn.execute(f'''
+        INSERT INTO evidence_file_details (file_id, {detail})
+        SELECT file_id, {detail} FROM evidence_files
+    ''')
+
+    # Dropping the table also drops its triggers and indexes; schema.sql
+    # recreates them against the new tables. The FTS index is keyed by
+    # file_id and stays valid.
+    conn.execute('DROP TABLE evidence_files')
+    conn.execute('ALTER TABLE evidence_files_hot RENAME TO evidence_files')
+
+    if seq:
+        conn.execute(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'evidence_files'",
+            (seq[0],)
+        )
+
+
+def _tag_link_sources(conn: sqlite3.Connection):
+    """v2: record who attached each tag (file_tags.source)"""
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(file_tags)')]
+    if 'source' not in columns:
+        conn.execute("ALTER TABLE file_tags ADD COLUMN source TEXT NOT NULL DEFAULT 'analyst'")
+        # Best available guess for existing links: the tag's category
+        conn.execute('''
+            UPDATE file_tags SET source = 'ai'
+            WHERE tag_id IN (SELECT tag_id FROM tags WHERE tag_category = 'ai')
+        ''')
+
+    backfill_ai_tags(conn)
+
+def backfill_ai_tags(conn: sqlite3.Connection) -> int:
+    """
+    Link the JSON ai_tags of analyzed files that have no AI tag links
+
+    Files analyzed before tags were normalized only have the JSON column.
+
+    Returns:
+        Number of files tagged
+    """
+    from .tag_repository import TagRepository
+
+    rows = conn.execute('''
+        SELECT d.file_id, d.ai_tags FROM evidence_file_details d
+        WHERE d.ai_tags IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM file_tags ft WHERE ft.file_id = d.file_id AND ft.source = 'ai'
+        )
+    ''').fetchall()
+
+    tagged = 0
+    for file_id, ai_tags in rows:
+        try:
+            tags = json.loads(ai_tags)
+        except (ValueError, TypeError):
+            continue
+        if isinstance(tags, list) and tags:
+            TagRepository.replace_file_tags(conn, file_id, tags, 'ai')
+            tagged += 1
+
+    return tagged
+
+
+def _drop_text_index_triggers(conn: sqlite3.Connection):
+    """v3: the full-text index is maintained by FileRepository, not triggers"""
+    # The triggers called decompress_text(), which only DatabaseManager
+    # connections define; the indexed content itself is unchanged
+    for trigger in ('trg_text_fts_insert', 'trg_text_fts_delete', 'trg_text_fts_update'):
+        conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+
+
+# schema file -> ordered (version, migration) list
+MIGRATIONS: Dict[str, List[Tuple[int, Callable]]] = {
+    'schema.sql': [
+        (1, _split_evidence_files),
+        (2, _tag_link_sources),
+        (3, _drop_text_index_triggers),
+    ],
+    'catalog_schema.sql': [],
+    'analysis_cache_schema.sql': [],
+}
+
+def latest_version(schema_name: str) -> int:
+    """Get the version a database created from schema_name is stamped with"""
+    migrations = MIGRATIONS.get(schema_name, [])
+    return migrations[-1][0] if migrations else 0
+
+def migrate(conn: sqlite3.Connection, schema_name: str) -> List[int]:
+    """
+    Bring an existing database up to the latest version
+
+    Each migration runs in its own transaction with foreign key enforcement
+    off (required for table rebuilds) and is checked with foreign_key_check.
+
+    Returns:
+        Versions applied
+    """
+    is_new = not conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    ).fetchone()
+    current = conn.execute('PRAGMA user_version').fetchone()[0]
+
+    if is_new:
+        conn.execute(f'PRAGMA user_version = {latest_version(schema_name)}')
+        return []
+
+    applied = []
+    for version, migration in MIGRATIONS.get(schema_name, []):
+        if version <= current:
+            continue
+
+        conn.execute('PRAGMA foreign_keys = OFF')
+        try:
+            conn.execute('BEGIN')
+            migration(conn)
+            problems = conn.execute('PRAGMA foreign_key_check').fetchall()
+            if problems:
+                raise sqlite3.IntegrityError(
+                    f"Migration {version} left {len(problems)} foreign key violation(s)"
+                )
+            conn.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute('PRAGMA foreign_keys = ON')
+
+        applied.append(version)
+
+    return applied
@@ -0,0 +1,123 @@
+"""
+Object detection data access layer (object_detections table)
+"""
+import json
+import sqlite3
+from typing import Dict, Iterable, List, Optional
+from .db_manager import get_case_db, get_db_for_id, case_id_for_id
+
+# Files with a detection of a class at or above a confidence (uses idx_object_class)
+CLASS_FILES_QUERY = '''
+    SELECT file_id FROM object_detections
+    WHERE case_id = ? AND object_class = ? AND confidence >= ?
+'''
+
+class ObjectRepository:
+    """
+    Repository for detected objects (per-case databases)
+
+    Detections are written while a file's analysis results are saved (see
+    FileRepository.update_ai_analysis). Class and confidence lookups are
+    range scans of the (case_id, object_class, confidence) index, so they
+    do not depend on the size of the case.
+    """
+
+    @staticmethod
+    def replace_file_objects(conn: sqlite3.Connection, file_id: int, detections: Iterable[Dict]):
+        """
+        Replace the detected objects of a file inside an open transaction
+
+        Args:
+            conn: Connection with an open transaction
+            file_id: File the objects were found in
+            detections: Dicts with class, confidence and bounding_box
+        """
+        case_id = case_id_for_id(file_id)
+        conn.execute('DELETE FROM object_detections WHERE file_id = ?', (file_id,))
+        conn.executemany('''
+            INSERT INTO object_detections (file_id, case_id, object_class, confidence, bounding_box)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [
+            (file_id, case_id, detection['class'], detection.get('confidence'),
+             json.dumps(detection.get('bounding_box')))
+            for detection in detections
+        ])
+
+    def get_file_objects(self, file_id: int) -> List[Dict]:
+        """
+        Get the objects detected in a file
+
+        Returns:
+            List of {'detection_id', 'object_class', 'confidence', 'bounding_box'},
+            most confident first
+        """
+        query = '''
+            SELECT detection_id, object_class, confidence, bounding_box
+            FROM object_detections
+            WHERE file_id = ?
+            ORDER BY confidence DESC
+        '''
+        objects = []
+        for row in get_db_for_id(file_id).execute_query(query, (file_id,)):
+            detection = dict(row)
+            detection['bounding_box'] = (json.loads(detection['bounding_box'])
+                                         if detection['bounding_box'] else None)
+            objects.append(detection)
+        return objects
+
+    def find_files(self, case_id: int, object_class: str, min_confidence: float = 0.0,
+                   limit: Optional[int] = None) -> List[Dict]:
+        """
+        Find files containing an object class, e.g. every knife above 0.7
+
+        Returns:
+            List of {'file_id', 'file_name', 'confidence' (best detection),
+            'detections'}, most confident first
+        """
+        query = '''
+            SELECT od.file_id, ef.file_name, od.confidence, od.detections
+            FROM (
+                SELECT file_id, MAX(confidence) AS confidence, COUNT(*) AS detections
+                FROM object_detections
+                WHERE case_id = ? AND object_class = ? AND confidence >= ?
+                GROUP BY file_id
+            ) od
+            JOIN evidence_files ef ON ef.file_id = od.file_id
+            ORDER BY od.confidence DESC, od.file_id
+        '''
+        params = [case_id, object_class, min_confidence]
+
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+
+        results = get_case_db(case_id).execute_query(query, tuple(params))
+        return [dict(row) for row in results]
+
+    def get_file_ids_with_object(self, case_id: int, object_class: str,
+                                 min_confidence: float = 0.0) -> List[int]:
+        """Get IDs of files in a case with a detection of a class at min_confidence or above"""
+        results = get_case_db(case_id).execute_query(
+            'SELECT DISTINCT file_id FROM (' + CLASS_FILES_QUERY + ')',
+            (case_id, object_class, min_confidence)
+        )
+        return [row['file_id'] for row in results]
+
+    def get_class_counts(self, case_id: int, min_confidence: float = 0.0) -> List[Dict]:
+        """
+        Get object class facet counts for a case
+
+        Returns:
+            List of {'object_class', 'file_count', 'detection_count'} ordered by
+            file count
+        """
+        query = '''
+            SELECT object_class, COUNT(DISTINCT file_id) AS file_count,
+                   COUNT(*) AS detection_count
+            FROM object_detections
+            WHERE case_id = ? AND confidence >= ?
+            GROUP BY object_class
+            ORDER BY file_count DESC, object_class
+        '''
+        results = get_case_db(case_id).execute_query(query, (case_id, min_confidence))
+        return [dict(row) for row in results]
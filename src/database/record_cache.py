@@ -0,0 +1,126 @@
+"""
+Shared LRU cache of evidence file rows
+
+FileRepository.get_file reads through this cache and every repository write
+(flag, note, AI update, delete) updates or drops the cached row, so repeated
+reads of the file being previewed and analyzed do not go back to disk.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Default, overridden by [Database] record_cache_size (0 disables the cache)
+DEFAULT_MAX_SIZE = 512
+
+class RecordCache:
+    """Thread-safe LRU map of file_id -> column values"""
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, file_id: int) -> Optional[Dict]:
+        """Get a copy of the cached row, or None"""
+        with self._lock:
+            row = self._rows.get(file_id)
+            if row is None:
+                self.misses += 1
+                return None
+            self._rows.move_to_end(file_id)
+            self.hits += 1
+            return dict(row)
+
+    def peek(self, file_id: int) -> Optional[Dict]:
+        """Get a copy of the cached row without counting a lookup or refreshing it"""
+        with self._lock:
+            row = self._rows.get(file_id)
+            return dict(row) if row is not None else None
+
+    def put(self, file_id: int, row: Dict):
+        """Cache a complete row (all evidence_files and detail columns)"""
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._rows[file_id] = dict(row)
+            self._rows.move_to_end(file_id)
+            while len(self._rows) > self.max_size:
+                self._rows.popitem(last=False)
+                self.evictions += 1
+
+    def update(self, file_id: int, values: Dict):
+        """Write changed column values through to a cached row (if cached)"""
+        with self._lock:
+            row = self._rows.get(file_id)
+            if row is not None:
+                row.update(values)
+
+    def update_many(self, file_ids, values: Dict):
+        """Write the same values through to every cached row in file_ids"""
+        with self._lock:
+            if len(file_ids) > len(self._rows):
+                wanted = set(file_ids)
+                targets = [row for file_id, row in self._rows.items() if file_id in wanted]
+            else:
+                targets = [self._rows[file_id] for file_id in file_ids if file_id in self._rows]
+            for row in targets:
+                row.update(values)
+
+    def invalidate(self, file_id: int):
+        """Drop a cached row"""
+        with self._lock:
+            if self._rows.pop(file_id, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_case(self, case_id: int):
+        """Drop all cached rows of a case"""
+        with self._lock:
+            stale = [file_id for file_id in self._rows if file_id >> 32 == case_id]
+            for file_id in stale:
+                del self._rows[file_id]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        """Drop all cached rows"""
+        with self._lock:
+            self.invalidations += len(self._rows)
+            self._rows.clear()
+
+    def stats(self) -> Dict:
+        """Get size, hits, misses, hit_rate, evictions and invalidations"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._rows),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+
+_record_cache = None
+_record_cache_lock = threading.Lock()
+
+def get_record_cache() -> RecordCache:
+    """Get global record cache (sized by [Database] record_cache_size)"""
+    global _record_cache
+
+    with _record_cache_lock:
+        if _record_cache is None:
+            max_size = DEFAULT_MAX_SIZE
+            try:
+                from ..utils.config_loader import get_config
+                max_size = get_config().get_int('Database', 'record_cache_size', max_size)
+            except FileNotFoundError:
+                pass
+            _record_cache = RecordCache(max_size)
+
+    return _record_cache
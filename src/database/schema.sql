@@ -1,32 +1,30 @@
--- Forenstiq Evidence Analyzer Database Schema
--- SQLite Database
-
--- Cases table
-CREATE TABLE IF NOT EXISTS cases (
-    case_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    case_number TEXT UNIQUE NOT NULL,
-    case_name TEXT NOT NULL,
-    investigator_name TEXT,
-    agency_name TEXT,
-    incident_date DATE,
-    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    last_modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    status TEXT DEFAULT 'open',
-    notes TEXT,
-    evidence_source_path TEXT,
-    total_files INTEGER DEFAULT 0,
-    total_flagged INTEGER DEFAULT 0
-);
+-- Forenstiq Evidence Analyzer Case Database Schema
+-- SQLite Database (one file per case, see catalog_schema.sql for the case list)
 
--- Evidence files table
+-- Evidence files table (hot columns: read by list views, filters and stats)
 CREATE TABLE IF NOT EXISTS evidence_files (
     file_id INTEGER PRIMARY KEY AUTOINCREMENT,
     case_id INTEGER NOT NULL,
-    file_path TEXT NOT NULL,
-    file_relative_path TEXT,
     file_name TEXT NOT NULL,
     file_type TEXT NOT NULL,
     file_size INTEGER,
+    date_taken TIMESTAMP,
+    
+    -- Analysis state
+    ai_processed BOOLEAN DEFAULT 0,
+    face_count INTEGER DEFAULT 0,
+    has_text BOOLEAN DEFAULT 0,
+    is_flagged BOOLEAN DEFAULT 0,
+    
+    imported_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Evidence file details (cold columns, one row per evidence_files row;
+-- FileRepository reads and writes both tables)
+CREATE TABLE IF NOT EXISTS evidence_file_details (
+    file_id INTEGER PRIMARY KEY,
+    file_path TEXT NOT NULL,
+    file_relative_path TEXT,
     file_hash TEXT,
     source_archive TEXT,
 
@@ -34,7 +32,6 @@ CREATE TABLE IF NOT EXISTS evidence_files (
     date_created TIMESTAMP,
     date_modified TIMESTAMP,
     date_accessed TIMESTAMP,
-    date_taken TIMESTAMP,
     
     -- Geolocation
     gps_latitude REAL,
@@ -46,21 +43,15 @@ CREATE TABLE IF NOT EXISTS evidence_files (
     camera_make TEXT,
     camera_model TEXT,
     
-    -- Analysis results
-    ai_processed BOOLEAN DEFAULT 0,
+    -- Analysis results (ocr_text / analyst_notes may be compressed, see compression.py)
     ai_tags TEXT,
     ai_confidence REAL,
     ocr_text TEXT,
-    face_count INTEGER DEFAULT 0,
-    is_flagged BOOLEAN DEFAULT 0,
     flag_reason TEXT,
     analyst_notes TEXT,
-    
-    -- Timestamps
-    imported_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     analyzed_date TIMESTAMP,
     
-    FOREIGN KEY (case_id) REFERENCES cases(case_id) ON DELETE CASCADE
+    FOREIGN KEY (file_id) REFERENCES evidence_files(file_id) ON DELETE CASCADE
 );
 
 -- Face detections table
@@ -74,8 +65,7 @@ CREATE TABLE IF NOT EXISTS face_detections (
     face_cluster_id INTEGER,
     identified_person TEXT,
     
-    FOREIGN KEY (file_id) REFERENCES evidence_files(file_id) ON DELETE CASCADE,
-    FOREIGN KEY (case_id) REFERENCES cases(case_id) ON DELETE CASCADE
+    FOREIGN KEY (file_id) REFERENCES evidence_files(file_id) ON DELETE CASCADE
 );
 
 -- Object detections table
@@ -87,20 +77,7 @@ CREATE TABLE IF NOT EXISTS object_detections (
     confidence REAL,
     bounding_box TEXT,
     
-    FOREIGN KEY (file_id) REFERENCES evidence_files(file_id) ON DELETE CASCADE,
-    FOREIGN KEY (case_id) REFERENCES cases(case_id) ON DELETE CASCADE
-);
-
--- Audit log table
-CREATE TABLE IF NOT EXISTS audit_log (
-    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    case_id INTEGER,
-    user_name TEXT,
-    action TEXT NOT NULL,
-    details TEXT,
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    
-    FOREIGN KEY (case_id) REFERENCES cases(case_id) ON DELETE SET NULL
+    FOREIGN KEY (file_id) REFERENCES evidence_files(file_id) ON DELETE CASCADE
 );
 
 -- Tags table
@@ -111,22 +88,46 @@ CREATE TABLE IF NOT EXISTS tags (
     created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- File-Tag mapping
+-- File-Tag mapping; source is who attached the tag ('ai' links are
+-- replaced on re-analysis, analyst links are kept)
 CREATE TABLE IF NOT EXISTS file_tags (
     file_id INTEGER NOT NULL,
     tag_id INTEGER NOT NULL,
+    source TEXT NOT NULL DEFAULT 'analyst',
     PRIMARY KEY (file_id, tag_id),
     FOREIGN KEY (file_id) REFERENCES evidence_files(file_id) ON DELETE CASCADE,
     FOREIGN KEY (tag_id) REFERENCES tags(tag_id) ON DELETE CASCADE
 );
 
--- System settings
-CREATE TABLE IF NOT EXISTS settings (
-    setting_key TEXT PRIMARY KEY,
-    setting_value TEXT,
-    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+-- Case statistics (maintained incrementally by the triggers below;
+-- rebuild with CaseRepository.rebuild_case_statistics if they drift)
+CREATE TABLE IF NOT EXISTS case_stats (
+    case_id INTEGER PRIMARY KEY,
+    total_files INTEGER DEFAULT 0,
+    processed_files INTEGER DEFAULT 0,
+    flagged_files INTEGER DEFAULT 0,
+    files_with_faces INTEGER DEFAULT 0,
+    total_faces INTEGER DEFAULT 0,
+    files_with_text INTEGER DEFAULT 0,
+    unique_dates INTEGER DEFAULT 0
+);
+
+-- Per file type totals
+CREATE TABLE IF NOT EXISTS case_type_stats (
+    case_id INTEGER NOT NULL,
+    file_type TEXT NOT NULL,
+    file_count INTEGER DEFAULT 0,
+    PRIMARY KEY (case_id, file_type)
 );
 
+-- Files per distinct date_taken (backs case_stats.unique_dates)
+CREATE TABLE IF NOT EXISTS case_date_stats (
+    case_id INTEGER NOT NULL,
+    date_taken TIMESTAMP NOT NULL,
+    file_count INTEGER DEFAULT 0,
+    PRIMARY KEY (case_id, date_taken)
+) WITHOUT ROWID;
+
 -- Create indexes
 CREATE INDEX IF NOT EXISTS idx_evidence_case ON evidence_files(case_id);
 CREATE INDEX IF NOT EXISTS idx_evidence_date ON evidence_files(date_taken);
@@ -134,5 +135,126 @@ CREATE INDEX IF NOT EXISTS idx_evidence_flagged ON evidence_files(is_flagged);
 CREATE INDEX IF NOT EXISTS idx_face_file ON face_detections(file_id);
 CREATE INDEX IF NOT EXISTS idx_face_cluster ON face_detections(face_cluster_id);
 CREATE INDEX IF NOT EXISTS idx_object_file ON object_detections(file_id);
-CREATE INDEX IF NOT EXISTS idx_audit_case ON audit_log(case_id);
-CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log(timestamp);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_object_class ON object_detections(case_id, object_class, confidence);
+CREATE INDEX IF NOT EXISTS idx_file_tags_tag ON file_tags(tag_id, file_id);
+
+-- Case statistics triggers
+CREATE TRIGGER IF NOT EXISTS trg_case_stats_insert
+AFTER INSERT ON evidence_files
+BEGIN
+    INSERT OR IGNORE INTO case_stats (case_id) VALUES (NEW.case_id);
+    UPDATE case_stats SET
+        total_files = total_files + 1,
+        processed_files = processed_files + (IFNULL(NEW.ai_processed, 0) = 1),
+        flagged_files = flagged_files + (IFNULL(NEW.is_flagged, 0) = 1),
+        files_with_faces = files_with_faces + (IFNULL(NEW.face_count, 0) > 0),
+        total_faces = total_faces + IFNULL(NEW.face_count, 0),
+        files_with_text = files_with_text + (IFNULL(NEW.has_text, 0) = 1)
+    WHERE case_id = NEW.case_id;
+    INSERT INTO case_type_stats (case_id, file_type, file_count)
+    VALUES (NEW.case_id, NEW.file_type, 1)
+    ON CONFLICT (case_id, file_type) DO UPDATE SET file_count = file_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_case_stats_delete
+AFTER DELETE ON evidence_files
+BEGIN
+    UPDATE case_stats SET
+        total_files = total_files - 1,
+        processed_files = processed_files - (IFNULL(OLD.ai_processed, 0) = 1),
+        flagged_files = flagged_files - (IFNULL(OLD.is_flagged, 0) = 1),
+        files_with_faces = files_with_faces - (IFNULL(OLD.face_count, 0) > 0),
+        total_faces = total_faces - IFNULL(OLD.face_count, 0),
+        files_with_text = files_with_text - (IFNULL(OLD.has_text, 0) = 1)
+    WHERE case_id = OLD.case_id;
+    UPDATE case_type_stats SET file_count = file_count - 1
+    WHERE case_id = OLD.case_id AND file_type = OLD.file_type;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_case_stats_update
+AFTER UPDATE OF ai_processed, is_flagged, face_count, has_text ON evidence_files
+BEGIN
+    UPDATE case_stats SET
+        processed_files = processed_files
+            + (IFNULL(NEW.ai_processed, 0) = 1) - (IFNULL(OLD.ai_processed, 0) = 1),
+        flagged_files = flagged_files
+            + (IFNULL(NEW.is_flagged, 0) = 1) - (IFNULL(OLD.is_flagged, 0) = 1),
+        files_with_faces = files_with_faces
+            + (IFNULL(NEW.face_count, 0) > 0) - (IFNULL(OLD.face_count, 0) > 0),
+        total_faces = total_faces + IFNULL(NEW.face_count, 0) - IFNULL(OLD.face_count, 0),
+        files_with_text = files_with_text
+            + (IFNULL(NEW.has_text, 0) = 1) - (IFNULL(OLD.has_text, 0) = 1)
+    WHERE case_id = NEW.case_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_case_stats_update_type
+AFTER UPDATE OF file_type ON evidence_files
+WHEN OLD.file_type IS NOT NEW.file_type
+BEGIN
+    UPDATE case_type_stats SET file_count = file_count - 1
+    WHERE case_id = OLD.case_id AND file_type = OLD.file_type;
+    INSERT INTO case_type_stats (case_id, file_type, file_count)
+    VALUES (NEW.case_id, NEW.file_type, 1)
+    ON CONFLICT (case_id, file_type) DO UPDATE SET file_count = file_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_case_dates_insert
+AFTER INSERT ON evidence_files
+WHEN NEW.date_taken IS NOT NULL
+BEGIN
+    INSERT OR IGNORE INTO case_stats (case_id) VALUES (NEW.case_id);
+    INSERT INTO case_date_stats (case_id, date_taken, file_count)
+    VALUES (NEW.case_id, NEW.date_taken, 1)
+    ON CONFLICT (case_id, date_taken) DO UPDATE SET file_count = file_count + 1;
+    UPDATE case_stats SET unique_dates = unique_dates + 1
+    WHERE case_id = NEW.case_id AND (
+        SELECT file_count FROM case_date_stats
+        WHERE case_id = NEW.case_id AND date_taken = NEW.date_taken
+    ) = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_case_dates_delete
+AFTER DELETE ON evidence_files
+WHEN OLD.date_taken IS NOT NULL
+BEGIN
+    UPDATE case_date_stats SET file_count = file_count - 1
+    WHERE case_id = OLD.case_id AND date_taken = OLD.date_taken;
+    UPDATE case_stats SET unique_dates = unique_dates - 1
+    WHERE case_id = OLD.case_id AND (
+        SELECT file_count FROM case_date_stats
+        WHERE case_id = OLD.case_id AND date_taken = OLD.date_taken
+    ) = 0;
+    DELETE FROM case_date_stats
+    WHERE case_id = OLD.case_id AND date_taken = OLD.date_taken AND file_count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_case_dates_update
+AFTER UPDATE OF date_taken ON evidence_files
+WHEN OLD.date_taken IS NOT NEW.date_taken
+BEGIN
+    UPDATE case_date_stats SET file_count = file_count - 1
+    WHERE case_id = OLD.case_id AND date_taken = OLD.date_taken;
+    UPDATE case_stats SET unique_dates = unique_dates - 1
+    WHERE case_id = OLD.case_id AND OLD.date_taken IS NOT NULL AND (
+        SELECT file_count FROM case_date_stats
+        WHERE case_id = OLD.case_id AND date_taken = OLD.date_taken
+    ) = 0;
+    DELETE FROM case_date_stats
+    WHERE case_id = OLD.case_id AND date_taken = OLD.date_taken AND file_count <= 0;
+    INSERT INTO case_date_stats (case_id, date_taken, file_count)
+    SELECT NEW.case_id, NEW.date_taken, 1 WHERE NEW.date_taken IS NOT NULL
+    ON CONFLICT (case_id, date_taken) DO UPDATE SET file_count = file_count + 1;
+    UPDATE case_stats SET unique_dates = unique_dates + 1
+    WHERE case_id = NEW.case_id AND NEW.date_taken IS NOT NULL AND (
+        SELECT file_count FROM case_date_stats
+        WHERE case_id = NEW.case_id AND date_taken = NEW.date_taken
+    ) = 1;
+END;
+
+-- Full-text index over OCR text and analyst notes. Contentless (the text is
+-- stored, possibly compressed, in evidence_file_details); rowid = file_id.
+-- FileRepository.set_text keeps it in sync with the plain text; there are no
+-- triggers, so any sqlite3 connection can write these tables.
+CREATE VIRTUAL TABLE IF NOT EXISTS evidence_text_fts USING fts5(
+    ocr_text, analyst_notes, content=''
+);
@@ -0,0 +1,140 @@
+"""
+Tag data access layer (normalized tags / file_tags tables)
+"""
+import sqlite3
+from typing import List, Dict, Iterable
+from .db_manager import get_case_db, get_db_for_id
+
+class TagRepository:
+    """Repository for normalized file tags and tag facets (per-case databases)"""
+
+    @staticmethod
+    def replace_file_tags(conn: sqlite3.Connection, file_id: int,
+                          tags: Iterable[str], category: str = 'ai'):
+        """
+        Replace the tags one source attached to a file inside an open transaction
+
+        Links are keyed by their source, not the tag's category, so an AI tag
+        named like an analyst tag never takes over the analyst's link.
+
+        Args:
+            conn: Connection with an open transaction
+            file_id: File to tag
+            tags: Tag names (duplicates and blanks are ignored)
+            category: Source of the tags (and category of new tags); only
+                      links from this source are replaced
+        """
+        names = sorted({str(tag).strip() for tag in tags if tag and str(tag).strip()})
+
+        conn.execute('DELETE FROM file_tags WHERE file_id = ? AND source = ?', (file_id, category))
+
+        if not names:
+            return
+
+        conn.executemany(
+            'INSERT OR IGNORE INTO tags (tag_name, tag_category) VALUES (?, ?)',
+            [(name, category) for name in names]
+        )
+
+        # A link the analyst made already stays theirs
+        placeholders = ', '.join('?' for _ in names)
+        conn.execute(f'''
+            INSERT OR IGNORE INTO file_tags (file_id, tag_id, source)
+            SELECT ?, tag_id, ? FROM tags WHERE tag_name IN ({placeholders})
+        ''', (file_id, category, *names))
+
+    @staticmethod
+    def add_tag_to_files(conn: sqlite3.Connection, tag_name: str,
+                         file_id_query: str, category: str = 'analyst'):
+        """
+        Attach one tag to a set of files inside an open transaction
+
+        Args:
+            conn: Connection with an open transaction
+            tag_name: Tag to add (existing tags on the files are kept)
+            file_id_query: SELECT returning the file_ids to tag
+            category: Source of the links (and category if the tag does not
+                      exist yet); an existing AI link becomes this source's
+        """
+        tag_name = str(tag_name).strip()
+        if not tag_name:
+            raise ValueError("Tag name is empty")
+
+        conn.execute(
+            'INSERT OR IGNORE INTO tags (tag_name, tag_category) VALUES (?, ?)',
+            (tag_name, category)
+        )
+        conn.execute(f'''
+            INSERT INTO file_tags (file_id, tag_id, source)
+            SELECT ids.file_id, t.tag_id, ?
+            FROM ({file_id_query}) ids, tags t
+            WHERE t.tag_name = ?
+            ON CONFLICT (file_id, tag_id) DO UPDATE SET source = excluded.source
+        ''', (category, tag_name))
+
+    def set_file_tags(self, file_id: int, tags: Iterable[str], category: str = 'ai'):
+        """Replace the tags of one category on a file"""
+        with get_db_for_id(file_id).transaction() as conn:
+            self.replace_file_tags(conn, file_id, tags, category)
+
+    def get_file_tags(self, file_id: int) -> List[str]:
+        """Get tag names attached to a file"""
+        query = '''
+            SELECT t.tag_name FROM file_tags ft
+            JOIN tags t ON t.tag_id = ft.tag_id
+            WHERE ft.file_id = ?
+            ORDER BY t.tag_name
+        '''
+        results = get_db_for_id(file_id).execute_query(query, (file_id,))
+        return [row['tag_name'] for row in results]
+
+    def get_tag_counts(self, case_id: int, flagged_only: bool = False,
+                       limit: int = None) -> List[Dict]:
+        """
+        Get tag facet counts for a case
+
+        Returns:
+            List of {'tag_name', 'tag_category', 'file_count'} ordered by count
+        """
+        query = '''
+            SELECT t.tag_name, t.tag_category, COUNT(*) AS file_count
+            FROM evidence_files ef
+            JOIN file_tags ft ON ft.file_id = ef.file_id
+            JOIN tags t ON t.tag_id = ft.tag_id
+            WHERE ef.case_id = ?
+        '''
+        params = [case_id]
+
+        if flagged_only:
+            query += ' AND ef.is_flagged = 1'
+
+        query += ' GROUP BY ft.tag_id ORDER BY file_count DESC, t.tag_name'
+
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+
+        results = get_case_db(case_id).execute_query(query, tuple(params))
+        return [dict(row) for row in results]
+
+    def get_file_ids_by_tag(self, case_id: int, tag_name: str) -> List[int]:
+        """Get IDs of files in a case carrying an exact tag"""
+        query = '''
+            SELECT ft.file_id FROM tags t
+            JOIN file_tags ft ON ft.tag_id = t.tag_id
+            JOIN evidence_files ef ON ef.file_id = ft.file_id
+            WHERE t.tag_name = ? AND ef.case_id = ?
+        '''
+        results = get_case_db(case_id).execute_query(query, (tag_name, case_id))
+        return [row['file_id'] for row in results]
+
+    def get_file_ids_matching(self, case_id: int, text: str) -> List[int]:
+        """Get IDs of files in a case carrying any tag containing text"""
+        query = '''
+            SELECT DISTINCT ft.file_id FROM tags t
+            JOIN file_tags ft ON ft.tag_id = t.tag_id
+            JOIN evidence_files ef ON ef.file_id = ft.file_id
+            WHERE t.tag_name LIKE ? AND ef.case_id = ?
+        '''
+        results = get_case_db(case_id).execute_query(query, (f'%{text}%', case_id))
+        return [row['file_id'] for row in results]
@@ -3,6 +3,7 @@ Forenstiq AI Technologies - Multi-Device Forensic Analysis Platform
 Main Application Entry Point
 """
 import sys
+import multiprocessing
 from pathlib import Path
 from PyQt5.QtWidgets import QApplication, QMessageBox
 from PyQt5.QtGui import QIcon
@@ -20,6 +21,8 @@ from src.ui.styles import get_application_stylesheet
 from src.utils.logger import ForenstiqLogger
 from src.core.ai_service import AIService
 from src.utils.config_loader import get_config
+from src.database.backup_manager import start_backup_scheduler
+from src.database.maintenance import start_maintenance_scheduler
 
 
 class ForenstiqApplication:
@@ -31,6 +34,7 @@ class ForenstiqApplication:
         self.splash = None
         self.dashboard = None
         self.active_module = None
+        self._warm_up_started = False
 
     def start(self):
         """Start the application with splash screen"""
@@ -45,6 +49,15 @@ class ForenstiqApplication:
         self.dashboard.device_selected.connect(self.launch_module)
         self.dashboard.show()
 
+        # Load models in the background once the UI is up ([AI] warm_up_models).
+        # With worker processes (max_workers > 1) the models load there
+        # instead, so loading them here would only take memory
+        config = get_config()
+        if (not self._warm_up_started and config.get_bool('AI', 'warm_up_models', True)
+                and config.get_int('AI', 'max_workers', 4) <= 1):
+            self._warm_up_started = True
+            self.ai_service.warm_up()
+
     def launch_module(self, device_type):
         """Launch the selected device module - ALL modules fully functional"""
         logger = ForenstiqLogger.get_logger()
@@ -126,6 +139,9 @@ def setup_application():
 def main():
     """Main application entry point"""
 
+    # Analysis worker processes re-enter a frozen executable
+    multiprocessing.freeze_support()
+
     # High DPI support - MUST be set before creating QApplication
     QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
     QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
@@ -147,20 +163,38 @@ def main():
     app.setStyleSheet(get_application_stylesheet())
 
     # Initialize the AI Service Singleton at startup
-    # This will load all AI models once
+    # Models load on first use (or warm up once the dashboard is shown)
     logger = ForenstiqLogger.get_logger()
-    logger.info("Pre-loading AI models...")
     ai_service = AIService()
-    logger.info("AI models loaded and ready.")
+    ai_service.start_idle_unload()
 
     # Create and start application with the AI service
     forenstiq_app = ForenstiqApplication(app, ai_service)
     forenstiq_app.start()
 
+    # Scheduled online backups ([Database] backup_enabled)
+    try:
+        backup_scheduler = start_backup_scheduler()
+    except Exception as e:
+        logger.error(f"Could not start backup scheduler: {e}")
+        backup_scheduler = None
+
+    # ANALYZE / optimize / WAL checkpoint while idle ([Database] maintenance_enabled)
+    try:
+        maintenance_scheduler = start_maintenance_scheduler()
+    except Exception as e:
+        logger.error(f"Could not start maintenance scheduler: {e}")
+        maintenance_scheduler = None
+
     # Start event loop
     exit_code = app.exec_()
     
     # Cleanup
+    ai_service.stop()
+    if backup_scheduler:
+        backup_scheduler.stop()
+    if maintenance_scheduler:
+        maintenance_scheduler.stop()
     logger = ForenstiqLogger.get_logger()
     logger.info("Application shutdown")
     
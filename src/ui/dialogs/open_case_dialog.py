@@ -4,19 +4,23 @@ Open Case Dialog - Select and open an existing case
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
     QTableWidget, QTableWidgetItem, QLabel, QLineEdit,
-    QMessageBox, QHeaderView
+    QMessageBox, QHeaderView, QProgressDialog
 )
 from PyQt5.QtCore import Qt
 from ...database.case_repository import CaseRepository
+from ..workers.case_deletion_worker import CaseDeletionWorker
 
 class OpenCaseDialog(QDialog):
     """Dialog for opening existing cases"""
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, open_case_id=None):
         super().__init__(parent)
         
         self.case_repo = CaseRepository()
         self.selected_case_id = None
+        self.open_case_id = open_case_id  # Case loaded in the main window
+        self.deletion_worker = None
+        self.deletion_progress = None
         
         self.init_ui()
         self.load_cases()
@@ -80,6 +84,12 @@ class OpenCaseDialog(QDialog):
         
         # Buttons
         button_layout = QHBoxLayout()
+        
+        self.delete_button = QPushButton("Delete Case")
+        self.delete_button.setEnabled(False)
+        self.delete_button.clicked.connect(self.delete_selected_case)
+        button_layout.addWidget(self.delete_button)
+        
         button_layout.addStretch()
         
         cancel_button = QPushButton("Cancel")
@@ -154,6 +164,8 @@ class OpenCaseDialog(QDialog):
                 status_item.setForeground(Qt.darkGreen)
             elif status == 'CLOSED':
                 status_item.setForeground(Qt.darkRed)
+            elif status == 'DELETING':
+                status_item.setForeground(Qt.gray)
             self.table.setItem(row, 4, status_item)
             
             # Files count
@@ -181,7 +193,25 @@ class OpenCaseDialog(QDialog):
     
     def on_selection_changed(self):
         """Handle table selection change"""
-        self.open_button.setEnabled(len(self.table.selectedItems()) > 0)
+        case = self._selected_case()
+        deleting = bool(case) and case.get('status') == 'deleting'
+        
+        self.open_button.setEnabled(case is not None and not deleting)
+        self.delete_button.setEnabled(
+            case is not None and case['case_id'] != self.open_case_id
+        )
+    
+    def _selected_case(self):
+        """Get the case dict of the selected row"""
+        selected = self.table.selectedItems()
+        if not selected:
+            return None
+        
+        case_id = self.table.item(selected[0].row(), 0).data(Qt.UserRole)
+        for case in self.all_cases:
+            if case['case_id'] == case_id:
+                return case
+        return None
     
     def on_double_click(self):
         """Handle double-click on table row"""
@@ -189,12 +219,84 @@ class OpenCaseDialog(QDialog):
     
     def open_selected_case(self):
         """Open the selected case"""
+        case = self._selected_case()
+        if case and case.get('status') == 'deleting':
+            return
+        
         selected = self.table.selectedItems()
         if selected:
             row = selected[0].row()
             self.selected_case_id = self.table.item(row, 0).data(Qt.UserRole)
             self.accept()
     
+    def delete_selected_case(self):
+        """Delete the selected case in a background worker"""
+        case = self._selected_case()
+        if not case or case['case_id'] == self.open_case_id:
+            return
+        
+        reply = QMessageBox.question(
+            self,
+            "Delete Case",
+            f"Permanently delete case '{case.get('case_name', '')}' and all of its "
+            f"evidence records ({case.get('total_files', 0)} files)?\n\n"
+            "This cannot be undone.",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        
+        if reply != QMessageBox.Yes:
+            return
+        
+        self.deletion_progress = QProgressDialog(
+            f"Deleting case {case.get('case_number', '')}...", None, 0, 0, self
+        )
+        self.deletion_progress.setWindowTitle("Deleting Case")
+        self.deletion_progress.setWindowModality(Qt.WindowModal)
+        self.deletion_progress.setMinimumDuration(0)
+        self.deletion_progress.show()
+        
+        self.table.setEnabled(False)
+        self.open_button.setEnabled(False)
+        self.delete_button.setEnabled(False)
+        
+        self.deletion_worker = CaseDeletionWorker(case['case_id'])
+        self.deletion_worker.finished.connect(self.on_deletion_finished)
+        self.deletion_worker.error.connect(self.on_deletion_error)
+        self.deletion_worker.start()
+    
+    def on_deletion_finished(self, deleted):
+        """Handle deletion completion"""
+        self._end_deletion()
+        self.info_label.setText("Case deleted" if deleted else "Case not found")
+    
+    def on_deletion_error(self, error_msg):
+        """Handle deletion error (the case stays marked 'deleting')"""
+        self._end_deletion()
+        QMessageBox.critical(
+            self,
+            "Error",
+            f"Failed to delete case: {error_msg}\n\nRun Delete Case again to resume."
+        )
+    
+    def _end_deletion(self):
+        """Close progress and reload the case list"""
+        if self.deletion_progress:
+            self.deletion_progress.close()
+            self.deletion_progress = None
+        self.deletion_worker = None
+        
+        self.table.setEnabled(True)
+        self.load_cases()
+        self.filter_cases(self.search_edit.text())
+        self.on_selection_changed()
+    
+    def reject(self):
+        """Don't close while a deletion is running"""
+        if self.deletion_worker and self.deletion_worker.isRunning():
+            return
+        super().reject()
+    
     def get_selected_case_id(self):
         """Get the selected case ID"""
         return self.selected_case_id
\ No newline at end of file
@@ -91,6 +91,7 @@ class EvidenceAnalyzerWindow(QMainWindow):
         # Middle panel - File list
         self.file_list_widget = FileListWidget()
         self.file_list_widget.file_selected.connect(self.on_file_selected)
+        self.file_list_widget.triage_requested.connect(self.on_triage_requested)
         splitter.addWidget(self.file_list_widget)
         
         # Right panel - Preview
@@ -290,7 +291,7 @@ class EvidenceAnalyzerWindow(QMainWindow):
     
     def open_case(self):
         """Open existing case"""
-        dialog = OpenCaseDialog(self)
+        dialog = OpenCaseDialog(self, open_case_id=self.current_case_id)
         
         if dialog.exec_():
             case_id = dialog.get_selected_case_id()
@@ -334,6 +335,9 @@ class EvidenceAnalyzerWindow(QMainWindow):
             )
             
             if reply == QMessageBox.Yes:
+                # Persist buffered audit events before unloading the case
+                self.case_manager.audit_repo.flush()
+
                 self.current_case = None
                 self.current_case_id = None
                 
@@ -498,6 +502,7 @@ class EvidenceAnalyzerWindow(QMainWindow):
             f"Faces detected: {stats['faces_found']}\n"
             f"Files with text: {stats['text_found']}\n"
             f"Objects found: {stats['objects_found']}\n"
+            f"Reused from earlier analyses: {stats.get('cache_hits', 0)}\n"
             f"Errors: {stats['errors']}"
         )
         
@@ -655,7 +660,7 @@ class EvidenceAnalyzerWindow(QMainWindow):
             # Get all image files from current case
             from ..database.file_repository import FileRepository
             file_repo = FileRepository()
-            all_files = file_repo.get_files_by_case(self.current_case_id)
+            all_files = file_repo.get_files_by_case(self.current_case_id, with_details=True)
 
             # Filter only images
             image_files = [f for f in all_files if f['file_type'] == 'image']
@@ -670,12 +675,28 @@ class EvidenceAnalyzerWindow(QMainWindow):
 
             self.logger.info(f"Found {len(image_files)} images to check")
 
+            # Faces stored during analysis are matched in one vectorized query
+            matches = {m['file_id']: m for m in self.face_matcher.match_case(self.current_case_id)}
+            matched_files = []
+            for file_data in image_files:
+                match = matches.get(file_data['file_id'])
+                if match:
+                    file_data['match_confidence'] = match['confidence']
+                    file_data['match_count'] = match['match_count']
+                    matched_files.append(file_data)
+
+            # Images without stored faces (not analyzed yet, or analyzed before
+            # faces were stored) are checked one by one
+            unstored = self.face_matcher.unmatched_file_ids(self.current_case_id)
+            unanalyzed = [f for f in image_files
+                          if not f['ai_processed'] or f['file_id'] in unstored]
+
             # Create progress dialog
             progress = QProgressDialog(
                 "Searching for suspect in photos...",
                 "Cancel",
                 0,
-                len(image_files),
+                len(unanalyzed),
                 self
             )
             progress.setWindowModality(Qt.WindowModal)
@@ -683,8 +704,7 @@ class EvidenceAnalyzerWindow(QMainWindow):
             progress.show()
 
             # Perform face matching
-            matched_files = []
-            for idx, file_data in enumerate(image_files):
+            for idx, file_data in enumerate(unanalyzed):
                 if progress.wasCanceled():
                     break
 
@@ -757,6 +777,26 @@ class EvidenceAnalyzerWindow(QMainWindow):
             # File already analyzed - show cached results
             self.preview_widget.load_file(file_data)
 
+    def on_triage_requested(self, action: str, file_ids: list, value: str):
+        """Apply a bulk triage action to the files selected in the list"""
+        if not self.current_case_id:
+            return
+
+        try:
+            count = self.case_manager.triage_files(
+                self.current_case_id, action, file_ids=file_ids, value=value
+            )
+        except Exception as e:
+            self.logger.error(f"Bulk {action} failed: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to update files:\n\n{str(e)}")
+            return
+
+        self.status_bar.showMessage(f"{action.capitalize()}: {count} file(s) updated")
+
+        # Refresh UI
+        self.file_list_widget.load_case_files(self.current_case_id)
+        self.case_info_widget.refresh_case_info(self.current_case_id)
+
     def start_single_file_analysis(self, file_data: dict):
         """Start on-demand analysis for a single file"""
         file_id = file_data['file_id']
@@ -863,7 +903,7 @@ class EvidenceAnalyzerWindow(QMainWindow):
                 # Load suspect photo for face matching
                 from ..ai.face_matcher import FaceMatcher
                 face_matcher = FaceMatcher()
-                face_matcher.load_suspect_face(Path(search_params['suspect_photo']))
+                face_matcher.load_suspect_photo(Path(search_params['suspect_photo']))
 
                 results = search_engine.search_with_face_match(
                     self.current_case_id,
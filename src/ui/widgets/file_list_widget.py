@@ -3,15 +3,17 @@ File List Widget - Display evidence files categorized by type
 """
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QTreeWidget, QTreeWidgetItem,
-    QLineEdit, QPushButton, QLabel, QHeaderView, QComboBox
+    QLineEdit, QPushButton, QLabel, QHeaderView, QComboBox, QMenu, QInputDialog
 )
 from PyQt5.QtCore import Qt, pyqtSignal
 from ...database.file_repository import FileRepository
+from ...database.tag_repository import TagRepository
 
 class FileListWidget(QWidget):
     """Widget displaying list of evidence files grouped by category"""
 
-    file_selected = pyqtSignal(dict)
+    file_selected = pyqtSignal(object)  # FileRecord
+    triage_requested = pyqtSignal(str, list, str)  # action, file_ids, value
 
     # Category definitions - Comprehensive Forensic Evidence Types (Police Seizure Priority)
     # Updated based on 2024-2025 digital forensics research - 27 categories
@@ -70,6 +72,7 @@ class FileListWidget(QWidget):
         super().__init__(parent)
 
         self.file_repo = FileRepository()
+        self.tag_repo = TagRepository()
         self.current_case_id = None
         self.all_files = []
         self.matched_files = []  # For suspect matches
@@ -168,6 +171,13 @@ class FileListWidget(QWidget):
         self.filter_combo.currentTextChanged.connect(self.apply_filter)
         toolbar_layout.addWidget(self.filter_combo)
 
+        # Tag facet combo (counts come from a GROUP BY over file_tags)
+        self.tag_combo = QComboBox()
+        self.tag_combo.addItem("All Tags", None)
+        self.tag_combo.setStyleSheet(self.filter_combo.styleSheet())
+        self.tag_combo.currentIndexChanged.connect(self.apply_filter)
+        toolbar_layout.addWidget(self.tag_combo)
+
         layout.addWidget(toolbar)
 
         # Search bar
@@ -243,7 +253,7 @@ class FileListWidget(QWidget):
             }
         """)
 
-        self.tree.setSelectionMode(QTreeWidget.SingleSelection)
+        self.tree.setSelectionMode(QTreeWidget.ExtendedSelection)
         self.tree.setAlternatingRowColors(False)
         self.tree.setEditTriggers(QTreeWidget.NoEditTriggers)
         self.tree.setRootIsDecorated(True)
@@ -260,6 +270,10 @@ class FileListWidget(QWidget):
         # Selection handling
         self.tree.itemSelectionChanged.connect(self.on_selection_changed)
 
+        # Bulk triage of the selected files
+        self.tree.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.tree.customContextMenuRequested.connect(self.show_triage_menu)
+
         layout.addWidget(self.tree)
 
         # Status bar
@@ -293,10 +307,22 @@ class FileListWidget(QWidget):
         try:
             files = self.file_repo.get_files_by_case(case_id)
             self.all_files = files
+            self.load_tag_facets(case_id)
             self.display_files(files)
         except Exception as e:
             print(f"Error loading files: {e}")
 
+    def load_tag_facets(self, case_id):
+        """Populate tag combo with per-tag file counts for the case"""
+        self.tag_combo.blockSignals(True)
+        self.tag_combo.clear()
+        self.tag_combo.addItem("All Tags", None)
+
+        for facet in self.tag_repo.get_tag_counts(case_id):
+            self.tag_combo.addItem(f"{facet['tag_name']} ({facet['file_count']})", facet['tag_name'])
+
+        self.tag_combo.blockSignals(False)
+
     def toggle_view_mode(self):
         """Toggle between grouped and flat view"""
         self.display_files(self.all_files)
@@ -380,7 +406,7 @@ class FileListWidget(QWidget):
             filename = f"⚠️ {filename}"
 
         file_item.setText(0, filename)
-        file_item.setData(0, Qt.UserRole, file_data)  # Store full data
+        file_item.setData(0, Qt.UserRole, file_data)  # Store record (large columns load on demand)
 
         # Date taken
         date_taken = file_data.get('date_taken', '')
@@ -426,6 +452,12 @@ class FileListWidget(QWidget):
         else:
             filtered = self.all_files
 
+        # Pivot by selected tag
+        tag_name = self.tag_combo.currentData()
+        if tag_name and self.current_case_id:
+            tagged_ids = set(self.tag_repo.get_file_ids_by_tag(self.current_case_id, tag_name))
+            filtered = [f for f in filtered if f.get('file_id') in tagged_ids]
+
         self.display_files(filtered)
 
     def search_files(self, text):
@@ -438,16 +470,53 @@ class FileListWidget(QWidget):
         filtered = [f for f in self.all_files if text in f.get('file_name', '').lower()]
         self.display_files(filtered)
 
-    def on_selection_changed(self):
-        """Handle file selection"""
-        selected_items = self.tree.selectedItems()
-        if selected_items:
-            item = selected_items[0]
+    def selected_file_ids(self):
+        """Get IDs of the selected file items (category items are ignored)"""
+        file_ids = []
+        for item in self.tree.selectedItems():
             file_data = item.data(0, Qt.UserRole)
-
-            # Only emit if this is a file item (not a category)
             if file_data:
-                self.file_selected.emit(file_data)
+                file_ids.append(file_data['file_id'])
+        return file_ids
+
+    def on_selection_changed(self):
+        """Handle file selection (preview only when a single file is selected)"""
+        selected_items = [item for item in self.tree.selectedItems() if item.data(0, Qt.UserRole)]
+        if len(selected_items) == 1:
+            file_data = selected_items[0].data(0, Qt.UserRole)
+
+            # Full row, read once and cached for the preview and analysis
+            record = self.file_repo.get_file(file_data['file_id'])
+            self.file_selected.emit(record or file_data)
+
+    def show_triage_menu(self, position):
+        """Context menu with bulk actions for the selected files"""
+        file_ids = self.selected_file_ids()
+        if not file_ids:
+            return
+
+        count = len(file_ids)
+        menu = QMenu(self)
+        flag_action = menu.addAction(f"🚩 Flag {count} file(s)")
+        unflag_action = menu.addAction(f"🏳️ Unflag {count} file(s)")
+        menu.addSeparator()
+        tag_action = menu.addAction(f"🏷️ Add tag to {count} file(s)...")
+        note_action = menu.addAction(f"📝 Set note on {count} file(s)...")
+
+        chosen = menu.exec_(self.tree.viewport().mapToGlobal(position))
+
+        if chosen == flag_action:
+            self.triage_requested.emit('flag', file_ids, "Manually flagged by analyst")
+        elif chosen == unflag_action:
+            self.triage_requested.emit('unflag', file_ids, '')
+        elif chosen == tag_action:
+            tag, ok = QInputDialog.getText(self, "Add Tag", f"Tag for {count} file(s):")
+            if ok and tag.strip():
+                self.triage_requested.emit('tag', file_ids, tag.strip())
+        elif chosen == note_action:
+            note, ok = QInputDialog.getMultiLineText(self, "Set Note", f"Note for {count} file(s):")
+            if ok and note.strip():
+                self.triage_requested.emit('note', file_ids, note.strip())
     
     def show_suspect_matches(self, matched_files):
         """Display only files matching the suspect"""
@@ -547,6 +616,11 @@ class FileListWidget(QWidget):
         self.search_results = []
         self.category_items = {}
 
+        self.tag_combo.blockSignals(True)
+        self.tag_combo.clear()
+        self.tag_combo.addItem("All Tags", None)
+        self.tag_combo.blockSignals(False)
+
         # Show all categories with 0 counts (Google Files style)
         if "Grouped by Type" in self.view_toggle.currentText():
             self._display_grouped([])  # Empty list - shows all categories with (0)
@@ -3,6 +3,8 @@ Background worker for AI analysis
 """
 from PyQt5.QtCore import QThread, pyqtSignal
 from ...core.ai_analyzer import AIAnalyzer
+from ...core.analysis_engine import AnalysisEngine
+from ...utils.config_loader import get_config
 
 from ...core.ai_service import AIService
 
@@ -23,8 +25,15 @@ class AnalysisWorker(QThread):
     def run(self):
         """Run analysis in background"""
         try:
-            # Initialize analyzer here (in worker thread) with the shared AI service
-            self.analyzer = AIAnalyzer(self.ai_service)
+            if get_config().get_int('AI', 'max_workers', 4) > 1:
+                # Worker processes load their own models
+                self.analyzer = AnalysisEngine.from_config()
+            else:
+                # Initialize analyzer here (in worker thread) with the shared AI service
+                self.analyzer = AIAnalyzer(self.ai_service)
+            
+            if self._is_cancelled:
+                return
             
             stats = self.analyzer.analyze_case(
                 self.case_id,
@@ -44,4 +53,6 @@ class AnalysisWorker(QThread):
     
     def cancel(self):
         """Cancel the analysis"""
-        self._is_cancelled = True
\ No newline at end of file
+        self._is_cancelled = True
+        if self.analyzer:
+            self.analyzer.cancel()
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""
+Background worker for case deletion
+"""
+from PyQt5.QtCore import QThread, pyqtSignal
+from ...core.case_manager import CaseManager
+
+class CaseDeletionWorker(QThread):
+    """Worker thread that deletes a case"""
+
+    finished = pyqtSignal(bool)  # case record removed
+    error = pyqtSignal(str)  # error message
+
+    def __init__(self, case_id: int):
+        super().__init__()
+        self.case_id = case_id
+
+    def run(self):
+        """Run deletion in background"""
+        try:
+            case_manager = CaseManager()
+            deleted = case_manager.delete_case(self.case_id)
+            self.finished.emit(deleted)
+
+        except Exception as e:
+            self.error.emit(str(e))
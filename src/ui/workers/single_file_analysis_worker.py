@@ -11,7 +11,7 @@ class SingleFileAnalysisWorker(QThread):
     """Worker thread for analyzing a single file on-demand"""
 
     # Signals
-    finished = pyqtSignal(dict)  # file_data with AI results
+    finished = pyqtSignal(object)  # FileRecord with AI results
     error = pyqtSignal(str)  # error message
 
     def __init__(self, file_id: int, ai_service: AIService):
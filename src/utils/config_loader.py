@@ -10,7 +10,8 @@ class ConfigLoader:
     
     def __init__(self, config_file='config/settings.ini'):
         self.config_file = Path(config_file)
-        self.config = configparser.ConfigParser()
+        # settings.ini uses trailing '# ...' comments on some values
+        self.config = configparser.ConfigParser(inline_comment_prefixes=('#',))
         self.load()
     
     def load(self):
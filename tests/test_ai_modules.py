@@ -0,0 +1,103 @@
+"""
+Tests for the AI modules
+"""
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('cv2')
+np = pytest.importorskip('numpy')
+
+from src.ai import tesseract_pool
+from src.ai.tesseract_pool import TSV_HEADER, mean_confidence, rebuild_text
+
+
+def _word(text, block=1, par=1, line=1, word=1, conf='90', page=1):
+    return {'level': '5', 'page_num': str(page), 'block_num': str(block),
+            'par_num': str(par), 'line_num': str(line), 'word_num': str(word),
+            'conf': conf, 'text': text}
+
+
+def _layout(level, block=1, par=1, line=0):
+    return {'level': str(level), 'page_num': '1', 'block_num': str(block),
+            'par_num': str(par), 'line_num': str(line), 'word_num': '0',
+            'conf': '-1', 'text': ''}
+
+
+def test_rebuild_text_joins_words_lines_and_paragraphs():
+    rows = [
+        _layout(2), _layout(3), _layout(4, line=1),
+        _word('Invoice', line=1, word=1), _word('No.', line=1, word=2), _word('42', line=1, word=3),
+        _layout(4, line=2),
+        _word('Total:', line=2), _word('$10', line=2, word=2),
+        _layout(3, par=2),
+        _word('Paid', par=2), _word('in', par=2, word=2), _word('cash', par=2, word=3),
+        _word('Page', block=2), _word('1', block=2, word=2),
+    ]
+
+    assert rebuild_text(rows) == 'Invoice No. 42\nTotal: $10\n\nPaid in cash\n\nPage 1'
+
+
+def test_rebuild_text_skips_empty_words():
+    rows = [_word('  '), _word('', word=2), _word('word', word=3), _layout(4, line=1)]
+
+    assert rebuild_text(rows) == 'word'
+    assert rebuild_text([]) == ''
+
+
+def test_mean_confidence_ignores_layout_rows_and_bad_values():
+    rows = [_layout(4, line=1), _word('a', conf='80'), _word('b', conf='60.5'),
+            _word('c', conf='-1'), _word('d', conf='n/a'), _word('e', conf='')]
+
+    assert mean_confidence(rows) == pytest.approx(70.25)
+
+
+def test_mean_confidence_without_words_is_zero():
+    assert mean_confidence([]) == 0.0
+    assert mean_confidence([_layout(2), _layout(3)]) == 0.0
+
+
+def test_tsv_header_matches_row_keys():
+    assert TSV_HEADER.strip().split('\t') == [
+        'level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+        'left', 'top', 'width', 'height', 'conf', 'text'
+    ]
+
+
+class _FakeAPI:
+    """Stands in for tesserocr.PyTessBaseAPI"""
+
+    def __init__(self, lang):
+        self.lang = lang
+        self.ended = False
+
+    def SetImageBytes(self, *args):
+        pass
+
+    def Recognize(self):
+        pass
+
+    def GetTSVText(self, page):
+        return f'5\t1\t1\t1\t1\t1\t0\t0\t1\t1\t90\t{self.lang}\n'
+
+    def Clear(self):
+        pass
+
+    def End(self):
+        self.ended = True
+
+
+def test_language_change_reaches_apis_in_use(monkeypatch):
+    monkeypatch.setattr(tesseract_pool, 'tesserocr', SimpleNamespace(PyTessBaseAPI=_FakeAPI),
+                        raising=False)
+    pool = tesseract_pool.TesseractPool(languages='eng', size=1)
+    pool.use_tesserocr = True
+    gray = np.zeros((4, 4), dtype=np.uint8)
+
+    api, languages = pool._checkout()
+    pool.set_language('eng+hin')  # While the only API is busy
+    pool._checkin(api, languages)
+
+    assert api.ended
+    assert [row['text'] for row in pool.image_to_data(gray)] == ['eng+hin']
+    assert pool._created == 1
@@ -0,0 +1,136 @@
+"""
+Tests for the staged analysis pipeline
+"""
+import itertools
+import threading
+
+import pytest
+
+from src.core.analysis_pipeline import Pipeline, Stage, merge_stats
+
+
+def _add(amount):
+    def func(item):
+        return item + amount
+    return func
+
+
+def test_single_worker_stages_keep_input_order():
+    pipeline = Pipeline([Stage('a', _add(1)), Stage('b', _add(10))])
+
+    results = list(pipeline.run(range(100)))
+
+    assert results == [(i + 11, None) for i in range(100)]
+
+
+def test_parallel_stage_processes_every_item():
+    pipeline = Pipeline([Stage('a', _add(1), workers=4), Stage('b', _add(10), workers=3)])
+
+    results = list(pipeline.run(range(200)))
+
+    assert sorted(item for item, _ in results) == [i + 11 for i in range(200)]
+    assert all(error is None for _, error in results)
+
+
+def test_batch_stage_receives_batches():
+    sizes = []
+
+    def batch(items):
+        sizes.append(len(items))
+        return items
+
+    pipeline = Pipeline([Stage('batch', batch, batch_size=8, queue_size=64)])
+
+    results = list(pipeline.run(range(50)))
+
+    assert sorted(item for item, _ in results) == list(range(50))
+    assert max(sizes) <= 8
+    assert sum(sizes) == 50
+
+
+def test_error_is_returned_and_skips_later_stages():
+    seen = []
+
+    def fail_on_three(item):
+        if item == 3:
+            raise ValueError('bad item')
+        return item
+
+    def record(item):
+        seen.append(item)
+        return item
+
+    pipeline = Pipeline([Stage('check', fail_on_three), Stage('record', record)])
+
+    results = dict(pipeline.run(range(6)))
+
+    assert isinstance(results[3], ValueError)
+    assert all(results[i] is None for i in (0, 1, 2, 4, 5))
+    assert 3 not in seen
+    assert pipeline.stats()['record']['items'] == 5
+
+
+def test_batch_error_fails_the_whole_batch():
+    def fail(items):
+        raise RuntimeError('model failed')
+
+    pipeline = Pipeline([Stage('batch', fail, batch_size=4, queue_size=16)])
+
+    results = list(pipeline.run(range(10)))
+
+    assert len(results) == 10
+    assert all(isinstance(error, RuntimeError) for _, error in results)
+
+
+def test_early_close_stops_every_thread():
+    pipeline = Pipeline([Stage('a', _add(1), workers=2, queue_size=2),
+                         Stage('b', _add(1), queue_size=2)])
+
+    outputs = pipeline.run(itertools.count())
+    taken = [next(outputs) for _ in range(5)]
+    outputs.close()
+
+    assert len(taken) == 5
+    assert not any(thread.is_alive() for thread in pipeline._threads)
+    assert not [t for t in threading.enumerate() if t.name.startswith('Pipeline-')]
+
+
+def test_early_close_records_capacity_of_every_stage():
+    pipeline = Pipeline([Stage('a', _add(1), workers=2, queue_size=1),
+                         Stage('b', _add(1), queue_size=1)], sink_name='write')
+
+    outputs = pipeline.run(itertools.count())
+    next(outputs)
+    outputs.close()
+
+    stats = pipeline.stats()
+    assert list(stats) == ['a', 'b', 'write']
+    assert all(stage['capacity'] > 0 for stage in stats.values())
+
+
+def test_input_error_is_raised_after_fed_items_complete():
+    def files():
+        yield from range(5)
+        raise OSError('task queue unavailable')
+
+    pipeline = Pipeline([Stage('a', _add(1), workers=2), Stage('b', _add(1))])
+    results = []
+
+    with pytest.raises(OSError, match='task queue unavailable'):
+        for item, error in pipeline.run(files()):
+            results.append(item)
+
+    assert sorted(results) == [2, 3, 4, 5, 6]
+    assert not any(thread.is_alive() for thread in pipeline._threads)
+
+
+def test_merge_stats_sums_runs():
+    pipeline = Pipeline([Stage('a', _add(1))])
+    list(pipeline.run(range(3)))
+    first = pipeline.stats()
+
+    total = merge_stats({}, first)
+    merge_stats(total, first)
+
+    assert total['a']['items'] == 6
+    assert total['a']['capacity'] == 2 * first['a']['capacity']
@@ -0,0 +1,392 @@
+"""
+Tests for the database layer
+"""
+import gzip
+import itertools
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+
+from src.database import analysis_cache, db_manager, file_record, migrations
+from src.database.analysis_cache import AnalysisCache
+from src.database.audit_repository import AuditWriter
+from src.database.backup_manager import BackupManager
+from src.database.case_repository import CaseRepository
+from src.database.compression import compress_text, decompress_text
+from src.database.db_manager import DatabaseManager
+from src.database.file_record import FileRecord
+from src.database.file_repository import FileRepository
+from src.database.record_cache import RecordCache
+from src.database.tag_repository import TagRepository
+
+VERSION = '3:image_classifier:0123456789ab'
+CASE_ID = 1
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    # A strictly increasing clock, so last_used orders every put and hit
+    clock = itertools.count(1000)
+    monkeypatch.setattr(analysis_cache.time, 'time', lambda: float(next(clock)))
+
+    db = DatabaseManager(tmp_path / 'analysis_cache.db', schema_name='analysis_cache_schema.sql')
+    return AnalysisCache(db, max_bytes=10 ** 9)
+
+
+def _results(text='text'):
+    return {'file_id': 7, 'file_hash': 'ignored', 'ai_tags': ['document'],
+            'ocr_text': text, 'face_count': 0}
+
+
+def test_cache_round_trip_drops_file_keys(cache):
+    cache.put('hash-a', VERSION, _results())
+
+    found = cache.get('hash-a', VERSION)
+
+    assert found == {'ai_tags': ['document'], 'ocr_text': 'text', 'face_count': 0}
+    assert cache.get('hash-a', 'other-version') is None
+    assert cache.get('hash-b', VERSION) is None
+
+
+def test_cache_get_many_counts_hits_and_misses(cache):
+    cache.put('hash-a', VERSION, _results())
+    cache.put('hash-b', VERSION, _results())
+
+    found = cache.get_many(['hash-a', 'hash-b', 'hash-c', None, 'hash-a'], VERSION)
+
+    assert set(found) == {'hash-a', 'hash-b'}
+    stats = cache.stats()
+    assert (stats['entries'], stats['hits'], stats['misses']) == (2, 2, 1)
+
+
+def test_cache_evicts_least_recently_used(cache):
+    for content_hash in ('hash-a', 'hash-b', 'hash-c'):
+        cache.put(content_hash, VERSION, _results())
+    entry_bytes = cache.stats()['bytes'] / 3
+
+    # Room for 3.5 entries; eviction frees down to EVICT_TO of that
+    cache.max_bytes = int(entry_bytes * 3.5)
+    assert cache.get('hash-a', VERSION) is not None  # a is now more recent than b
+    cache.put('hash-d', VERSION, _results())
+
+    assert cache.get('hash-b', VERSION) is None
+    for content_hash in ('hash-a', 'hash-c', 'hash-d'):
+        assert cache.get(content_hash, VERSION) is not None
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['bytes'] <= cache.max_bytes
+
+
+def test_cache_replacing_an_entry_keeps_size_accounting(cache):
+    cache.put('hash-a', VERSION, _results('short'))
+    cache.put('hash-a', VERSION, _results('a much longer text ' * 50))
+
+    stats = cache.stats()
+    assert stats['entries'] == 1
+    assert cache._total_bytes == stats['bytes']
+
+
+def test_cache_disabled_when_size_is_zero(cache):
+    cache.max_bytes = 0
+    cache.put('hash-a', VERSION, _results())
+
+    assert cache.stats()['entries'] == 0
+
+
+def _database_with_pages(path, rows=200):
+    conn = sqlite3.connect(str(path))
+    conn.execute('CREATE TABLE blobs (data BLOB)')
+    conn.executemany('INSERT INTO blobs VALUES (?)', [(b'x' * 1000,) for _ in range(rows)])
+    conn.commit()
+    pages = conn.execute('PRAGMA page_count').fetchone()[0]
+    conn.close()
+    return pages
+
+
+def test_backup_sleeps_between_steps(tmp_path):
+    pages = _database_with_pages(tmp_path / 'source.db')
+    manager = BackupManager(tmp_path / 'backups', pages_per_step=5, step_sleep=0.02)
+    progress = []
+
+    started = time.perf_counter()
+    size = manager.backup_database(tmp_path / 'source.db', tmp_path / 'copy.db.gz',
+                                   lambda done, total: progress.append((done, total)))
+    elapsed = time.perf_counter() - started
+
+    steps = -(-pages // 5)
+    assert len(progress) == steps
+    assert progress[-1] == (pages, pages)
+    assert elapsed >= (steps - 1) * 0.02
+    with gzip.open(tmp_path / 'copy.db.gz', 'rb') as f:
+        assert len(f.read()) == size
+
+
+def test_backup_without_sleep_is_not_paced(tmp_path):
+    _database_with_pages(tmp_path / 'source.db')
+    manager = BackupManager(tmp_path / 'backups', pages_per_step=5, step_sleep=0)
+
+    started = time.perf_counter()
+    manager.backup_database(tmp_path / 'source.db', tmp_path / 'copy.db.gz')
+
+    assert time.perf_counter() - started < 0.5
+
+
+@pytest.fixture
+def audit_writer(tmp_path):
+    db = DatabaseManager(tmp_path / 'catalog.db', schema_name='catalog_schema.sql')
+    writer = AuditWriter(db, flush_interval=3600)
+    yield writer
+    writer.close()
+
+
+def _audit_rows(writer):
+    return [tuple(row) for row in writer.db.execute_query(
+        'SELECT case_id, action FROM audit_log ORDER BY log_id'
+    )]
+
+
+def _event(action, case_id=None):
+    return (case_id, 'System', action, None, '2026-01-01 00:00:00')
+
+
+def test_audit_writer_isolates_invalid_events(audit_writer):
+    for event in (_event('first'), _event(None), _event('deleted_case', case_id=999),
+                  _event('last')):
+        audit_writer.enqueue(event)
+
+    assert audit_writer.flush() == 3
+
+    # The NULL action is dropped; the missing case's event is kept without it
+    assert _audit_rows(audit_writer) == [(None, 'first'), (None, 'deleted_case'), (None, 'last')]
+
+    audit_writer.enqueue(_event('after'))
+    assert audit_writer.flush() == 1
+    assert _audit_rows(audit_writer)[-1] == (None, 'after')
+
+
+def test_audit_writer_keeps_batch_on_transient_errors(audit_writer, monkeypatch):
+    audit_writer.enqueue(_event('first'))
+    audit_writer.enqueue(_event('second'))
+
+    def locked():
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(audit_writer.db, 'transaction', locked)
+    with pytest.raises(sqlite3.OperationalError):
+        audit_writer.flush()
+    monkeypatch.undo()
+
+    assert audit_writer.flush() == 2
+    assert [action for _, action in _audit_rows(audit_writer)] == ['first', 'second']
+
+
+@pytest.fixture
+def case_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_manager, '_configured_paths', lambda: (tmp_path, 'catalog.db'))
+    db_manager.release_case_db(CASE_ID)
+    yield db_manager.get_case_db(CASE_ID)
+    db_manager.release_case_db(CASE_ID)
+
+
+def _add_file(conn, ai_tags=None) -> int:
+    file_id = conn.execute(
+        "INSERT INTO evidence_files (case_id, file_name, file_type) VALUES (?, 'a.jpg', 'image')",
+        (CASE_ID,)
+    ).lastrowid
+    conn.execute(
+        "INSERT INTO evidence_file_details (file_id, file_path, ai_tags) VALUES (?, 'a.jpg', ?)",
+        (file_id, ai_tags)
+    )
+    return file_id
+
+
+def _tag_links(conn, file_id):
+    return dict(conn.execute('''
+        SELECT t.tag_name, ft.source FROM file_tags ft JOIN tags t ON t.tag_id = ft.tag_id
+        WHERE ft.file_id = ?
+    ''', (file_id,)).fetchall())
+
+
+def test_reanalysis_keeps_analyst_tag_of_the_same_name(case_db):
+    with case_db.transaction() as conn:
+        file_id = _add_file(conn)
+        TagRepository.replace_file_tags(conn, file_id, ['weapon', 'vehicle'], 'ai')
+        TagRepository.add_tag_to_files(conn, 'weapon', f'SELECT {file_id} AS file_id')
+        TagRepository.add_tag_to_files(conn, 'evidence', f'SELECT {file_id} AS file_id')
+
+        TagRepository.replace_file_tags(conn, file_id, ['person'], 'ai')
+        assert _tag_links(conn, file_id) == {
+            'weapon': 'analyst', 'evidence': 'analyst', 'person': 'ai'
+        }
+
+        # An AI tag named like an analyst tag does not take over its link
+        TagRepository.replace_file_tags(conn, file_id, ['evidence'], 'ai')
+        TagRepository.replace_file_tags(conn, file_id, [], 'ai')
+        assert _tag_links(conn, file_id) == {'weapon': 'analyst', 'evidence': 'analyst'}
+
+
+def test_tag_link_migration_marks_sources_and_backfills(case_db):
+    with case_db.transaction() as conn:
+        linked = _add_file(conn, '["cat"]')
+        TagRepository.replace_file_tags(conn, linked, ['cat'], 'ai')
+        TagRepository.add_tag_to_files(conn, 'seized', f'SELECT {linked} AS file_id')
+        json_only = _add_file(conn, '["dog", "ball"]')
+        _add_file(conn, 'not json')
+
+    # Rebuild file_tags as it was before links had a source
+    conn = sqlite3.connect(str(case_db.db_path))
+    conn.executescript('''
+        CREATE TABLE old_tags AS SELECT file_id, tag_id FROM file_tags;
+        DROP TABLE file_tags;
+        CREATE TABLE file_tags (file_id INTEGER, tag_id INTEGER, PRIMARY KEY (file_id, tag_id));
+        INSERT INTO file_tags SELECT * FROM old_tags;
+        DROP TABLE old_tags;
+        PRAGMA user_version = 1;
+    ''')
+
+    assert 2 in migrations.migrate(conn, 'schema.sql')
+
+    assert _tag_links(conn, linked) == {'cat': 'ai', 'seized': 'analyst'}
+    assert _tag_links(conn, json_only) == {'dog': 'ai', 'ball': 'ai'}
+    assert migrations.backfill_ai_tags(conn) == 0
+    conn.close()
+
+
+@pytest.fixture
+def case_repo(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_manager, '_configured_paths', lambda: (tmp_path, 'catalog.db'))
+    monkeypatch.setattr(db_manager, '_db_manager', None)
+    repo = CaseRepository()
+    case_id = repo.create_case({'case_number': 'CASE-1', 'case_name': 'Test'})
+    with db_manager.get_case_db(case_id).transaction() as conn:
+        _add_file(conn)
+    yield repo, case_id
+    db_manager.release_case_db(case_id)
+
+
+def test_delete_case_removes_database_files(case_repo):
+    repo, case_id = case_repo
+    db_path = db_manager.case_db_path(case_id)
+
+    assert repo.delete_case(case_id)
+
+    assert not any(Path(str(db_path) + suffix).exists() for suffix in ('', '-wal', '-shm'))
+    assert repo.get_case(case_id) is None
+
+
+def test_delete_case_refuses_while_analyzed(case_repo):
+    repo, case_id = case_repo
+
+    with db_manager.case_in_use(case_id):
+        with pytest.raises(RuntimeError, match='being analyzed'):
+            repo.delete_case(case_id)
+
+    assert repo.get_case(case_id)['status'] == 'open'
+    assert db_manager.case_db_path(case_id).exists()
+
+
+def test_failed_delete_case_can_be_run_again(case_repo, monkeypatch):
+    repo, case_id = case_repo
+    unlink = Path.unlink
+
+    def locked(path, *args, **kwargs):
+        raise PermissionError(13, 'file is in use', str(path))
+
+    monkeypatch.setattr(Path, 'unlink', locked)
+    with pytest.raises(RuntimeError, match='delete the case again'):
+        repo.delete_case(case_id)
+    assert repo.get_case(case_id)['status'] == 'deleting'
+
+    monkeypatch.setattr(Path, 'unlink', unlink)
+    assert repo.delete_case(case_id)
+    assert not db_manager.case_db_path(case_id).exists()
+
+
+def test_bulk_triage_audit_entry_caps_file_ids(case_repo, monkeypatch):
+    from src.core import case_manager
+    from src.core.case_manager import CaseManager
+
+    _, case_id = case_repo
+    with db_manager.get_case_db(case_id).transaction() as conn:
+        file_ids = [_add_file(conn) for _ in range(5)]
+    monkeypatch.setattr(case_manager, 'AUDIT_FILE_ID_LIMIT', 3)
+    manager = CaseManager()
+    logged = []
+    monkeypatch.setattr(manager.audit_repo, 'log_action', lambda **kwargs: logged.append(kwargs))
+
+    count = manager.triage_files(case_id, 'flag', (file_id for file_id in file_ids), value='x')
+
+    assert count == 5
+    assert logged[0]['details'] == {'file_count': 5, 'value': 'x',
+                                    'file_ids': file_ids[:3], 'file_ids_omitted': 2}
+
+
+def test_lazy_detail_load_does_not_count_cache_lookups(monkeypatch):
+    cache = RecordCache()
+    monkeypatch.setattr(file_record, 'get_record_cache', lambda: cache)
+    file_id = (CASE_ID << db_manager.CASE_ID_SHIFT) + 1
+    row = dict.fromkeys(file_record.DETAIL_COLUMNS + file_record.LAZY_COLUMNS)
+    row.update({'file_id': file_id, 'file_path': '/evidence/a.jpg', 'ocr_text': 'text'})
+    cache.put(file_id, row)
+
+    record = FileRecord({'file_id': file_id, 'file_name': 'a.jpg'})
+
+    assert record['file_path'] == '/evidence/a.jpg'
+    assert record['ocr_text'] == 'text'
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (0, 0)
+
+
+@pytest.mark.parametrize('method', ['zlib', 'lzma', 'none'])
+def test_text_compression_round_trip(method):
+    text = 'payment receipt ' * 100
+
+    stored = compress_text(text, method=method, min_bytes=0)
+
+    assert isinstance(stored, str) == (method == 'none')
+    assert decompress_text(stored) == text
+    assert compress_text('short', method=method, min_bytes=256) == 'short'
+
+
+def _text_matches(case_db, text):
+    return FileRepository().get_file_ids_matching_text(CASE_ID, text)
+
+
+def test_text_index_follows_text_writes(case_db):
+    repo = FileRepository()
+    with case_db.transaction() as conn:
+        file_id = _add_file(conn)
+        other = _add_file(conn)
+
+    repo.update_ai_analysis(file_id, {'ocr_text': 'bank transfer receipt ' * 50})
+    repo.add_note(file_id, 'seized phone')
+    repo.add_note_to_files(CASE_ID, 'repay later', file_ids=[other])
+
+    assert _text_matches(case_db, 'transf') == [file_id]
+    assert _text_matches(case_db, 'seized') == [file_id]
+    # Word prefixes, not substrings: 'pay' does not find 'repay'
+    assert _text_matches(case_db, 'pay') == []
+    assert _text_matches(case_db, 'repay') == [other]
+
+    repo.add_note(file_id, 'returned')
+    assert _text_matches(case_db, 'seized') == []
+    assert _text_matches(case_db, 'transfer') == [file_id]
+
+    repo.delete_file(file_id)
+    assert _text_matches(case_db, 'transfer') == []
+    assert repo.rebuild_text_index(CASE_ID) == 1
+
+
+def test_text_columns_are_writable_from_plain_connections(case_db):
+    with case_db.transaction() as conn:
+        file_id = _add_file(conn)
+
+    # No Python SQL functions registered (e.g. scripts or external tools)
+    conn = sqlite3.connect(str(case_db.db_path))
+    conn.execute("UPDATE evidence_file_details SET analyst_notes = 'note' WHERE file_id = ?",
+                 (file_id,))
+    conn.execute('DELETE FROM evidence_files WHERE file_id = ?', (file_id,))
+    conn.commit()
+    conn.close()
@@ -0,0 +1,182 @@
+"""
+Tests for the per-case face embedding index
+"""
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.database import db_manager, face_index
+from src.database.face_index import FaceIndex, release_face_index
+from src.database.face_repository import ENCODING_SIZE, FaceRepository
+
+CASE_ID = 1
+
+
+@pytest.fixture
+def case_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_manager, '_configured_paths', lambda: (tmp_path, 'catalog.db'))
+    db_manager.release_case_db(CASE_ID)
+    yield db_manager.get_case_db(CASE_ID)
+    release_face_index(CASE_ID)
+    db_manager.release_case_db(CASE_ID)
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """append flag of every FaceIndex._write call"""
+    calls = []
+    write = FaceIndex._write
+
+    def recording_write(self, face_ids, file_ids, encodings, append):
+        calls.append(append)
+        return write(self, face_ids, file_ids, encodings, append)
+
+    monkeypatch.setattr(FaceIndex, '_write', recording_write)
+    return calls
+
+
+def _add_file(case_db, encodings) -> int:
+    """Insert an image file with one face per encoding; returns its file_id"""
+    with case_db.transaction() as conn:
+        file_id = conn.execute(
+            "INSERT INTO evidence_files (case_id, file_name, file_type) VALUES (?, 'face.jpg', 'image')",
+            (CASE_ID,)
+        ).lastrowid
+        _replace_faces(conn, file_id, encodings)
+    return file_id
+
+
+def _replace_faces(conn, file_id, encodings):
+    FaceRepository.replace_file_faces(conn, file_id, [
+        {'bounding_box': {'x': 0, 'y': 0, 'width': 10, 'height': 10},
+         'confidence': 1.0, 'encoding': encoding}
+        for encoding in encodings
+    ])
+
+
+def _encodings(rng, count):
+    return rng.normal(0.0, 0.05, size=(count, ENCODING_SIZE)).astype(np.float32)
+
+
+def _stored():
+    """(face_id, file_id, encoding) rows of the case, by face_id"""
+    return FaceRepository().get_case_encodings(CASE_ID)
+
+
+def test_sync_appends_new_faces(case_db, writes):
+    rng = np.random.default_rng(1)
+    _add_file(case_db, _encodings(rng, 3))
+    index = FaceIndex(CASE_ID)
+
+    assert index.sync() == 3
+    first_rows = np.array(index._embeddings)
+
+    _add_file(case_db, _encodings(rng, 2))
+    assert index.sync() == 5
+
+    assert writes == [True, True]
+    face_ids, file_ids, encodings = _stored()
+    np.testing.assert_array_equal(index._ids[:, 0], face_ids)
+    np.testing.assert_array_equal(index._ids[:, 1], file_ids)
+    np.testing.assert_array_equal(index._embeddings, encodings)
+    np.testing.assert_array_equal(index._embeddings[:3], first_rows)
+    np.testing.assert_allclose(index._norms, (encodings ** 2).sum(axis=1), rtol=1e-5)
+
+
+def test_sync_is_a_no_op_when_unchanged(case_db, writes):
+    _add_file(case_db, _encodings(np.random.default_rng(2), 4))
+    index = FaceIndex(CASE_ID)
+    index.sync()
+
+    assert index.sync() == 4
+    assert writes == [True]
+
+
+def test_sync_rebuilds_after_faces_are_replaced(case_db, writes):
+    rng = np.random.default_rng(3)
+    first = _add_file(case_db, _encodings(rng, 3))
+    _add_file(case_db, _encodings(rng, 2))
+    index = FaceIndex(CASE_ID)
+    index.sync()
+
+    # Re-analysis replaces the first file's faces (new, higher face_ids)
+    with case_db.transaction() as conn:
+        _replace_faces(conn, first, _encodings(rng, 1))
+
+    assert index.sync() == 3
+    assert writes == [True, False]
+    face_ids, file_ids, encodings = _stored()
+    np.testing.assert_array_equal(index._ids[:, 0], face_ids)
+    np.testing.assert_array_equal(index._embeddings, encodings)
+
+
+def test_index_files_are_reused_by_a_new_instance(case_db):
+    _add_file(case_db, _encodings(np.random.default_rng(4), 6))
+    FaceIndex(CASE_ID).sync()
+
+    reopened = FaceIndex(CASE_ID)
+    query = _stored()[2][:1]
+
+    assert reopened.search(query, tolerance=0.01)[0]['distance'] == pytest.approx(0.0, abs=1e-3)
+    assert len(reopened) == 6
+
+
+def test_search_matches_brute_force(case_db, monkeypatch):
+    monkeypatch.setattr(face_index, 'CHUNK_ROWS', 64)  # several chunks
+    rng = np.random.default_rng(5)
+    for _ in range(40):
+        _add_file(case_db, _encodings(rng, int(rng.integers(1, 10))))
+    face_ids, file_ids, encodings = _stored()
+
+    # Suspect photo faces: noisy copies of two stored faces plus a stranger
+    queries = np.vstack([encodings[[7, 100]] + _encodings(rng, 2) * 0.2, _encodings(rng, 1)])
+    distances = np.linalg.norm(encodings[:, None, :] - queries[None, :, :], axis=2).min(axis=1)
+    tolerance = float(np.quantile(distances, 0.25))
+    expected = {int(face_ids[row]): float(distances[row])
+                for row in np.flatnonzero(distances <= tolerance)}
+
+    index = FaceIndex(CASE_ID)
+    index.sync()
+    matches = index.search(queries, tolerance=tolerance)
+
+    assert {m['face_id'] for m in matches} == set(expected)
+    for match in matches:
+        assert match['distance'] == pytest.approx(expected[match['face_id']], abs=1e-4)
+        assert match['file_id'] == int(file_ids[face_ids == match['face_id']][0])
+    assert [m['distance'] for m in matches] == sorted(m['distance'] for m in matches)
+
+    closest = index.search(queries, tolerance=tolerance, top_k=5)
+    assert closest == matches[:5]
+
+
+def test_match_files_groups_faces_by_file(case_db):
+    rng = np.random.default_rng(6)
+    suspect = _encodings(rng, 1)[0]
+    both = _add_file(case_db, [suspect, suspect + 0.001])
+    _add_file(case_db, _encodings(rng, 3))
+
+    index = FaceIndex(CASE_ID)
+    index.sync()
+    files = index.match_files(suspect, tolerance=0.1)
+
+    assert [f['file_id'] for f in files] == [both]
+    assert files[0]['match_count'] == 2
+    assert files[0]['confidence'] == pytest.approx((1.0 - files[0]['distance']) * 100)
+
+
+def test_search_of_an_empty_case(case_db):
+    index = FaceIndex(CASE_ID)
+
+    assert index.sync() == 0
+    assert index.search(np.zeros(ENCODING_SIZE)) == []
+
+
+def test_delete_removes_index_files(case_db):
+    _add_file(case_db, _encodings(np.random.default_rng(7), 2))
+    index = FaceIndex(CASE_ID)
+    index.sync()
+    assert all(path.exists() for path in index.paths)
+
+    index.delete()
+
+    assert not any(path.exists() for path in index.paths)